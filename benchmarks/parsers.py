@@ -0,0 +1,159 @@
+"""
+Micro-benchmarks of the CPU-heavy parsers over a checked-in corpus, with
+output-equivalence checks so faster parser engines can be swapped in safely.
+
+    python -m benchmarks.parsers                    # time, peak memory and equivalence per parser
+    python -m benchmarks.parsers --update-expected  # accept the current outputs
+    python -m benchmarks.parsers --generate         # rebuild the corpus (then update the expected outputs)
+
+The corpus in benchmarks/corpus is gzipped and synthetic, shaped after real payloads:
+a large news page with heavy boilerplate, a page with no content container, a long
+Wikipedia article, a 100-entry arXiv feed and a 200-article efetch XML.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from web_search.arxiv import ArxivSearch
+from web_search.base import SearchResult
+from web_search.google import GoogleSearch
+from web_search.pubmed import PubMedSearch
+from web_search.wikipedia_ import WikipediaSearch
+
+from . import payloads
+
+CORPUS = Path(__file__).parent / "corpus"
+EXPECTED = CORPUS / "expected.json"
+
+
+@dataclass
+class Case:
+    name: str
+    file: str
+    parse: Callable[[str], Any]
+
+
+CASES = [
+    Case("google.page", "news_page.html.gz", GoogleSearch()._extract_page_content),
+    Case("google.page_fallback", "news_page_no_container.html.gz", GoogleSearch()._extract_page_content),
+    Case("google.clean_content", "news_page_text.txt.gz", GoogleSearch()._clean_content),
+    Case(
+        "google.passages",
+        "news_page_text.txt.gz",
+        partial(GoogleSearch()._extract_passages, query="quantum computing energy"),
+    ),
+    Case(
+        "wikipedia.sections",
+        "wikipedia_article.txt.gz",
+        partial(WikipediaSearch()._extract_relevant_wiki_sections, query="quantum computing theory"),
+    ),
+    Case("arxiv.feed", "arxiv_feed_100.xml.gz", ArxivSearch()._parse_feed),
+    Case("pubmed.abstracts", "efetch_200.xml.gz", PubMedSearch()._parse_abstracts),
+]
+
+
+def generate():
+    """Write the corpus files"""
+    rng = random.Random(2024)
+    page = payloads.html_page(7, 20000)
+    no_container = page.replace('<div class="content">', "<div>").replace("<main>", "<section>")
+    no_container = no_container.replace("</main>", "</section>")
+    text = "\n".join(payloads.paragraph(rng, 60) if i % 3 else "Menu item" for i in range(400))
+    article = payloads.mediawiki_page_content("Quantum computing", 12000)["query"]["pages"]
+    ids = payloads.pubmed_ids(200)
+
+    files = {
+        "news_page.html.gz": page,
+        "news_page_no_container.html.gz": no_container,
+        "news_page_text.txt.gz": text,
+        "wikipedia_article.txt.gz": next(iter(article.values()))["extract"],
+        "arxiv_feed_100.xml.gz": payloads.arxiv_feed("all:quantum computing", 100),
+        "efetch_200.xml.gz": payloads.efetch(ids),
+    }
+    CORPUS.mkdir(exist_ok=True)
+    for name, content in files.items():
+        # mtime=0 keeps the gzip bytes stable across regenerations
+        (CORPUS / name).write_bytes(gzip.compress(content.encode(), mtime=0))
+
+
+def load(case: Case) -> str:
+    return gzip.decompress((CORPUS / case.file).read_bytes()).decode()
+
+
+def digest(output: Any) -> str:
+    """sha256 of the output in a canonical JSON form"""
+    if isinstance(output, list):
+        output = [item.to_dict() if isinstance(item, SearchResult) else item for item in output]
+    return hashlib.sha256(json.dumps(output, sort_keys=True).encode()).hexdigest()
+
+
+def check_equivalence(cases: List[Case] = CASES) -> List[str]:
+    """Cases whose output differs from the recorded expected output"""
+    expected = json.loads(EXPECTED.read_text())
+    return [case.name for case in cases if digest(case.parse(load(case))) != expected.get(case.name)]
+
+
+def update_expected(cases: List[Case] = CASES):
+    EXPECTED.write_text(json.dumps({case.name: digest(case.parse(load(case))) for case in cases}, indent=2) + "\n")
+
+
+def measure(case: Case, iterations: int) -> Dict[str, float]:
+    payload = load(case)
+    case.parse(payload)  # warm up
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        case.parse(payload)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    case.parse(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "input_kb": len(payload.encode()) / 1024,
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--generate", action="store_true", help="rebuild the corpus files")
+    parser.add_argument("--update-expected", action="store_true", help="record the current outputs as expected")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate()
+    if args.generate or args.update_expected:
+        update_expected()
+
+    mismatches = check_equivalence()
+    print(f"{'parser':<24} {'input KB':>9} {'median ms':>10} {'min ms':>8} {'peak KB':>9}  output")
+    for case in CASES:
+        stats = measure(case, args.iterations)
+        status = "CHANGED" if case.name in mismatches else "ok"
+        print(
+            f"{case.name:<24} {stats['input_kb']:>9.1f} {stats['median_ms']:>10.2f} {stats['min_ms']:>8.2f} "
+            f"{stats['peak_kb']:>9.1f}  {status}"
+        )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Deterministic stand-ins for the upstream payloads: Google CSE JSON, scraped HTML
+pages, arXiv Atom feeds, GitHub and NewsAPI JSON, NCBI E-utilities and MediaWiki
+"""
+
+import json
+import random
+import zlib
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+WORDS = (
+    "quantum computing network learning model data system energy protein cell analysis method "
+    "research theory algorithm graph signal image language neural memory light particle field "
+    "structure function design control process market policy climate water health disease gene "
+    "the of and to in for with on by from as is that are this was be at an or which"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 14) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(sentence(rng) for _ in range(max(1, words // 14)))
+
+
+def google_cse(query: str, items: int) -> Dict:
+    return {
+        "items": [
+            {
+                "link": f"https://site{i}.example.com/articles/{i}",
+                "title": f"{query} result {i}",
+                "snippet": f"Snippet {i} about {query}.",
+            }
+            for i in range(items)
+        ]
+    }
+
+
+def html_page(seed: int, words: int) -> str:
+    """A news-like page with navigation, scripts and an article body"""
+    rng = random.Random(seed)
+    paragraphs = "".join(f"<p>{paragraph(rng, 120)}</p>" for _ in range(max(1, words // 120)))
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(30))
+    return (
+        "<!doctype html><html><head><title>Article</title>"
+        "<script>window.dataLayer = [];" + "var x = 1;" * 200 + "</script>"
+        "<style>body { font-family: sans-serif; }</style></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f'<main><div class="content"><h1>Article {seed}</h1>{paragraphs}</div></main>'
+        "<footer><p>Copyright and terms of use for this example site.</p></footer>"
+        "</body></html>"
+    )
+
+
+def arxiv_feed(query: str, entries: int, summary_words: int = 180) -> str:
+    rng = random.Random(query)
+    body = "".join(
+        "<entry>"
+        f"<id>http://arxiv.org/abs/2401.{i:05d}v1</id>"
+        f"<title>{escape(sentence(rng, 8))}</title>"
+        f"<summary>{escape(paragraph(rng, summary_words))}</summary>"
+        "<author><name>A. Author</name></author>"
+        "</entry>"
+        for i in range(entries)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">{body}</feed>'
+
+
+def github_repositories(query: str, items: int) -> Dict:
+    rng = random.Random(query)
+    return {
+        "total_count": items,
+        "items": [
+            {"html_url": f"https://github.com/org/repo{i}", "name": f"repo{i}", "description": sentence(rng, 16)}
+            for i in range(items)
+        ],
+    }
+
+
+def newsapi_articles(query: str, items: int) -> Dict:
+    rng = random.Random(query)
+    return {
+        "status": "ok",
+        "articles": [
+            {"url": f"https://news.example.com/{i}", "title": sentence(rng, 8), "description": sentence(rng, 30)}
+            for i in range(items)
+        ],
+    }
+
+
+def pubmed_ids(items: int) -> List[str]:
+    return [str(30000000 + i) for i in range(items)]
+
+
+def esearch(items: int) -> Dict:
+    return {"esearchresult": {"idlist": pubmed_ids(items)}}
+
+
+def efetch(ids: List[str], abstract_words: int = 250) -> str:
+    rng = random.Random(",".join(ids))
+    articles = "".join(
+        "<PubmedArticle><MedlineCitation>"
+        f"<PMID>{pmid}</PMID><Article><ArticleTitle>{escape(sentence(rng, 10))}</ArticleTitle>"
+        f"<Abstract><AbstractText>{escape(paragraph(rng, abstract_words))}</AbstractText></Abstract>"
+        "</Article></MedlineCitation></PubmedArticle>"
+        for pmid in ids
+    )
+    return f'<?xml version="1.0"?><PubmedArticleSet>{articles}</PubmedArticleSet>'
+
+
+def esummary(ids: List[str]) -> Dict:
+    result: Dict = {"uids": ids}
+    for pmid in ids:
+        result[pmid] = {
+            "uid": pmid,
+            "title": f"Article {pmid}",
+            "source": "J Example",
+            "pubdate": "2024",
+            "authors": [{"name": "Author A"}],
+        }
+    return {"result": result}
+
+
+def mediawiki_search(query: str, items: int) -> Dict:
+    return {"query": {"search": [{"title": f"{query} article {i}"} for i in range(items)]}}
+
+
+def mediawiki_page_info(title: str) -> Dict:
+    pageid = str(zlib.crc32(title.encode()) % 10**8)
+    url = "https://en.wikipedia.org/wiki/" + title.replace(" ", "_")
+    return {"query": {"pages": {pageid: {"pageid": int(pageid), "title": title, "fullurl": url}}}}
+
+
+def mediawiki_page_content(title: str, words: int) -> Dict:
+    rng = random.Random(title)
+    pageid = str(zlib.crc32(title.encode()) % 10**8)
+    sections = [paragraph(rng, 200)]
+    for name in ("History", "Theory", "Applications", "See also", "References", "External links"):
+        sections.append(f"== {name} ==\n{paragraph(rng, max(14, words // 6))}")
+    return {
+        "query": {
+            "pages": {
+                pageid: {
+                    "pageid": int(pageid),
+                    "title": title,
+                    "extract": "\n\n".join(sections),
+                    "revisions": [{"revid": 1, "parentid": 0}],
+                }
+            }
+        }
+    }
+
+
+def dumps(payload: Dict) -> bytes:
+    return json.dumps(payload).encode()
@@ -0,0 +1,213 @@
+"""
+Benchmark WebSearch.search / compile_search against the local upstream stand-in.
+
+    python -m benchmarks.run --concurrency 1 8 32 --requests 64
+    python -m benchmarks.run --save benchmarks/baselines/local.json
+    python -m benchmarks.run --compare benchmarks/baselines/local.json --tolerance 0.15
+
+Reports throughput, p50/p95/p99 latency, peak traced memory and event-loop lag per
+concurrency level. With --compare, exits with status 1 when throughput drops or
+p95 latency grows by more than the tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Literal
+
+from web_search import (
+    BaseConfig,
+    GoogleSearchConfig,
+    NewsAPISearchConfig,
+    SearchHooks,
+    SourceStatus,
+    WebSearch,
+    WebSearchConfig,
+)
+
+from web_search.tracing import percentile
+
+from .upstream import FakeUpstream
+
+Mode = Literal["search", "compile"]
+
+ALL_SOURCES = ["google", "wikipedia", "arxiv", "newsapi", "github", "pubmed"]
+
+
+@dataclass
+class LevelResult:
+    mode: str
+    concurrency: int
+    requests: int
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+    peak_memory_mb: float
+    loop_lag_p99_ms: float
+    loop_lag_max_ms: float
+    source_errors: int
+
+
+class _ErrorCounter(SearchHooks):
+    def __init__(self):
+        self.errors = 0
+
+    def on_source_end(self, source: str, status: SourceStatus):
+        if status.error is not None:
+            self.errors += 1
+
+
+async def _monitor_loop_lag(lags: List[float], stop: asyncio.Event, interval: float = 0.005):
+    """how late the loop wakes a task sleeping for `interval`"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+def build_search(client, sources: List[str], max_results: int, hooks) -> WebSearch:
+    config = WebSearchConfig(
+        sources=sources,  # type: ignore[arg-type]
+        google_config=GoogleSearchConfig(api_key="bench", cse_id="bench", max_results=max_results),
+        wiki_config=BaseConfig(max_results=max_results),
+        arxiv_config=BaseConfig(max_results=max_results),
+        newsapi_config=NewsAPISearchConfig(api_key="bench", max_results=max_results),
+        github_config=BaseConfig(max_results=max_results),
+        pubmed_config=BaseConfig(max_results=max_results),
+    )
+    return WebSearch(config, client=client, hooks=hooks)
+
+
+async def _run_requests(search: WebSearch, mode: Mode, concurrency: int, requests: int, offset: int) -> List[float]:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        # distinct queries, since the wikipedia library memoizes searches
+        query = f"benchmark query {offset + i}"
+        async with semaphore:
+            start = time.perf_counter()
+            if mode == "search":
+                await search.search(query)
+            else:
+                await search.compile_search(query, budget=2000, unit="tokens")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies
+
+
+async def run_level(
+    upstream: FakeUpstream, sources: List[str], mode: Mode, concurrency: int, requests: int, max_results: int
+) -> LevelResult:
+    errors = _ErrorCounter()
+    async with upstream.client() as client:
+        search = build_search(client, sources, max_results, [errors])
+
+        lags: List[float] = []
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(_monitor_loop_lag(lags, stop))
+        start = time.perf_counter()
+        latencies = sorted(await _run_requests(search, mode, concurrency, requests, offset=concurrency * 100_000))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await monitor
+
+        # memory is measured in a separate wave, so tracing does not skew the latencies
+        tracemalloc.start()
+        await _run_requests(search, mode, concurrency, concurrency, offset=concurrency * 100_000 + requests)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return LevelResult(
+        mode=mode,
+        concurrency=concurrency,
+        requests=requests,
+        throughput=requests / elapsed,
+        p50=percentile(latencies, 50),
+        p95=percentile(latencies, 95),
+        p99=percentile(latencies, 99),
+        peak_memory_mb=peak / 2**20,
+        loop_lag_p99_ms=percentile(sorted(lags), 99) * 1000,
+        loop_lag_max_ms=max(lags, default=0.0) * 1000,
+        source_errors=errors.errors,
+    )
+
+
+def compare(results: List[LevelResult], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Regressions against a saved baseline, keyed by mode and concurrency"""
+    regressions: List[str] = []
+    for result in results:
+        base = baseline.get(f"{result.mode}/{result.concurrency}")
+        if base is None:
+            continue
+        if result.throughput < base["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{result.mode}/{result.concurrency}: throughput {result.throughput:.1f}/s "
+                f"< baseline {base['throughput']:.1f}/s"
+            )
+        if result.p95 > base["p95"] * (1 + tolerance):
+            regressions.append(
+                f"{result.mode}/{result.concurrency}: p95 {result.p95 * 1000:.0f}ms > baseline {base['p95'] * 1000:.0f}ms"
+            )
+    return regressions
+
+
+def report(results: List[LevelResult]) -> str:
+    lines = [
+        f"{'mode':<8} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'peak MB':>8} {'lag p99':>8} {'lag max':>8} {'errors':>7}"
+    ]
+    for r in results:
+        lines.append(
+            f"{r.mode:<8} {r.concurrency:>5} {r.throughput:>8.1f} {r.p50 * 1000:>8.0f} {r.p95 * 1000:>8.0f} "
+            f"{r.p99 * 1000:>8.0f} {r.peak_memory_mb:>8.1f} {r.loop_lag_p99_ms:>8.1f} {r.loop_lag_max_ms:>8.1f} "
+            f"{r.source_errors:>7}"
+        )
+    return "\n".join(lines)
+
+
+async def main(args: argparse.Namespace) -> int:
+    results: List[LevelResult] = []
+    with FakeUpstream(seed=args.seed) as upstream:
+        for mode in args.modes:
+            for concurrency in args.concurrency:
+                requests = max(args.requests, concurrency)
+                results.append(await run_level(upstream, args.sources, mode, concurrency, requests, args.max_results))
+
+    print(report(results))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({f"{r.mode}/{r.concurrency}": asdict(r) for r in results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", nargs="+", default=ALL_SOURCES, choices=ALL_SOURCES)
+    parser.add_argument("--modes", nargs="+", default=["search", "compile"], choices=["search", "compile"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="searches per concurrency level")
+    parser.add_argument("--max-results", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the results as a baseline JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
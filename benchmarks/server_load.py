@@ -0,0 +1,253 @@
+"""
+Open-loop load test of one search server worker against stubbed upstreams.
+
+    python -m benchmarks.server_load --rates 10 25 50 --duration 20
+    python -m benchmarks.server_load --max-p99 2.5 --min-throughput 0.95
+    python -m benchmarks.server_load --save load.json / --compare load.json
+
+Each step offers a constant arrival rate of POST /search requests, rotating through
+the source mixes. Requests are sent on schedule whether or not earlier ones have
+finished, and latency is measured from the scheduled time, so a stalled server
+shows up as latency rather than as a lower offered rate. The worker's RSS and
+open file descriptors are sampled every second.
+
+Exits with status 1 when a step's p99 exceeds --max-p99, when its achieved
+throughput falls below --min-throughput of the offered rate, or when it regresses
+against a --compare baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from web_search.tracing import percentile
+
+from .upstream import FakeUpstream
+
+DEFAULT_MIXES = ["google", "arxiv,github", "wikipedia,pubmed", "google,arxiv,newsapi", "github,newsapi,pubmed"]
+
+
+@dataclass
+class StepResult:
+    rate: float
+    requests: int
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+    error_rate: float
+    shed_rate: float
+    max_rss_mb: float
+    max_fds: int
+
+
+@dataclass
+class _Outcome:
+    latency: float
+    status: int | None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _fd_count(pid: int) -> int:
+    return len(os.listdir(f"/proc/{pid}/fd"))
+
+
+async def _sample(pid: int, samples: List[Dict[str, float]], stop: asyncio.Event):
+    """RSS and file descriptors of the worker, once a second (Linux only)"""
+    while not stop.is_set():
+        try:
+            samples.append({"t": time.time(), "rss_mb": _rss_mb(pid), "fds": _fd_count(pid)})
+        except OSError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=1.0)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _send(client: httpx.AsyncClient, scheduled: float, payload: Dict) -> _Outcome:
+    try:
+        response = await client.post("/search", json=payload)
+        status: int | None = response.status_code
+    except httpx.HTTPError:
+        status = None
+    return _Outcome(time.perf_counter() - scheduled, status)
+
+
+async def run_step(
+    client: httpx.AsyncClient, pid: int, rate: float, duration: float, mixes: List[List[str]]
+) -> StepResult:
+    samples: List[Dict[str, float]] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample(pid, samples, stop))
+
+    tasks: List[asyncio.Task] = []
+    total = int(rate * duration)
+    start = time.perf_counter()
+    for i in range(total):
+        scheduled = start + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        payload = {"query": f"load test query {rate} {i}", "sources": mixes[i % len(mixes)]}
+        tasks.append(asyncio.create_task(_send(client, scheduled, payload)))
+
+    outcomes: List[_Outcome] = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+
+    ok = sorted(o.latency for o in outcomes if o.status == 200)
+    shed = sum(1 for o in outcomes if o.status in (429, 503))
+    errors = sum(1 for o in outcomes if o.status not in (200, 429, 503))
+    return StepResult(
+        rate=rate,
+        requests=total,
+        throughput=len(ok) / elapsed,
+        p50=percentile(ok, 50),
+        p95=percentile(ok, 95),
+        p99=percentile(ok, 99),
+        error_rate=errors / total if total else 0.0,
+        shed_rate=shed / total if total else 0.0,
+        max_rss_mb=max((s["rss_mb"] for s in samples), default=0.0),
+        max_fds=int(max((s["fds"] for s in samples), default=0)),
+    )
+
+
+def check(results: List[StepResult], args: argparse.Namespace) -> List[str]:
+    """Threshold violations and regressions against the --compare baseline"""
+    failures: List[str] = []
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    for r in results:
+        step = f"{r.rate:g} req/s"
+        if args.max_p99 is not None and r.p99 > args.max_p99:
+            failures.append(f"{step}: p99 {r.p99:.2f}s > {args.max_p99:.2f}s")
+        if args.min_throughput is not None and r.throughput < r.rate * args.min_throughput:
+            failures.append(f"{step}: throughput {r.throughput:.1f}/s < {args.min_throughput:.0%} of offered")
+        base = baseline.get(f"{r.rate:g}")
+        if base is not None:
+            if r.throughput < base["throughput"] * (1 - args.tolerance):
+                failures.append(f"{step}: throughput {r.throughput:.1f}/s < baseline {base['throughput']:.1f}/s")
+            if r.p99 > base["p99"] * (1 + args.tolerance):
+                failures.append(f"{step}: p99 {r.p99:.2f}s > baseline {base['p99']:.2f}s")
+    return failures
+
+
+def report(results: List[StepResult]) -> str:
+    lines = [
+        f"{'offered':>8} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'errors':>7} {'shed':>6} {'RSS MB':>7} {'fds':>5}"
+    ]
+    for r in results:
+        lines.append(
+            f"{r.rate:>8g} {r.throughput:>7.1f} {r.p50 * 1000:>8.0f} {r.p95 * 1000:>8.0f} {r.p99 * 1000:>8.0f} "
+            f"{r.error_rate:>7.1%} {r.shed_rate:>6.1%} {r.max_rss_mb:>7.1f} {r.max_fds:>5}"
+        )
+    return "\n".join(lines)
+
+
+async def _wait_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("search server exited during startup")
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("search server did not become ready")
+
+
+async def main(args: argparse.Namespace) -> int:
+    mixes = [mix.split(",") for mix in args.mixes]
+    port = _free_port()
+    env = {
+        "GOOGLE_API_KEY": "load",
+        "CSE_ID": "load",
+        "NEWS_API_KEY": "load",
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [str(Path(__file__).resolve().parent.parent), os.environ.get("PYTHONPATH")])
+        ),
+    }
+
+    results: List[StepResult] = []
+    with FakeUpstream(seed=args.seed) as upstream:
+        cmd = [
+            sys.executable,
+            "-m",
+            "benchmarks.stubbed_server",
+            "--port",
+            str(port),
+            "--upstream-port",
+            str(upstream.port),
+        ]
+        server = subprocess.Popen(cmd, env=env)
+        try:
+            limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+            timeout = httpx.Timeout(args.request_timeout)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=timeout) as client:
+                await _wait_ready(client, server)
+                for rate in args.rates:
+                    results.append(await run_step(client, server.pid, rate, args.duration, mixes))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    print(report(results))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({f"{r.rate:g}": asdict(r) for r in results}, f, indent=2)
+
+    failures = check(results, args)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", nargs="+", type=float, default=[10, 25, 50], help="offered requests per second")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per rate step")
+    parser.add_argument("--mixes", nargs="+", default=DEFAULT_MIXES, help="comma-separated source sets")
+    parser.add_argument("--request-timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-p99", type=float, help="fail when a step's p99 exceeds this many seconds")
+    parser.add_argument("--min-throughput", type=float, help="fail below this fraction of the offered rate")
+    parser.add_argument("--save", help="write the results as a baseline JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
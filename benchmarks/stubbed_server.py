@@ -0,0 +1,42 @@
+"""
+Runs the search server (server/src/index.py) with every upstream routed to a
+FakeUpstream listening on --upstream-port. Started by benchmarks.server_load.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import httpx
+import uvicorn
+import wikipedia
+
+from .upstream import RedirectTransport
+
+SERVER_DIR = Path(__file__).resolve().parent.parent / "server"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--upstream-port", type=int, required=True)
+    args = parser.parse_args()
+
+    # the worker's pooled transport is built in the app lifespan; wrap it so that
+    # every request goes to the stand-in
+    http_transport = httpx.AsyncHTTPTransport
+
+    def stubbed_transport(**kwargs) -> httpx.AsyncBaseTransport:
+        return RedirectTransport(args.upstream_port, http_transport(**kwargs))
+
+    httpx.AsyncHTTPTransport = stubbed_transport  # type: ignore[assignment, misc]
+    wikipedia.wikipedia.API_URL = f"http://127.0.0.1:{args.upstream_port}/w/api.php"
+
+    sys.path.insert(0, str(SERVER_DIR))
+    from src.index import app
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
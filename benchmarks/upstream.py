@@ -0,0 +1,254 @@
+"""
+A local HTTP stand-in for all six upstreams, with configurable latency, error
+rate, rate limiting and payload sizes.
+
+The server runs in a background thread. httpx requests reach it through
+RedirectTransport, which keeps the original Host header so the server can tell
+the upstreams apart; the blocking `wikipedia` library is pointed at it through
+its API_URL.
+"""
+
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Literal, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import wikipedia
+
+from . import payloads
+
+Distribution = Literal["fixed", "exponential", "lognormal"]
+
+
+@dataclass
+class UpstreamProfile:
+    latency: float = 0.05
+    """mean response latency in seconds"""
+    distribution: Distribution = "lognormal"
+    error_rate: float = 0.0
+    """fraction of requests answered with a 500"""
+    rate_limit: float | None = None
+    """requests per second above which requests are answered with a 429"""
+    items: int = 10
+    """results per response"""
+    words: int = 1500
+    """length of each document (page, abstract, article) in words"""
+
+
+DEFAULT_PROFILES: Dict[str, UpstreamProfile] = {
+    "google": UpstreamProfile(latency=0.12),
+    "scrape": UpstreamProfile(latency=0.25, words=2500),
+    "wikipedia": UpstreamProfile(latency=0.08, words=4000),
+    "arxiv": UpstreamProfile(latency=0.3, words=180),
+    "newsapi": UpstreamProfile(latency=0.1),
+    "github": UpstreamProfile(latency=0.15),
+    "pubmed": UpstreamProfile(latency=0.2, words=250),
+}
+
+HOSTS = {
+    "www.googleapis.com": "google",
+    "export.arxiv.org": "arxiv",
+    "api.github.com": "github",
+    "newsapi.org": "newsapi",
+    "eutils.ncbi.nlm.nih.gov": "pubmed",
+}
+
+
+class _Bucket:
+    """token bucket allowing `rate` requests per second"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+@dataclass
+class UpstreamStats:
+    requests: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    throttled: Dict[str, int] = field(default_factory=dict)
+
+
+class FakeUpstream:
+    """
+    Serves every upstream on 127.0.0.1. Use as a context manager; while running,
+    `client()` returns an httpx.AsyncClient routed to it and Wikipedia is redirected.
+    """
+
+    def __init__(self, profiles: Dict[str, UpstreamProfile] | None = None, seed: int = 0):
+        self.profiles = {**DEFAULT_PROFILES, **(profiles or {})}
+        self.stats = UpstreamStats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._buckets = {name: _Bucket(p.rate_limit) for name, p in self.profiles.items() if p.rate_limit}
+        self._cache: Dict[Tuple, Tuple[str, bytes]] = {}
+        self._server: ThreadingHTTPServer | None = None
+        self._wikipedia_url = wikipedia.wikipedia.API_URL
+
+    @property
+    def port(self) -> int:
+        """Port the stand-in listens on"""
+        assert self._server is not None, "FakeUpstream is not running"
+        return self._server.server_address[1]
+
+    def __enter__(self) -> "FakeUpstream":
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, content_type, body = upstream.handle(self.headers.get("Host", ""), self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        wikipedia.wikipedia.API_URL = f"http://127.0.0.1:{self.port}/w/api.php"
+        return self
+
+    def __exit__(self, *exc_info):
+        wikipedia.wikipedia.API_URL = self._wikipedia_url
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def client(self, limits: httpx.Limits | None = None) -> httpx.AsyncClient:
+        """An AsyncClient whose requests, to any host, are served by this stand-in"""
+        transport = RedirectTransport(self.port, httpx.AsyncHTTPTransport(limits=limits or httpx.Limits()))
+        return httpx.AsyncClient(transport=transport)
+
+    def handle(self, host: str, path: str) -> Tuple[int, str, bytes]:
+        """Route a request to an upstream, applying its profile"""
+        url = urlsplit(path)
+        params = {key: values[0] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        name = "wikipedia" if url.path == "/w/api.php" else HOSTS.get(host.split(":")[0], "scrape")
+        profile = self.profiles[name]
+        bucket = self._buckets.get(name)
+        throttled = bucket is not None and not bucket.take()
+
+        with self._lock:
+            self._count(self.stats.requests, name)
+            if throttled:
+                self._count(self.stats.throttled, name)
+                return 429, "application/json", b'{"error": "rate limited"}'
+            delay = self._delay(profile)
+            failed = self._rng.random() < profile.error_rate
+            if failed:
+                self._count(self.stats.errors, name)
+
+        time.sleep(delay)
+        if failed:
+            return 500, "application/json", b'{"error": "upstream error"}'
+
+        key = (name, url.path, tuple(sorted(params.items())), host)
+        if key not in self._cache:
+            self._cache[key] = self._payload(name, url.path, params, host, profile)
+        content_type, body = self._cache[key]
+        return 200, content_type, body
+
+    @staticmethod
+    def _count(counts: Dict[str, int], name: str):
+        counts[name] = counts.get(name, 0) + 1
+
+    def _delay(self, profile: UpstreamProfile) -> float:
+        if profile.distribution == "fixed":
+            return profile.latency
+        if profile.distribution == "exponential":
+            return self._rng.expovariate(1 / profile.latency) if profile.latency else 0.0
+        # lognormal with the given mean and a moderate tail
+        sigma = 0.5
+        return self._rng.lognormvariate(0, sigma) * profile.latency / 1.1331
+
+    def _payload(
+        self, name: str, path: str, params: Dict[str, str], host: str, profile: UpstreamProfile
+    ) -> Tuple[str, bytes]:
+        builders: Dict[str, Callable[[], Tuple[str, bytes]]] = {
+            "google": lambda: (
+                "application/json",
+                payloads.dumps(payloads.google_cse(params.get("q", ""), profile.items)),
+            ),
+            "scrape": lambda: (
+                "text/html",
+                payloads.html_page(zlib.crc32((host + path).encode()), profile.words).encode(),
+            ),
+            "arxiv": lambda: (
+                "application/atom+xml",
+                payloads.arxiv_feed(
+                    params.get("search_query", ""), int(params.get("max_results", 10)), profile.words
+                ).encode(),
+            ),
+            "github": lambda: (
+                "application/json",
+                payloads.dumps(
+                    payloads.github_repositories(params.get("q", ""), int(params.get("per_page", profile.items)))
+                ),
+            ),
+            "newsapi": lambda: (
+                "application/json",
+                payloads.dumps(
+                    payloads.newsapi_articles(params.get("q", ""), int(params.get("pageSize", profile.items)))
+                ),
+            ),
+            "pubmed": lambda: self._pubmed(path, params, profile),
+            "wikipedia": lambda: ("application/json", payloads.dumps(self._mediawiki(params, profile))),
+        }
+        return builders[name]()
+
+    def _pubmed(self, path: str, params: Dict[str, str], profile: UpstreamProfile) -> Tuple[str, bytes]:
+        ids = params.get("id", "").split(",")
+        if path.endswith("esearch.fcgi"):
+            return "application/json", payloads.dumps(payloads.esearch(int(params.get("retmax", profile.items))))
+        if path.endswith("efetch.fcgi"):
+            return "text/xml", payloads.efetch(ids, profile.words).encode()
+        return "application/json", payloads.dumps(payloads.esummary(ids))
+
+    def _mediawiki(self, params: Dict[str, str], profile: UpstreamProfile) -> Dict:
+        if params.get("list") == "search":
+            return payloads.mediawiki_search(params.get("srsearch", ""), int(params.get("srlimit", profile.items)))
+        title = params.get("titles", "")
+        if "extracts" in params.get("prop", ""):
+            return payloads.mediawiki_page_content(title, profile.words)
+        return payloads.mediawiki_page_info(title)
+
+
+class RedirectTransport(httpx.AsyncBaseTransport):
+    """Sends every request to the local stand-in, keeping the original Host header"""
+
+    def __init__(self, port: int, transport: httpx.AsyncBaseTransport):
+        self.port = port
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send the request to the stand-in"""
+        request.url = request.url.copy_with(scheme="http", host="127.0.0.1", port=self.port)
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        """Close the wrapped transport"""
+        await self._transport.aclose()
@@ -0,0 +1,145 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+import httpx
+from fastapi import HTTPException
+
+
+class AdmissionController:
+    """
+    Caps the number of searches in flight, with a short bounded wait queue.
+
+    Requests arriving with the queue full are rejected at once with 429, and
+    requests that wait longer than `queue_timeout` are rejected with 503, both
+    carrying a Retry-After header.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float, retry_after: int = 1):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold an in-flight slot for the duration of the block"""
+        if self._semaphore.locked():
+            if self.queued >= self.max_queue:
+                raise self._reject(429, "Too many requests in flight")
+
+            self.queued += 1
+            try:
+                acquired = await self._acquire_queued()
+            finally:
+                self.queued -= 1
+            if not acquired:
+                raise self._reject(503, "Server is at capacity")
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def _acquire_queued(self) -> bool:
+        """
+        Wait up to `queue_timeout` for a slot. Unlike wait_for on 3.10/3.11, a permit
+        granted just as the wait is abandoned is handed back instead of leaked.
+        """
+        acquire = asyncio.ensure_future(self._semaphore.acquire())
+        try:
+            done, _ = await asyncio.wait({acquire}, timeout=self.queue_timeout)
+        except BaseException:
+            self._abandon(acquire)
+            raise
+
+        if not done:
+            self._abandon(acquire)
+            return False
+        return True
+
+    def _abandon(self, acquire: "asyncio.Future[bool]"):
+        acquire.add_done_callback(self._release_if_acquired)
+        acquire.cancel()
+
+    def _release_if_acquired(self, acquire: "asyncio.Future[bool]"):
+        if not acquire.cancelled() and acquire.exception() is None:
+            self._semaphore.release()
+
+    def _reject(self, status_code: int, detail: str) -> HTTPException:
+        self.rejected += 1
+        return HTTPException(status_code, detail, headers={"Retry-After": str(self.retry_after)})
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body stream that releases an upstream slot once closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        """Close the underlying stream and release the slot"""
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class LimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport capping the total number of outbound upstream requests in flight,
+    from sending the request until its response body is closed.
+
+    Only traffic through the shared httpx client is covered; the Wikipedia source
+    uses the blocking `wikipedia` library and bypasses this cap.
+    """
+
+    def __init__(self, max_requests: int, transport: httpx.AsyncBaseTransport | None = None):
+        self.max_requests = max_requests
+        self.in_flight = 0
+        self._transport = transport if transport else httpx.AsyncHTTPTransport()
+        self._semaphore = asyncio.Semaphore(max_requests)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send the request once an upstream slot is free"""
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.in_flight -= 1
+                self._semaphore.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        # a response whose body was read eagerly is already closed and its stream
+        # will never be closed again, so the slot is released right away
+        if response.is_closed or not isinstance(response.stream, httpx.AsyncByteStream):
+            release()
+        else:
+            response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self):
+        """Close the wrapped transport"""
+        await self._transport.aclose()
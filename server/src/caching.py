@@ -0,0 +1,86 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple
+
+from web_search import SourceStatus
+
+# how long each source's results may be reused by clients and CDNs, in seconds
+SOURCE_MAX_AGE: Dict[str, int] = {
+    "google": int(os.environ.get("GOOGLE_MAX_AGE", 300)),
+    "wikipedia": int(os.environ.get("WIKIPEDIA_MAX_AGE", 86400)),
+    "arxiv": int(os.environ.get("ARXIV_MAX_AGE", 3600)),
+    "newsapi": int(os.environ.get("NEWSAPI_MAX_AGE", 120)),
+    "github": int(os.environ.get("GITHUB_MAX_AGE", 600)),
+    "pubmed": int(os.environ.get("PUBMED_MAX_AGE", 3600)),
+}
+
+
+def etag_for(body: bytes) -> str:
+    """
+    Weak ETag derived from the JSON body. It is weak because GZipMiddleware may send
+    the same JSON gzip-encoded, and a strong validator must differ per encoding.
+    """
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    opaque = etag.removeprefix("W/")
+    return "*" in candidates or any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+
+def max_age(statuses: Iterable[SourceStatus]) -> int:
+    """
+    The shortest max-age among the sources; 0 when a source failed, so that
+    partial results are not reused
+    """
+    ages = []
+    for status in statuses:
+        if not status.ok:
+            return 0
+        ages.append(SOURCE_MAX_AGE.get(status.source, 0))
+    return min(ages, default=0)
+
+
+def cache_control(max_age: int) -> str:
+    """Cache-Control header value for a max-age"""
+    return f"public, max-age={max_age}" if max_age > 0 else "no-store"
+
+
+class ETagStore:
+    """
+    Bounded map of cache key to the ETag of the last response and its expiry,
+    used to answer conditional requests without searching again
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+
+    def get(self, key: str) -> Tuple[str, int] | None:
+        """The ETag for `key` and its remaining max-age, if it has not expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        etag, expires_at = entry
+        remaining = int(expires_at - time.monotonic())
+        if remaining <= 0:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return etag, remaining
+
+    def set(self, key: str, etag: str, max_age: int):
+        """Remember the ETag for `key` for `max_age` seconds"""
+        if max_age <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (etag, time.monotonic() + max_age)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
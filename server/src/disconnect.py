@@ -0,0 +1,43 @@
+import asyncio
+from typing import Awaitable, TypeVar
+
+from fastapi import Request
+
+T = TypeVar("T")
+
+# nginx's "client closed request"; logged for searches abandoned by their caller
+CLIENT_CLOSED_REQUEST = 499
+
+
+class ClientDisconnected(Exception):
+    """The client went away before its response was ready"""
+
+
+async def _wait_for_disconnect(request: Request):
+    # once the body has been read, the server's receive() blocks until the client disconnects
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    Await `awaitable` in a task that is cancelled as soon as the client disconnects,
+    raising ClientDisconnected then. Cancelling the task cancels the whole search
+    beneath it: queued admission, provider calls and page scrapes, releasing their
+    pool connections and limiter slots.
+    """
+    work = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not work.done():
+            work.cancel()
+            # the work is done with its cleanup before the handler returns
+            await asyncio.gather(work, return_exceptions=True)
+    if work not in done:
+        raise ClientDisconnected()
+    return work.result()
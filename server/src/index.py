@@ -1,15 +1,107 @@
+import asyncio
+import hashlib
 import os
-from typing import List, Optional
+import time
+from contextlib import asynccontextmanager
+from typing import Annotated, List, Optional
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+import httpx
+import orjson
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
-from web_search import BaseConfig, GoogleSearchConfig, NewsAPISearchConfig, SearchSources, WebSearch, WebSearchConfig
+from web_search import SearchResponse, SearchSources, WebSearch
 
-from .utils import validate_api_keys
+from .admission import AdmissionController, LimitedTransport
+from .caching import ETagStore, cache_control, etag_for, etag_matches, max_age
+from .disconnect import CLIENT_CLOSED_REQUEST, ClientDisconnected, cancel_on_disconnect
+from .metrics import InstrumentedTransport, ServerMetrics
+from .responses import ORJSONResponse
+from .utils import load_config, validate_api_keys
+from .warmup import WarmupState, preload_providers, warm_up
 
-app = FastAPI(title="Async WebSearch Demo", description="Production-scale async web search API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create one WebSearch, one pooled HTTP client and the admission controls for the
+    lifetime of the worker, then warm it up in the background; /ready reports when
+    the warm-up is done
+    """
+    max_connections = int(os.environ.get("HTTP_MAX_CONNECTIONS", 100))
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)),
+        # long enough for warmed-up connections to survive until traffic arrives
+        keepalive_expiry=float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", 30)),
+    )
+    metrics = ServerMetrics()
+    # capped at the pool size, so excess requests wait in the bounded cap rather than in httpx's pool
+    transport = LimitedTransport(
+        max_requests=min(int(os.environ.get("MAX_UPSTREAM_REQUESTS", max_connections)), max_connections),
+        transport=InstrumentedTransport(metrics, httpx.AsyncHTTPTransport(limits=limits)),
+    )
+    admission = AdmissionController(
+        max_in_flight=int(os.environ.get("MAX_IN_FLIGHT_SEARCHES", 64)),
+        max_queue=int(os.environ.get("MAX_QUEUED_SEARCHES", 64)),
+        queue_timeout=float(os.environ.get("QUEUE_TIMEOUT", 2.0)),
+        retry_after=int(os.environ.get("RETRY_AFTER", 1)),
+    )
+    metrics.add_gauge("web_search_in_flight_searches", "Searches being served", lambda: admission.in_flight)
+    metrics.add_gauge("web_search_queued_searches", "Searches waiting for admission", lambda: admission.queued)
+    metrics.add_gauge(
+        "web_search_rejected_searches_total",
+        "Searches shed by admission control",
+        lambda: admission.rejected,
+        "counter",
+    )
+    metrics.add_gauge(
+        "web_search_upstream_in_flight_requests", "Outbound upstream requests in flight", lambda: transport.in_flight
+    )
+
+    app.state.metrics = metrics
+    app.state.admission = admission
+    app.state.upstream = transport
+
+    warmup = WarmupState()
+    app.state.warmup = warmup
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        config = load_config()
+        app.state.web_search = WebSearch(config, client=client)
+        app.state.etags = ETagStore()
+
+        task = None
+        if os.environ.get("WARMUP", "1") != "0":
+            preload_providers(app.state.web_search, config.sources)
+            task = asyncio.create_task(
+                warm_up(
+                    client,
+                    config.sources,
+                    warmup,
+                    connections=int(os.environ.get("WARMUP_CONNECTIONS", 2)),
+                    timeout=float(os.environ.get("WARMUP_TIMEOUT", 5.0)),
+                )
+            )
+        else:
+            warmup.ready = True
+        try:
+            yield
+        finally:
+            if task is not None:
+                task.cancel()
+
+
+app = FastAPI(
+    title="Async WebSearch Demo",
+    description="Production-scale async web search API",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+# compress large bodies for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=int(os.environ.get("GZIP_MINIMUM_SIZE", 1024)))
 
 
 class SearchRequest(BaseModel):
@@ -18,6 +110,39 @@ class SearchRequest(BaseModel):
     max_results: int = 3
     timeout: Optional[float] = None
 
+    def cache_key(self) -> str:
+        """Stable hash of the fields that determine the results"""
+        canonical = {"query": self.query, "sources": sorted(set(self.sources)), "max_results": self.max_results}
+        return hashlib.sha256(orjson.dumps(canonical, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def get_web_search(request: Request) -> WebSearch:
+    return request.app.state.web_search
+
+
+def get_admission(request: Request) -> AdmissionController:
+    return request.app.state.admission
+
+
+def get_metrics(request: Request) -> ServerMetrics:
+    return request.app.state.metrics
+
+
+async def admitted_fetch(
+    web_search: WebSearch, admission: AdmissionController, request: SearchRequest
+) -> SearchResponse:
+    """Fetch the results of a search request once admission control lets it through"""
+    async with admission.admit():
+        try:
+            return await web_search.fetch(
+                request.query,
+                sources=request.sources,
+                max_results=request.max_results,
+                timeout=request.timeout,
+            )
+        except Exception as e:
+            raise HTTPException(500, f"Internal server error: {str(e)}")
+
 
 @app.get("/")
 def root():
@@ -27,6 +152,50 @@ def root():
     }
 
 
+@app.get("/health")
+def health(request: Request):
+    """
+    Liveness and load gauges, for health checks and autoscaling
+    """
+    admission: AdmissionController = request.app.state.admission
+    upstream: LimitedTransport = request.app.state.upstream
+    return {
+        "status": "ok",
+        "in_flight": admission.in_flight,
+        "queued": admission.queued,
+        "rejected": admission.rejected,
+        "max_in_flight": admission.max_in_flight,
+        "max_queue": admission.max_queue,
+        "upstream_in_flight": upstream.in_flight,
+        "max_upstream_requests": upstream.max_requests,
+    }
+
+
+@app.get("/ready")
+async def ready(request: Request):
+    """
+    Readiness: 503 until the worker's warm-up has finished, for load balancers
+    """
+    warmup: WarmupState = request.app.state.warmup
+    body = {
+        "status": "ready" if warmup.ready else "warming up",
+        "warmup_seconds": warmup.elapsed,
+        "connected": warmup.connected,
+        "failed": warmup.failed,
+        "event_loop": type(asyncio.get_running_loop()).__module__,
+    }
+    return JSONResponse(body, status_code=200 if warmup.ready else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(metrics: ServerMetrics = Depends(get_metrics)):
+    """
+    Prometheus metrics: per-source latency, errors and results, upstream requests
+    and bytes, cache lookups and load gauges
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/demo", response_class=HTMLResponse)
 def demo():
     template_path = os.path.join(os.path.dirname(__file__), "templates", "demo.html")
@@ -36,7 +205,13 @@ def demo():
 
 
 @app.post("/search")
-async def search(request: SearchRequest):
+async def search(
+    http_request: Request,
+    request: SearchRequest,
+    web_search: WebSearch = Depends(get_web_search),
+    admission: AdmissionController = Depends(get_admission),
+    metrics: ServerMetrics = Depends(get_metrics),
+):
     """
     Perform async web search across multiple sources.
 
@@ -44,53 +219,75 @@ async def search(request: SearchRequest):
     - **sources**: List of sources to search (google, wikipedia, arxiv, newsapi, github, pubmed)
     - **max_results**: Maximum results per source (default: 3)
     - **timeout**: Request timeout in seconds (optional)
+
+    The search is cancelled if the client disconnects before it completes.
     """
-    validate_api_keys(request.sources)
+    validate_api_keys(request.sources, web_search.config)
 
-    # Build configs
-    base_config = BaseConfig(
-        max_results=request.max_results,
-        timeout=request.timeout,
-    )
+    start = time.perf_counter()
+    try:
+        response = await cancel_on_disconnect(http_request, admitted_fetch(web_search, admission, request))
+    except ClientDisconnected:
+        metrics.cancelled_requests.inc("POST /search")
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    metrics.observe_response(response)
+    metrics.request_latency.observe(time.perf_counter() - start, "POST /search")
+    return ORJSONResponse({"results": response.results})
 
-    google_config: GoogleSearchConfig | None = None
-    if "google" in request.sources:
-        google_config = GoogleSearchConfig(
-            api_key=os.environ["GOOGLE_API_KEY"],
-            cse_id=os.environ["CSE_ID"],
-            app_domain=os.environ.get("GOOGLE_APP_DOMAIN"),
-            max_results=base_config.max_results,
-            timeout=base_config.timeout,
-        )
-
-    newsapi_config: NewsAPISearchConfig | None = None
-    if "newsapi" in request.sources:
-        newsapi_config = NewsAPISearchConfig(
-            api_key=os.environ["NEWS_API_KEY"],
-            max_results=base_config.max_results,
-            timeout=base_config.timeout,
-        )
-
-    # Create WebSearch config
-    config = WebSearchConfig(
-        sources=request.sources,
-        google_config=google_config,
-        newsapi_config=newsapi_config,
-        wiki_config=base_config,
-        arxiv_config=base_config,
-        github_config=base_config,
-        pubmed_config=base_config,
-    )
 
-    # Perform search
+@app.get("/search")
+async def search_cacheable(
+    http_request: Request,
+    request: Annotated[SearchRequest, Query()],
+    if_none_match: Annotated[str | None, Header()] = None,
+    web_search: WebSearch = Depends(get_web_search),
+    admission: AdmissionController = Depends(get_admission),
+    metrics: ServerMetrics = Depends(get_metrics),
+):
+    """
+    Cacheable variant of POST /search taking the same fields as query parameters.
+
+    Responses carry a content-based ETag and a Cache-Control max-age derived from the
+    requested sources; a matching If-None-Match is answered with 304 Not Modified.
+    """
+    validate_api_keys(request.sources, web_search.config)
+
+    etags: ETagStore = http_request.app.state.etags
+    key = request.cache_key()
+
+    # a fresh ETag for the same request is answered without searching again
+    if if_none_match:
+        known = etags.get(key)
+        if known and etag_matches(if_none_match, known[0]):
+            metrics.cache_lookups.inc("etag", "hit")
+            etag, remaining = known
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control(remaining)})
+        metrics.cache_lookups.inc("etag", "miss")
+
+    start = time.perf_counter()
     try:
-        results = await WebSearch(config).search(request.query)
-        return {"results": results}
-    except Exception as e:
-        raise HTTPException(500, f"Internal server error: {str(e)}")
+        response = await cancel_on_disconnect(http_request, admitted_fetch(web_search, admission, request))
+    except ClientDisconnected:
+        metrics.cancelled_requests.inc("GET /search")
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    metrics.observe_response(response)
+    metrics.request_latency.observe(time.perf_counter() - start, "GET /search")
+
+    body = orjson.dumps({"results": response.results})
+    etag = etag_for(body)
+    age = max_age(response.statuses.values())
+    etags.set(key, etag, age)
+
+    headers = {"ETag": etag, "Cache-Control": cache_control(age)}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # "auto" picks uvloop when it is installed (it is with uvicorn[standard]); "asyncio" opts out
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=os.environ.get("EVENT_LOOP", "auto"))
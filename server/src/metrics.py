@@ -0,0 +1,233 @@
+import asyncio
+import json
+import xml.etree.ElementTree as ET
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from web_search import SearchResponse
+
+# Metrics are only updated from the event loop thread, so plain dicts and ints are
+# enough: no locks on the hot path.
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# upstream API hosts; any other host reached through the shared client is a Google page scrape
+UPSTREAM_HOSTS: Dict[str, str] = {
+    "www.googleapis.com": "google",
+    "export.arxiv.org": "arxiv",
+    "api.github.com": "github",
+    "newsapi.org": "newsapi",
+    "eutils.ncbi.nlm.nih.gov": "pubmed",
+}
+SCRAPE = "google_scrape"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        """Increase the counter for a label set"""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Current value for a label set"""
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> Iterator[str]:
+        """Lines in the Prometheus text format"""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Gauge:
+    """Gauge (or a counter kept elsewhere) read from a callback at scrape time"""
+
+    def __init__(self, name: str, help: str, read: Callable[[], float], kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.kind = kind
+
+    def render(self) -> Iterator[str]:
+        """Lines in the Prometheus text format"""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield f"{self.name} {self.read()}"
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # per label set: bucket counts (the last one is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str):
+        """Record an observation for a label set"""
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def count(self, *labels: str) -> int:
+        """Number of observations for a label set"""
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> Iterator[str]:
+        """Lines in the Prometheus text format"""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total[0]}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+def error_type(error: BaseException) -> str:
+    """Classify a source error as timeout, http_status, connection, parse or other"""
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.HTTPStatusError):
+        return "http_status"
+    if isinstance(error, httpx.TransportError):
+        return "connection"
+    if isinstance(error, (ValueError, KeyError, TypeError, json.JSONDecodeError, ET.ParseError)):
+        return "parse"
+    return "other"
+
+
+class ServerMetrics:
+    def __init__(self):
+        self.source_latency = Histogram(
+            "web_search_source_duration_seconds", "Time taken by each source per search", ["source"]
+        )
+        self.source_errors = Counter(
+            "web_search_source_errors_total", "Source failures by error type", ["source", "type"]
+        )
+        self.source_results = Counter("web_search_source_results_total", "Results returned per source", ["source"])
+        self.upstream_requests = Counter(
+            "web_search_upstream_requests_total", "Outbound upstream requests by outcome", ["upstream", "outcome"]
+        )
+        self.upstream_bytes = Counter(
+            "web_search_upstream_bytes_total", "Response bytes downloaded from upstreams", ["upstream"]
+        )
+        self.cache_lookups = Counter("web_search_cache_lookups_total", "Cache lookups by outcome", ["cache", "result"])
+        self.request_latency = Histogram(
+            "web_search_request_duration_seconds", "Time taken to answer search requests", ["endpoint"]
+        )
+        self.cancelled_requests = Counter(
+            "web_search_cancelled_requests_total", "Searches cancelled because the client disconnected", ["endpoint"]
+        )
+        self.gauges: List[Gauge] = []
+
+    def add_gauge(self, name: str, help: str, read: Callable[[], float], kind: str = "gauge"):
+        """Register a gauge read at scrape time"""
+        self.gauges.append(Gauge(name, help, read, kind))
+
+    def observe_response(self, response: SearchResponse):
+        """Record per-source latency, errors and result counts of a search"""
+        for status in response.statuses.values():
+            self.source_latency.observe(status.elapsed, status.source)
+            if status.error is not None:
+                self.source_errors.inc(status.source, error_type(status.error))
+            else:
+                self.source_results.inc(status.source, amount=status.count)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        metrics: Iterable = (
+            self.source_latency,
+            self.source_errors,
+            self.source_results,
+            self.upstream_requests,
+            self.upstream_bytes,
+            self.cache_lookups,
+            self.request_latency,
+            self.cancelled_requests,
+            *self.gauges,
+        )
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, count: Callable[[int], None]):
+        self._stream = stream
+        self._count = count
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._count(len(chunk))
+            yield chunk
+
+    async def aclose(self):
+        """Close the underlying stream"""
+        await self._stream.aclose()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport recording each upstream request's outcome and downloaded bytes,
+    labelled by upstream (the source's API host, or google_scrape for scraped pages)
+    """
+
+    def __init__(self, metrics: ServerMetrics, transport: httpx.AsyncBaseTransport):
+        self.metrics = metrics
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send the request and record its outcome"""
+        upstream = UPSTREAM_HOSTS.get(urlsplit(str(request.url)).hostname or "", SCRAPE)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except asyncio.CancelledError:
+            self.metrics.upstream_requests.inc(upstream, "cancelled")
+            raise
+        except Exception as e:
+            self.metrics.upstream_requests.inc(upstream, error_type(e))
+            raise
+
+        self.metrics.upstream_requests.inc(upstream, "success" if response.status_code < 300 else "http_status")
+
+        def count(size: int):
+            self.metrics.upstream_bytes.inc(upstream, amount=size)
+
+        if response.is_closed or not isinstance(response.stream, httpx.AsyncByteStream):
+            count(len(response.content))
+        else:
+            response.stream = _CountingStream(response.stream, count)
+        return response
+
+    async def aclose(self):
+        """Close the wrapped transport"""
+        await self._transport.aclose()
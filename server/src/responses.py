@@ -0,0 +1,17 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered straight to bytes with orjson.
+
+    orjson serializes (slotted) dataclasses natively, so SearchResult objects are
+    written without first being converted to dicts.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the content to JSON bytes"""
+        return orjson.dumps(content)
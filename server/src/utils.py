@@ -1,16 +1,37 @@
 import os
-from typing import List
+from typing import List, get_args
 
 from fastapi import HTTPException
 
-from web_search import SearchSources
+from web_search import BaseConfig, GoogleSearchConfig, NewsAPISearchConfig, SearchSources, WebSearchConfig
 
 
-def validate_api_keys(sources: List[SearchSources]):
+def load_config() -> WebSearchConfig:
+    """
+    Build the WebSearch config for all sources from the environment, once at startup
+    """
+    base_config = BaseConfig()
+    return WebSearchConfig(
+        sources=list(get_args(SearchSources)),
+        google_config=GoogleSearchConfig(
+            api_key=os.environ.get("GOOGLE_API_KEY", ""),
+            cse_id=os.environ.get("CSE_ID", ""),
+            app_domain=os.environ.get("GOOGLE_APP_DOMAIN"),
+        ),
+        newsapi_config=NewsAPISearchConfig(api_key=os.environ.get("NEWS_API_KEY", "")),
+        wiki_config=base_config,
+        arxiv_config=base_config,
+        github_config=base_config,
+        pubmed_config=base_config,
+    )
+
+
+def validate_api_keys(sources: List[SearchSources], config: WebSearchConfig):
     if "google" in sources:
-        if not os.environ.get("GOOGLE_API_KEY", "") or not os.environ.get("CSE_ID", ""):
+        google_config = config.google_config
+        if not google_config or not google_config.api_key or not google_config.cse_id:
             raise HTTPException(500, "GOOGLE_API_KEY or CSE_ID is missing")
 
     if "newsapi" in sources:
-        if not os.environ.get("NEWS_API_KEY", ""):
+        if not config.newsapi_config or not config.newsapi_config.api_key:
             raise HTTPException(500, "NEWS_API_KEY is missing")
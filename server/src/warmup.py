@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Sequence
+
+import httpx
+
+from web_search import WebSearch
+
+logger = logging.getLogger(__name__)
+
+# upstream API origins of each source; Wikipedia's blocking library keeps no connections to warm
+UPSTREAM_ORIGINS: Dict[str, List[str]] = {
+    "google": ["https://www.googleapis.com"],
+    "arxiv": ["https://export.arxiv.org"],
+    "newsapi": ["https://newsapi.org"],
+    "github": ["https://api.github.com"],
+    "pubmed": ["https://eutils.ncbi.nlm.nih.gov"],
+}
+
+
+class WarmupState:
+    """Progress of the worker's warm-up, reported by /ready"""
+
+    def __init__(self):
+        self.ready = False
+        self.elapsed: float | None = None
+        self.connected: Dict[str, int] = {}
+        """connections opened per origin"""
+        self.failed: Dict[str, str] = {}
+
+
+def preload_providers(web_search: WebSearch, sources: Sequence[str]):
+    """Import and build the providers, so the first request does not pay for bs4, lxml or wikipedia"""
+    for source in sources:
+        web_search.provider(source)
+
+
+async def _connect(client: httpx.AsyncClient, origin: str, timeout: float, state: WarmupState):
+    try:
+        # any response will do: the DNS lookup, TCP and TLS handshakes are what is being paid for
+        await client.head(origin, timeout=timeout)
+        state.connected[origin] = state.connected.get(origin, 0) + 1
+    except httpx.HTTPError as e:
+        state.failed[origin] = type(e).__name__
+
+
+async def warm_up(
+    client: httpx.AsyncClient,
+    sources: Sequence[str],
+    state: WarmupState,
+    connections: int = 2,
+    timeout: float = 5.0,
+):
+    """
+    Open `connections` keep-alive connections to every upstream origin of `sources`
+    through the worker's pooled client, then mark the worker ready. Failures are
+    recorded but do not hold readiness back: the origin is simply cold.
+    """
+    start = time.perf_counter()
+    origins = sorted({origin for source in sources for origin in UPSTREAM_ORIGINS.get(source, [])})
+    try:
+        await asyncio.gather(
+            *(_connect(client, origin, timeout, state) for origin in origins for _ in range(connections))
+        )
+    finally:
+        state.elapsed = time.perf_counter() - start
+        state.ready = True
+    if state.failed:
+        logger.warning("warm-up could not reach %s", ", ".join(sorted(state.failed)))
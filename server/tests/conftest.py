@@ -4,6 +4,9 @@ import pytest
 from fastapi.testclient import TestClient
 from src.index import app
 
+# no upstream connections from the app lifespan in tests
+os.environ.setdefault("WARMUP", "0")
+
 
 @pytest.fixture(autouse=True)
 def setup_test_env(request):
@@ -21,5 +24,6 @@ def setup_test_env(request):
 
 @pytest.fixture
 def client():
-    """FastAPI test client fixture"""
-    return TestClient(app)
+    """FastAPI test client fixture, with the app lifespan running"""
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,117 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from src.admission import AdmissionController, LimitedTransport
+
+
+@pytest.mark.asyncio
+async def test_admission_admits_up_to_capacity():
+    """Test requests within capacity are admitted and tracked"""
+    admission = AdmissionController(max_in_flight=2, max_queue=0, queue_timeout=0.1)
+
+    async with admission.admit():
+        async with admission.admit():
+            assert admission.in_flight == 2
+
+    assert admission.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_rejects_when_queue_full():
+    """Test a full queue is shed immediately with 429 and Retry-After"""
+    admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1.0, retry_after=3)
+
+    async with admission.admit():
+        with pytest.raises(HTTPException) as exc_info:
+            async with admission.admit():
+                pass
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "3"}
+    assert admission.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_admission_rejects_after_queue_timeout():
+    """Test a queued request that waits too long is rejected with 503"""
+    admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.01)
+
+    async with admission.admit():
+        with pytest.raises(HTTPException) as exc_info:
+            async with admission.admit():
+                pass
+
+    assert exc_info.value.status_code == 503
+    assert admission.queued == 0
+
+    # the abandoned wait must not hold on to a permit
+    await asyncio.sleep(0)
+    async with admission.admit():
+        assert admission.in_flight == 1
+    assert not admission._semaphore.locked()
+
+
+@pytest.mark.asyncio
+async def test_admission_queued_request_runs_when_slot_frees():
+    """Test a queued request is admitted once an in-flight one finishes"""
+    admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1.0)
+    release = asyncio.Event()
+
+    async def hold():
+        async with admission.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    async def queued():
+        async with admission.admit():
+            return True
+
+    waiter = asyncio.create_task(queued())
+    await asyncio.sleep(0)
+    assert admission.queued == 1
+
+    release.set()
+    assert await waiter
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_limited_transport_caps_upstream_requests():
+    """Test the upstream cap holds a slot until the response body is closed"""
+    peak = 0
+
+    async def handler(request: httpx.Request):
+        nonlocal peak
+        peak = max(peak, transport.in_flight)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, text="ok")
+
+    transport = LimitedTransport(max_requests=2, transport=httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=transport) as client:
+        responses = await asyncio.gather(*(client.get(f"https://example.com/{i}") for i in range(6)))
+
+    assert all(r.text == "ok" for r in responses)
+    assert peak == 2
+    assert transport.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limited_transport_releases_streamed_responses():
+    """Test the slot is held while a streamed body is open and released when it is closed"""
+
+    async def handler(request: httpx.Request):
+        return httpx.Response(200, stream=httpx.ByteStream(b"streamed"))
+
+    transport = LimitedTransport(max_requests=1, transport=httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=transport) as client:
+        async with client.stream("GET", "https://example.com") as response:
+            assert transport.in_flight == 1
+            assert await response.aread() == b"streamed"
+        assert transport.in_flight == 0
+
+        response = await asyncio.wait_for(client.get("https://example.com"), 1)
+        assert response.text == "streamed"
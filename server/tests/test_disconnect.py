@@ -0,0 +1,113 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from src.admission import LimitedTransport
+from src.disconnect import ClientDisconnected, cancel_on_disconnect
+from src.index import app
+from src.metrics import InstrumentedTransport
+
+from web_search import WebSearch, WebSearchConfig
+
+
+class _Request:
+    """Just the receive() of a request whose client disconnects once `gone` is set"""
+
+    def __init__(self, gone: asyncio.Event):
+        self._gone = gone
+
+    async def receive(self):
+        await self._gone.wait()
+        return {"type": "http.disconnect"}
+
+
+@pytest.mark.asyncio
+async def test_cancel_on_disconnect():
+    """Test the work is cancelled and cleaned up on disconnect, and returned otherwise"""
+    gone = asyncio.Event()
+    cleaned_up = False
+
+    async def work():
+        nonlocal cleaned_up
+        try:
+            await asyncio.sleep(10)
+        finally:
+            cleaned_up = True
+
+    async def disconnect_soon():
+        await asyncio.sleep(0.01)
+        gone.set()
+
+    asyncio.ensure_future(disconnect_soon())
+    with pytest.raises(ClientDisconnected):
+        await cancel_on_disconnect(_Request(gone), work())
+    assert cleaned_up
+
+    async def quick():
+        return "done"
+
+    assert await cancel_on_disconnect(_Request(asyncio.Event()), quick()) == "done"
+
+
+def test_search_cancelled_when_client_disconnects():
+    """Test a disconnect mid-search cancels the upstream requests and frees every slot"""
+    with TestClient(app) as client:
+        state = app.state
+
+        async def call():
+            upstream_started = asyncio.Event()
+            upstream_cancelled = asyncio.Event()
+
+            async def handler(request: httpx.Request) -> httpx.Response:
+                upstream_started.set()
+                try:
+                    await asyncio.sleep(10)
+                finally:
+                    upstream_cancelled.set()
+                return httpx.Response(200, json={"items": []})
+
+            transport = LimitedTransport(
+                max_requests=4, transport=InstrumentedTransport(state.metrics, httpx.MockTransport(handler))
+            )
+            async with httpx.AsyncClient(transport=transport) as upstream:
+                state.web_search = WebSearch(WebSearchConfig(sources=["github"]), client=upstream)
+                body = orjson.dumps({"query": "python", "sources": ["github"]})
+                messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+                async def receive():
+                    if messages:
+                        return messages.pop()
+                    await upstream_started.wait()
+                    return {"type": "http.disconnect"}
+
+                sent = []
+
+                async def send(message):
+                    sent.append(message)
+
+                scope = {
+                    "type": "http",
+                    "asgi": {"version": "3.0"},
+                    "http_version": "1.1",
+                    "method": "POST",
+                    "scheme": "http",
+                    "path": "/search",
+                    "raw_path": b"/search",
+                    "query_string": b"",
+                    "root_path": "",
+                    "headers": [(b"host", b"testserver"), (b"content-type", b"application/json")],
+                    "client": ("testclient", 50000),
+                    "server": ("testserver", 80),
+                }
+                await asyncio.wait_for(app(scope, receive, send), 5)
+                return sent, upstream_cancelled.is_set(), transport.in_flight
+
+        sent, upstream_cancelled, upstream_in_flight = client.portal.call(call)
+
+    assert sent[0]["status"] == 499
+    assert upstream_cancelled and upstream_in_flight == 0
+    assert state.admission.in_flight == 0
+    assert state.metrics.cancelled_requests.value("POST /search") == 1
+    assert state.metrics.upstream_requests.value("github", "cancelled") == 1
@@ -0,0 +1,83 @@
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from src.metrics import InstrumentedTransport, ServerMetrics, error_type
+
+from web_search import SearchResponse, SearchResult, SourceStatus, WebSearch
+
+
+def test_error_type_classifies_source_errors():
+    """Test source errors are grouped into a small set of types"""
+    request = httpx.Request("GET", "https://example.com")
+    response = httpx.Response(500, request=request)
+
+    assert error_type(httpx.ReadTimeout("slow")) == "timeout"
+    assert error_type(httpx.HTTPStatusError("500", request=request, response=response)) == "http_status"
+    assert error_type(httpx.ConnectError("refused")) == "connection"
+    assert error_type(KeyError("items")) == "parse"
+    assert error_type(RuntimeError("boom")) == "other"
+
+
+def test_observe_response_records_each_source():
+    """Test per-source latency, result counts and errors are recorded from a response"""
+    metrics = ServerMetrics()
+    response = SearchResponse(
+        query="q",
+        results=[],
+        statuses={
+            "arxiv": SourceStatus(source="arxiv", elapsed=0.2, count=3),
+            "github": SourceStatus(source="github", elapsed=1.5, error=httpx.ReadTimeout("slow")),
+        },
+    )
+
+    metrics.observe_response(response)
+
+    assert metrics.source_latency.count("arxiv") == 1
+    assert metrics.source_results.value("arxiv") == 3
+    assert metrics.source_errors.value("github", "timeout") == 1
+    text = metrics.render()
+    assert 'web_search_source_duration_seconds_bucket{source="arxiv",le="0.25"} 1' in text
+    assert 'web_search_source_duration_seconds_bucket{source="github",le="1.0"} 0' in text
+    assert 'web_search_source_duration_seconds_count{source="github"} 1' in text
+
+
+@pytest.mark.asyncio
+async def test_instrumented_transport_counts_requests_and_bytes():
+    """Test upstream requests are labelled by API host or as Google page scrapes"""
+    metrics = ServerMetrics()
+    mock = httpx.MockTransport(lambda request: httpx.Response(200, content=b"x" * 10))
+
+    async with httpx.AsyncClient(transport=InstrumentedTransport(metrics, mock)) as client:
+        await client.get("https://export.arxiv.org/api/query")
+        async with client.stream("GET", "https://example.com/page") as response:
+            await response.aread()
+
+    assert metrics.upstream_requests.value("arxiv", "success") == 1
+    assert metrics.upstream_requests.value("google_scrape", "success") == 1
+    assert metrics.upstream_bytes.value("arxiv") == 10
+    assert metrics.upstream_bytes.value("google_scrape") == 10
+
+
+def test_metrics_endpoint(client):
+    """Test /metrics exposes source, cache and load metrics in the Prometheus text format"""
+    response = SearchResponse(
+        query="test query",
+        results=[SearchResult(url="https://example.com", title="T", preview="P", source="arxiv")],
+        statuses={"arxiv": SourceStatus(source="arxiv", elapsed=0.1, count=1)},
+    )
+    params = {"query": "test query", "sources": ["arxiv"]}
+    with patch.object(WebSearch, "fetch", AsyncMock(return_value=response)):
+        etag = client.get("/search", params=params).headers["etag"]
+        client.get("/search", params=params, headers={"If-None-Match": etag})
+
+    scraped = client.get("/metrics")
+
+    assert scraped.status_code == 200
+    assert scraped.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = scraped.text
+    assert 'web_search_source_results_total{source="arxiv"} 1.0' in text
+    assert 'web_search_cache_lookups_total{cache="etag",result="hit"} 1.0' in text
+    assert 'web_search_request_duration_seconds_count{endpoint="GET /search"} 1' in text
+    assert "web_search_in_flight_searches 0" in text
+    assert "# TYPE web_search_rejected_searches_total counter" in text
@@ -1,6 +1,18 @@
+import asyncio
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
+from fastapi.testclient import TestClient
+from src.index import SearchRequest, app
+
+from web_search import SearchResponse, SearchResult, SourceStatus, WebSearch
+
+
+def _fetch_response(query="test query", source="google", ok=True):
+    statuses = {source: SourceStatus(source=source, elapsed=0.1, count=1, error=None if ok else Exception("boom"))}
+    results = [SearchResult(url="https://example.com", title="Test Result", preview="Test preview", source=source)]
+    return SearchResponse(query=query, results=results, statuses=statuses)
 
 
 def test_root_endpoint(client):
@@ -23,16 +35,9 @@ async def test_search_successful_request(client):
         "max_results": 2,
     }
 
-    # Mock the WebSearch class
-    with patch("src.index.WebSearch") as mock_websearch_class:
-        mock_websearch_instance = AsyncMock()
-        mock_websearch_instance.search = AsyncMock(
-            return_value=[
-                {"url": "https://example.com", "title": "Test Result", "preview": "Test preview", "source": "google"}
-            ]
-        )
-        mock_websearch_class.return_value = mock_websearch_instance
-
+    # Mock the search on the long-lived WebSearch instance
+    mock_fetch = AsyncMock(return_value=_fetch_response())
+    with patch.object(WebSearch, "fetch", mock_fetch):
         response = client.post("/search", json=payload)
 
         assert response.status_code == 200
@@ -42,14 +47,24 @@ async def test_search_successful_request(client):
         assert len(data["results"]) == 1
         assert data["results"][0]["title"] == "Test Result"
 
-        # Verify WebSearch was called with correct config
-        mock_websearch_class.assert_called_once()
-        # Check that search was called
-        mock_websearch_instance.search.assert_called_once_with("test query")
+        # Check that search was called with the per-request options
+        mock_fetch.assert_called_once_with("test query", sources=["google"], max_results=2, timeout=None)
+
+
+def test_web_search_is_reused_across_requests(client):
+    """Test the WebSearch instance and its HTTP client are created once per worker"""
+    web_search = client.app.state.web_search
+
+    with patch.object(WebSearch, "fetch", AsyncMock(return_value=SearchResponse(query="q", results=[]))):
+        client.post("/search", json={"query": "first", "sources": ["arxiv"]})
+        client.post("/search", json={"query": "second", "sources": ["github"], "max_results": 5})
+
+    assert client.app.state.web_search is web_search
+    assert web_search.arxiv.client is web_search.github.client is not None
 
 
 @pytest.mark.asyncio
-async def test_search_missing_google_keys(client, monkeypatch):
+async def test_search_missing_google_keys(monkeypatch):
     """Test search request fails when Google API keys are missing from environment"""
     payload = {
         "query": "test query",
@@ -57,11 +72,12 @@ async def test_search_missing_google_keys(client, monkeypatch):
         "max_results": 2,
     }
 
-    # Mock missing environment variables by setting them to empty strings
+    # Mock missing environment variables by setting them to empty strings before startup
     monkeypatch.setenv("GOOGLE_API_KEY", "")
     monkeypatch.setenv("CSE_ID", "")
 
-    response = client.post("/search", json=payload)
+    with TestClient(app) as client:
+        response = client.post("/search", json=payload)
 
     assert response.status_code == 500
     data = response.json()
@@ -70,7 +86,7 @@ async def test_search_missing_google_keys(client, monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_search_missing_newsapi_key(client, monkeypatch):
+async def test_search_missing_newsapi_key(monkeypatch):
     """Test search request fails when NewsAPI key is missing from environment"""
     payload = {
         "query": "test query",
@@ -78,10 +94,11 @@ async def test_search_missing_newsapi_key(client, monkeypatch):
         "max_results": 2,
     }
 
-    # Mock missing environment variable by setting it to empty string
+    # Mock missing environment variable by setting it to empty string before startup
     monkeypatch.setenv("NEWS_API_KEY", "")
 
-    response = client.post("/search", json=payload)
+    with TestClient(app) as client:
+        response = client.post("/search", json=payload)
 
     assert response.status_code == 500
     data = response.json()
@@ -98,27 +115,12 @@ async def test_search_multiple_sources(client):
         "max_results": 3,
     }
 
-    with patch("src.index.WebSearch") as mock_websearch_class:
-        mock_websearch_instance = AsyncMock()
-        mock_websearch_instance.search = AsyncMock(
-            return_value=[
-                {
-                    "url": "https://google.com",
-                    "title": "Google Result",
-                    "preview": "Google preview",
-                    "source": "google",
-                },
-                {"url": "https://arxiv.com", "title": "ArXiv Result", "preview": "ArXiv preview", "source": "arxiv"},
-                {
-                    "url": "https://github.com",
-                    "title": "GitHub Result",
-                    "preview": "GitHub preview",
-                    "source": "github",
-                },
-            ]
-        )
-        mock_websearch_class.return_value = mock_websearch_instance
-
+    results = [
+        SearchResult(url="https://google.com", title="Google Result", preview="Google preview", source="google"),
+        SearchResult(url="https://arxiv.com", title="ArXiv Result", preview="ArXiv preview", source="arxiv"),
+        SearchResult(url="https://github.com", title="GitHub Result", preview="GitHub preview", source="github"),
+    ]
+    with patch.object(WebSearch, "fetch", AsyncMock(return_value=SearchResponse(query="test query", results=results))):
         response = client.post("/search", json=payload)
 
         assert response.status_code == 200
@@ -135,17 +137,29 @@ async def test_search_internal_error(client):
         "sources": ["google"],
     }
 
-    with patch("src.index.WebSearch") as mock_websearch_class:
-        mock_websearch_instance = AsyncMock()
-        mock_websearch_instance.search = AsyncMock(side_effect=Exception("Internal error"))
-        mock_websearch_class.return_value = mock_websearch_instance
-
+    with patch.object(WebSearch, "fetch", AsyncMock(side_effect=Exception("Internal error"))):
         response = client.post("/search", json=payload)
 
         assert response.status_code == 500
         assert "Internal error" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_search_large_response_is_gzipped(client):
+    """Test large search responses are compressed for clients accepting gzip"""
+    payload = {"query": "test query", "sources": ["google"]}
+    preview = "Long preview text. " * 200
+
+    fetch_response = _fetch_response()
+    fetch_response.results[0].preview = preview
+    with patch.object(WebSearch, "fetch", AsyncMock(return_value=fetch_response)):
+        response = client.post("/search", json=payload, headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["results"][0]["preview"] == preview
+
+
 def test_search_invalid_json(client):
     """Test search request with invalid JSON"""
     response = client.post("/search", data="invalid json")
@@ -174,3 +188,104 @@ def test_search_invalid_source(client):
     response = client.post("/search", json=payload)
 
     assert response.status_code == 422  # Validation error for invalid literal
+
+
+def test_get_search_sets_caching_headers(client):
+    """Test the GET variant returns results with an ETag and a per-source max-age"""
+    with patch.object(WebSearch, "fetch", AsyncMock(return_value=_fetch_response(source="arxiv"))) as mock_fetch:
+        response = client.get("/search", params={"query": "test query", "sources": ["arxiv"], "max_results": 2})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["title"] == "Test Result"
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["cache-control"] == "public, max-age=3600"
+    mock_fetch.assert_called_once_with("test query", sources=["arxiv"], max_results=2, timeout=None)
+
+
+def test_get_search_not_modified(client):
+    """Test If-None-Match with a known ETag is answered with 304 without searching again"""
+    params = {"query": "test query", "sources": ["google"]}
+    with patch.object(WebSearch, "fetch", AsyncMock(return_value=_fetch_response())) as mock_fetch:
+        etag = client.get("/search", params=params).headers["etag"]
+        response = client.get("/search", params=params, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    mock_fetch.assert_called_once()
+
+
+def test_get_search_etag_is_weak_across_encodings(client):
+    """Test gzip and identity representations share a weak ETag"""
+    preview = "Long preview text. " * 200
+    fetch_response = _fetch_response()
+    fetch_response.results[0].preview = preview
+    params = {"query": "test query"}
+
+    with patch.object(WebSearch, "fetch", AsyncMock(return_value=fetch_response)):
+        gzipped = client.get("/search", params=params, headers={"Accept-Encoding": "gzip"})
+        identity = client.get("/search", params=params, headers={"Accept-Encoding": "identity"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["etag"] == identity.headers["etag"]
+    assert gzipped.headers["etag"].startswith('W/"')
+
+
+def test_get_search_failed_source_is_not_cached(client):
+    """Test responses with a failed source are marked no-store"""
+    with patch.object(WebSearch, "fetch", AsyncMock(return_value=_fetch_response(ok=False))):
+        response = client.get("/search", params={"query": "test query"})
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+
+
+def test_search_request_cache_key_is_stable():
+    """Test the cache key ignores source order and duplicates"""
+    a = SearchRequest(query="q", sources=["google", "arxiv"])
+    b = SearchRequest(query="q", sources=["arxiv", "google", "arxiv"], timeout=5)
+    c = SearchRequest(query="q", sources=["arxiv"])
+
+    assert a.cache_key() == b.cache_key()
+    assert a.cache_key() != c.cache_key()
+
+
+def test_health_reports_load_gauges(client):
+    """Test the health endpoint exposes admission and upstream gauges"""
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    assert data["in_flight"] == 0
+    assert data["queued"] == 0
+    assert data["upstream_in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_search_rejected_when_saturated(monkeypatch):
+    """Test /search is shed with Retry-After once the in-flight cap and queue are full"""
+    monkeypatch.setenv("MAX_IN_FLIGHT_SEARCHES", "1")
+    monkeypatch.setenv("MAX_QUEUED_SEARCHES", "0")
+    release = asyncio.Event()
+
+    async def slow_search(*args, **kwargs):
+        await release.wait()
+        return _fetch_response()
+
+    payload = {"query": "test query", "sources": ["arxiv"]}
+    with patch.object(WebSearch, "fetch", AsyncMock(side_effect=slow_search)):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                first = asyncio.create_task(client.post("/search", json=payload))
+                while app.state.admission.in_flight == 0:
+                    await asyncio.sleep(0.001)
+
+                response = await client.post("/search", json=payload)
+                release.set()
+                assert (await first).status_code == 200
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
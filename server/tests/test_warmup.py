@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from src import index
+from src.index import app
+from src.warmup import WarmupState, preload_providers, warm_up
+
+from web_search import WebSearch, WebSearchConfig
+
+
+@pytest.mark.asyncio
+async def test_warm_up_connects_to_each_upstream():
+    """Test warm-up opens connections per upstream origin and records unreachable ones"""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, request.url.host))
+        if request.url.host == "api.github.com":
+            raise httpx.ConnectError("unreachable", request=request)
+        return httpx.Response(405)
+
+    state = WarmupState()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await warm_up(client, ["google", "github", "wikipedia", "pubmed"], state, connections=2)
+
+    assert state.ready
+    assert sorted(seen) == sorted(
+        [("HEAD", "www.googleapis.com"), ("HEAD", "eutils.ncbi.nlm.nih.gov")] * 2 + [("HEAD", "api.github.com")] * 2
+    )
+    assert state.failed == {"https://api.github.com": "ConnectError"}
+    assert state.connected == {"https://eutils.ncbi.nlm.nih.gov": 2, "https://www.googleapis.com": 2}
+
+
+def test_ready_waits_for_warm_up(monkeypatch):
+    """Test /ready is 503 while the warm-up runs and 200 once it finishes"""
+    release = asyncio.Event()
+
+    async def slow_warm_up(client, sources, state, **kwargs):
+        await release.wait()
+        state.ready = True
+
+    monkeypatch.setenv("WARMUP", "1")
+    monkeypatch.setattr(index, "warm_up", slow_warm_up)
+    with TestClient(app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming up"
+
+        # the providers were built before the first request
+        web_search: WebSearch = app.state.web_search
+        assert {"google", "wikipedia", "github"} <= set(web_search._providers_by_source)
+
+        client.portal.call(release.set)
+        for _ in range(50):
+            response = client.get("/ready")
+            if response.status_code == 200:
+                break
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+
+def test_ready_without_warm_up(client):
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["event_loop"]
+
+
+def test_preload_only_builds_requested_sources():
+    search = WebSearch(WebSearchConfig(sources=["github"]))
+    preload_providers(search, ["github"])
+    assert "github" in search._providers_by_source and "google" not in search._providers_by_source
@@ -1,26 +1,90 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from .base import BaseSearch, SearchResult
+from .cache import CountMinSketch, ResultCache
 from .config import (
+    AdaptiveTimeoutConfig,
     BaseConfig,
+    CacheConfig,
     GoogleSearchConfig,
     NewsAPISearchConfig,
+    RankingConfig,
     SearchSources,
     WebSearchConfig,
 )
-from .github import GitHubSearch
-from .newsapi import NewsAPISearch
-from .pubmed import PubMedSearch
+from .hooks import SearchHooks
+from .negative_cache import NegativeCache, RotatingBloomFilter
+from .registry import register
+from .response import SearchResponse, SourceStatus
+from .scheduler import DEFAULT_SCRAPE_SCHEDULER, ScrapeScheduler
 from .search import WebSearch
 
+if TYPE_CHECKING:
+    from .github import GitHubSearch
+    from .newsapi import NewsAPISearch
+    from .pubmed import PubMedSearch
+    from .sync import SyncWebSearch
+    from .tracing import HTTPTracer, JSONLinesSink, PhaseTrace, RingBufferSink, TraceSink, summarize
+
+# imported on first access, so that `import web_search` stays cheap
+_LAZY = {
+    "GitHubSearch": ".github",
+    "NewsAPISearch": ".newsapi",
+    "PubMedSearch": ".pubmed",
+    "SyncWebSearch": ".sync",
+    "HTTPTracer": ".tracing",
+    "JSONLinesSink": ".tracing",
+    "PhaseTrace": ".tracing",
+    "RingBufferSink": ".tracing",
+    "TraceSink": ".tracing",
+    "summarize": ".tracing",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY])
+
+
 __all__ = [
+    "AdaptiveTimeoutConfig",
     "BaseConfig",
     "BaseSearch",
+    "CacheConfig",
+    "CountMinSketch",
+    "DEFAULT_SCRAPE_SCHEDULER",
     "GitHubSearch",
     "GoogleSearchConfig",
+    "HTTPTracer",
+    "JSONLinesSink",
+    "NegativeCache",
     "NewsAPISearch",
     "NewsAPISearchConfig",
+    "PhaseTrace",
     "PubMedSearch",
-    "SearchSources",
+    "RankingConfig",
+    "ResultCache",
+    "RingBufferSink",
+    "RotatingBloomFilter",
+    "ScrapeScheduler",
+    "SearchHooks",
+    "SearchResponse",
     "SearchResult",
+    "SearchSources",
+    "SourceStatus",
+    "SyncWebSearch",
+    "TraceSink",
     "WebSearch",
     "WebSearchConfig",
+    "register",
+    "summarize",
 ]
@@ -1,26 +1,39 @@
-from typing import List
+import time
+from typing import List, Sequence
 
 import httpx
 from bs4 import BeautifulSoup, Tag
 
 from .base import BaseSearch, SearchResult
 from .config import BaseConfig
+from .hooks import SearchHooks
 
 
 class ArxivSearch(BaseSearch):
+    source = "arxiv"
     arxiv_config: BaseConfig
 
-    def __init__(self, arxiv_config: BaseConfig | None = None):
+    def __init__(
+        self,
+        arxiv_config: BaseConfig | None = None,
+        client: httpx.AsyncClient | None = None,
+        hooks: Sequence[SearchHooks] = (),
+    ):
         self.arxiv_config = arxiv_config if arxiv_config else BaseConfig()
+        super().__init__(self.arxiv_config, client, hooks)
 
-    async def _handle(self, query: str) -> List[SearchResult]:
-        return await self._search(query)
+    async def _handle(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
+        return await self._search(query, max_results, timeout)
 
-    async def _compile(self, query: str) -> str:
-        results = await self._search(query)
+    async def _compile(self, query: str, max_results: int | None = None, timeout: float | None = None) -> str:
+        results = await self._search(query, max_results, timeout)
         return "\n\n".join(str(r) for r in results)
 
-    async def _search(self, query: str) -> List[SearchResult]:
+    async def _search(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
         """
         Search by fetching papers from arXiv
         """
@@ -31,16 +44,24 @@ class ArxivSearch(BaseSearch):
         params = {
             "search_query": f"all:{query}",
             "start": 0,
-            "max_results": self.arxiv_config.max_results,
+            "max_results": self._max_results(max_results),
             "sortBy": "relevance",
             "sortOrder": "descending",
         }
 
-        async with httpx.AsyncClient(timeout=self.arxiv_config.timeout) as client:
-            response = await client.get(ARXIV_URL, params=params)
-            response.raise_for_status()
+        response = await self._get(ARXIV_URL, timeout, params=params)
+        response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "lxml-xml")
+        start = time.perf_counter()
+        sources = self._parse_feed(response.text)
+        self._parsed(start, len(sources))
+        return sources
+
+    def _parse_feed(self, feed: str) -> List[SearchResult]:
+        """
+        Parse an arXiv Atom feed into search results
+        """
+        soup = BeautifulSoup(feed, "lxml-xml")
         entries = soup.find_all("entry")
 
         sources: List[SearchResult] = []
@@ -58,6 +79,6 @@ class ArxivSearch(BaseSearch):
             preview = entry.summary.text.strip() if entry.summary else ""
             if preview:
                 return SearchResult(url=url, title=title, preview=preview, source="arxiv")
-        except Exception:
-            pass
+        except Exception as e:
+            self._suppress(e)
         return None
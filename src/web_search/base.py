@@ -1,9 +1,20 @@
+from __future__ import annotations
+
+import time
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Sequence
+from urllib.parse import urlsplit
+
+from .config import BaseConfig, SearchSources
+from .hooks import ChainedTrace, SearchHooks, current_status, trace_callbacks
+from .timeouts import AdaptiveTimeouts
 
-from .config import SearchSources
+if TYPE_CHECKING:
+    import httpx
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     url: str
     title: str
@@ -24,14 +35,132 @@ class SearchResult:
 
 
 class BaseSearch:
-    def _handle(self, _query: str):
+    source: SearchSources
+    config: BaseConfig
+    client: httpx.AsyncClient | None
+    hooks: Sequence[SearchHooks]
+    timeouts: AdaptiveTimeouts | None = None
+
+    def __init__(self, config: BaseConfig, client: httpx.AsyncClient | None = None, hooks: Sequence[SearchHooks] = ()):
+        self.config = config
+        self.client = client
+        self.hooks = hooks
+        if config.adaptive_timeout is not None:
+            self.timeouts = AdaptiveTimeouts(config.adaptive_timeout)
+
+    def _handle(self, _query: str, max_results: int | None = None, timeout: float | None = None):
         """main search handler with json response"""
         pass
 
-    def _compile(self, _query: str):
+    def _compile(self, _query: str, max_results: int | None = None, timeout: float | None = None):
         """search and compile the result into a string"""
         pass
 
-    def _search(self, _query: str):
+    def _search(self, _query: str, max_results: int | None = None, timeout: float | None = None):
         """context based search algorithm and workflow"""
         pass
+
+    async def enrich(
+        self, results: Sequence[SearchResult], query: str = "", timeout: float | None = None
+    ) -> List[SearchResult]:
+        """
+        Fill in the full previews of results returned with only a summary; providers
+        whose results are always complete return them unchanged
+        """
+        return list(results)
+
+    def _max_results(self, max_results: int | None = None) -> int:
+        """call-time max_results, falling back to the configured one"""
+        return self.config.max_results if max_results is None else max_results
+
+    def _timeout(self, timeout: float | None = None, host: str | None = None) -> float | None:
+        """
+        call-time timeout, falling back to the adaptive one for `host` (when enabled
+        and warmed up), then to the configured one
+        """
+        if timeout is not None:
+            return timeout
+        if self.timeouts is not None and host is not None:
+            adaptive = self.timeouts.timeout(host)
+            if adaptive is not None:
+                return adaptive
+        return self.config.timeout
+
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        the shared client when one was provided, otherwise a client for this call only
+        """
+        if self.client is not None:
+            yield self.client
+        else:
+            import httpx
+
+            async with httpx.AsyncClient() as client:
+                yield client
+
+    async def _get(self, url: str, timeout: float | None = None, **kwargs: Any) -> httpx.Response:
+        """
+        GET an upstream URL, reporting it to the hooks, the current source's status
+        and the adaptive timeouts
+        """
+        status = current_status.get()
+        if status is None and not self.hooks and self.timeouts is None:
+            async with self._http_client() as client:
+                return await client.get(url, timeout=self._timeout(timeout), **kwargs)
+
+        host = urlsplit(url).hostname or ""
+        traces = trace_callbacks(kwargs.get("extensions", {}).get("trace"))
+        for hook in self.hooks:
+            hook.on_http_request(self.source, url)
+            trace = hook.http_trace(self.source, url)
+            if trace is not None:
+                traces.append(trace)
+        if traces:
+            # every tracing hook, and a trace passed by the caller, sees the request's events
+            trace = traces[0] if len(traces) == 1 else ChainedTrace(traces)
+            kwargs["extensions"] = {**kwargs.get("extensions", {}), "trace": trace}
+        start = time.perf_counter()
+        try:
+            async with self._http_client() as client:
+                response = await client.get(url, timeout=self._timeout(timeout, host), **kwargs)
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            for hook in self.hooks:
+                hook.on_http_response(self.source, url, None, elapsed, e)
+            if status is not None:
+                status.http_calls += 1
+            if self.timeouts is not None and _is_timeout(e):
+                # counted at the time it gave up, so a slowing host raises its own timeout
+                self.timeouts.record(host, elapsed)
+            raise
+
+        elapsed = time.perf_counter() - start
+        if status is not None:
+            status.http_calls += 1
+            status.bytes_received += len(response.content)
+        if self.timeouts is not None:
+            self.timeouts.record(host, elapsed)
+        for hook in self.hooks:
+            hook.on_http_response(self.source, url, response, elapsed, None)
+        return response
+
+    def _parsed(self, start: float, count: int):
+        """report a payload parsed since `start` (a time.perf_counter() reading) to the hooks"""
+        if self.hooks:
+            elapsed = time.perf_counter() - start
+            for hook in self.hooks:
+                hook.on_parse(self.source, elapsed, count)
+
+    def _suppress(self, error: Exception):
+        """record an error the source recovered from in the current source's status"""
+        status = current_status.get()
+        if status is not None:
+            status.suppressed.append(error)
+
+
+def _is_timeout(error: Exception) -> bool:
+    # httpx is loaded by the time a request fails; importing it here keeps `import web_search` light
+    import httpx
+
+    return isinstance(error, httpx.TimeoutException)
@@ -0,0 +1,93 @@
+from dataclasses import replace
+from typing import Iterator, List, Literal, Sequence
+
+from .base import SearchResult
+from .text import truncate_at_sentence
+
+BudgetUnit = Literal["chars", "tokens"]
+
+# rough average for English text with common LLM tokenizers
+CHARS_PER_TOKEN = 4
+SEPARATOR = "\n\n"
+
+
+def budget_chars(budget: int, unit: BudgetUnit = "chars") -> int:
+    """Convert a budget expressed in `unit` to characters"""
+    return budget * CHARS_PER_TOKEN if unit == "tokens" else budget
+
+
+def fair_shares(budget: int, sizes: Sequence[int]) -> List[int]:
+    """
+    Split a budget max-min fairly: items smaller than an equal share keep their
+    size and the remainder is divided evenly among the larger ones
+    """
+    shares = [0] * len(sizes)
+    pending = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    remaining = max(budget, 0)
+
+    for n, i in enumerate(pending):
+        share = remaining // (len(pending) - n)
+        if sizes[i] > share:
+            for j in pending[n:]:
+                shares[j] = share
+            break
+        shares[i] = sizes[i]
+        remaining -= sizes[i]
+
+    return shares
+
+
+def compile_results(
+    results: Sequence[SearchResult], budget: int | None = None, leading_separator: bool = False
+) -> Iterator[str]:
+    """
+    Yield compiled results, fitting within `budget` characters in total when given.
+
+    Every chunk but the first overall is prefixed with the separator, and previews
+    are truncated at sentence boundaries to fit each result's fair share.
+    """
+    results = [r for r in results if r.preview]
+    if budget is None:
+        shares: List[int | None] = [None] * len(results)
+    else:
+        shares = list(fair_shares(budget, [len(str(r)) + len(SEPARATOR) for r in results]))
+
+    for result, share in zip(results, shares):
+        separator = SEPARATOR if leading_separator else ""
+        if share is not None:
+            header = len(str(replace(result, preview="")))
+            preview = truncate_at_sentence(result.preview, share - len(separator) - header)
+            if not preview:
+                continue
+            result = replace(result, preview=preview)
+
+        yield separator + str(result)
+        leading_separator = True
+
+
+class GroupCompiler:
+    """
+    Compile groups of results (typically one per source) as they arrive, giving each
+    group an equal share of what is left of the budget
+    """
+
+    def __init__(self, groups: int, budget: int | None = None):
+        self.groups = groups
+        self.remaining = budget
+        self._fed = 0
+        self._first = True
+
+    def feed(self, results: Sequence[SearchResult]) -> Iterator[str]:
+        """Yield the compiled chunks for the next group"""
+        share = self.remaining // (self.groups - self._fed) if self.remaining is not None else None
+        self._fed += 1
+
+        for chunk in compile_results(results, share, leading_separator=not self._first):
+            if self.remaining is not None:
+                self.remaining -= len(chunk)
+            self._first = False
+            yield chunk
+
+    def skip(self):
+        """Account for a group that produced nothing"""
+        self._fed += 1
@@ -0,0 +1,172 @@
+import asyncio
+import heapq
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, List
+
+from .config import CacheConfig
+from .response import SearchResponse
+
+Loader = Callable[[], Awaitable[SearchResponse]]
+
+
+class CountMinSketch:
+    """
+    Approximate per-key counts in fixed memory (`width` x `depth` counters).
+    Estimates never undercount; all counters are halved every `width * 8` additions,
+    so old popularity fades.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._rows = [array("I", bytes(4 * width)) for _ in range(depth)]
+        self._additions = 0
+
+    def _indexes(self, key: Hashable) -> List[int]:
+        # double hashing: depth indexes from one hash
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key: Hashable) -> int:
+        """Count one occurrence of `key` and return its new estimate"""
+        self._additions += 1
+        if self._additions >= self.width * 8:
+            self._decay()
+        counts = []
+        for row, index in zip(self._rows, self._indexes(key)):
+            row[index] += 1
+            counts.append(row[index])
+        return min(counts)
+
+    def estimate(self, key: Hashable) -> int:
+        """Estimated count of `key`"""
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def _decay(self):
+        self._additions = 0
+        for row in self._rows:
+            for i, count in enumerate(row):
+                if count:
+                    row[i] = count >> 1
+
+
+@dataclass
+class _Entry:
+    response: SearchResponse
+    expires: float
+    load: Loader
+
+
+class ResultCache:
+    """
+    Stale-while-revalidate cache of SearchResponses; see CacheConfig. Background
+    refreshes run on the event loop of the call that started them.
+    """
+
+    def __init__(self, config: CacheConfig):
+        self.config = config
+        self.popularity = CountMinSketch() if config.refresh_top else None
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self._refresher: asyncio.Task | None = None
+        self._tokens = 0.0
+        self._tokens_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: Hashable, load: Loader) -> SearchResponse:
+        """
+        The cached response for `key`: fresh, or stale within the grace window while
+        it is refreshed in the background; otherwise `load()` is awaited and cached
+        """
+        if self.popularity is not None:
+            self.popularity.add(key)
+            self._start_refresher()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            now = time.monotonic()
+            if now < entry.expires + self.config.stale_ttl:
+                self._entries.move_to_end(key)
+                if now >= entry.expires:
+                    self._refresh(key, entry.load)
+                return entry.response
+            del self._entries[key]
+
+        response = await load()
+        self._store(key, response, load)
+        return response
+
+    def refresh_hot(self) -> int:
+        """
+        Start refreshing the hottest `refresh_top` entries that expire within
+        `refresh_ahead` seconds, as far as the refresh budget allows; returns how many
+        """
+        if self.popularity is None:
+            return 0
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if now >= e.expires + self.config.stale_ttl]:
+            del self._entries[key]
+        burst = max(1.0, self.config.refresh_rate * self.config.refresh_interval)
+        self._tokens = min(burst, self._tokens + (now - self._tokens_at) * self.config.refresh_rate)
+        self._tokens_at = now
+
+        popularity = self.popularity
+        hottest = heapq.nlargest(self.config.refresh_top, self._entries, key=popularity.estimate)
+        started = 0
+        for key in hottest:
+            if self._tokens < 1:
+                break
+            entry = self._entries[key]
+            if key in self._refreshing or entry.expires - now > self.config.refresh_ahead:
+                continue
+            self._refresh(key, entry.load)
+            self._tokens -= 1
+            started += 1
+        return started
+
+    def close(self):
+        """Cancel the background refreshes"""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        for task in list(self._refreshing.values()):
+            task.cancel()
+
+    def _store(self, key: Hashable, response: SearchResponse, load: Loader):
+        # partial results are not reused; a stale entry stays until its grace window ends
+        if not all(status.ok for status in response.statuses.values()):
+            return
+        self._entries[key] = _Entry(response, time.monotonic() + self.config.ttl, load)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.maxsize:
+            self._entries.popitem(last=False)
+
+    def _refresh(self, key: Hashable, load: Loader):
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._reload(key, load))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _reload(self, key: Hashable, load: Loader):
+        try:
+            response = await load()
+        except Exception:
+            return
+        self._store(key, response, load)
+
+    def _start_refresher(self):
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_hot_periodically())
+
+    async def _refresh_hot_periodically(self):
+        # stops once the cache is empty; the next lookup starts it again
+        while self._entries:
+            await asyncio.sleep(self.config.refresh_interval)
+            self.refresh_hot()
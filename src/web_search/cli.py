@@ -0,0 +1,224 @@
+"""
+Run many queries through WebSearch and stream the results as JSON lines.
+
+    web-search queries.txt --sources google arxiv --concurrency 16 -o results.jsonl
+    cat queries.txt | web-search - --sources github > results.jsonl
+    web-search queries.txt -o results.jsonl --resume   # skip queries already in results.jsonl
+
+Each input line is one query. Each output line is
+{"query", "results", "errors", "elapsed"}, written as soon as the query finishes,
+so output order follows completion order. A summary is printed to stderr at the end.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import IO, Dict, Iterator, List, Set
+
+import httpx
+
+from . import registry
+from .config import CacheConfig, WebSearchConfig
+from .search import WebSearch
+
+
+@dataclass
+class RunSummary:
+    queries: int = 0
+    skipped: int = 0
+    failed: int = 0
+    """queries on which every source failed"""
+    results: int = 0
+    source_errors: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def report(self) -> str:
+        """One line of totals, then the error count of each failing source"""
+        rate = self.queries / self.elapsed if self.elapsed else 0.0
+        lines = [
+            f"{self.queries} queries in {self.elapsed:.1f}s ({rate:.1f}/s), {self.results} results, "
+            f"{self.failed} failed, {self.skipped} skipped"
+        ]
+        lines += [f"  {source}: {count} errors" for source, count in sorted(self.source_errors.items())]
+        return "\n".join(lines)
+
+
+def _key(query: str) -> bytes:
+    # compact, so resuming a long run does not hold every query string
+    return hashlib.blake2b(query.encode(), digest_size=8).digest()
+
+
+def completed_queries(path: str) -> Set[bytes]:
+    """Keys of the queries already written to an output file"""
+    done: Set[bytes] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                done.add(_key(json.loads(line)["query"]))
+            except (ValueError, KeyError, TypeError):
+                continue  # e.g. a line cut short by an interrupted run
+    return done
+
+
+def _drop_partial_line(path: str):
+    """Cut a trailing line left unfinished by an interrupted run, so appending starts on a fresh line"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        size = end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            f.truncate(end)
+
+
+def read_queries(lines: Iterator[str]) -> Iterator[str]:
+    for line in lines:
+        query = line.strip()
+        if query:
+            yield query
+
+
+async def run(
+    search: WebSearch,
+    queries: Iterator[str],
+    out: IO[str],
+    concurrency: int = 8,
+    skip: Set[bytes] | None = None,
+    max_results: int | None = None,
+    timeout: float | None = None,
+) -> RunSummary:
+    """
+    Search every query with at most `concurrency` in flight, writing one JSON line
+    per query as it finishes. Queries are read lazily, so memory does not grow
+    with the input.
+    """
+    summary = RunSummary()
+    pending: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    start = time.perf_counter()
+
+    async def produce():
+        try:
+            while True:
+                # reading may block on a pipe, so it runs off the event loop
+                query = await asyncio.to_thread(next, queries, None)
+                if query is None:
+                    break
+                # only queries already in the output are skipped, so memory stays flat
+                if skip is not None and _key(query) in skip:
+                    summary.skipped += 1
+                    continue
+                await pending.put(query)
+        finally:
+            for _ in range(concurrency):
+                await pending.put(None)
+
+    async def consume():
+        while (query := await pending.get()) is not None:
+            began = time.perf_counter()
+            response = await search.fetch(query, max_results=max_results, timeout=timeout)
+            errors = {
+                source: f"{type(status.error).__name__}: {status.error}"
+                for source, status in response.statuses.items()
+                if status.error is not None
+            }
+            record = {
+                "query": query,
+                "results": response.to_dicts(),
+                "errors": errors,
+                "elapsed": round(time.perf_counter() - began, 3),
+            }
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+            summary.queries += 1
+            summary.results += len(response.results)
+            if errors and len(errors) == len(response.statuses):
+                summary.failed += 1
+            for source in errors:
+                summary.source_errors[source] = summary.source_errors.get(source, 0) + 1
+
+    await asyncio.gather(produce(), *(consume() for _ in range(concurrency)))
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def build_config(args: argparse.Namespace) -> WebSearchConfig:
+    # a repeated query that arrives after an earlier copy finished is served from the cache
+    return WebSearchConfig(sources=args.sources, cache=CacheConfig(ttl=3600, maxsize=1024))
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="web-search", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input", nargs="?", default="-", help="file with one query per line, or - for stdin")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("--resume", action="store_true", help="append to --output, skipping queries already in it")
+    parser.add_argument("--sources", nargs="+", default=["google"], help=f"any of {', '.join(registry.sources())}")
+    parser.add_argument("--max-results", type=int, help="results per source (default: 3)")
+    parser.add_argument("--timeout", type=float, help="upstream request timeout in seconds")
+    parser.add_argument("--concurrency", type=int, default=8, help="queries in flight")
+    args = parser.parse_args(argv)
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    for source in args.sources:
+        try:
+            registry.get(source)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+
+async def _main(args: argparse.Namespace, **client_options) -> RunSummary:
+    skip = None
+    if args.resume:
+        _drop_partial_line(args.output)
+        skip = completed_queries(args.output)
+    source = sys.stdin if args.input == "-" else open(args.input)
+    out = open(args.output, "a" if args.resume else "w") if args.output else sys.stdout
+    client_options.setdefault("limits", httpx.Limits(max_connections=max(20, args.concurrency * 4)))
+    try:
+        async with httpx.AsyncClient(**client_options) as client:
+            search = WebSearch(build_config(args), client=client)
+            queries = read_queries(source)
+            return await run(search, queries, out, args.concurrency, skip, args.max_results, args.timeout)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Entry point of the `web-search` console script"""
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    except ImportError:
+        pass
+
+    args = parse_args(argv)
+    summary = asyncio.run(_main(args))
+    print(summary.report(), file=sys.stderr)
+    return 1 if summary.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,43 @@
 import os
 from dataclasses import dataclass, field
-from typing import Literal, List
+from typing import TYPE_CHECKING, Dict, Literal, List
+
+if TYPE_CHECKING:
+    from .negative_cache import NegativeCache
+    from .scheduler import ScrapeScheduler
 
 SearchSources = Literal["google", "wikipedia", "arxiv", "newsapi", "github", "pubmed"]
 
 
+@dataclass
+class AdaptiveTimeoutConfig:
+    """
+    Timeouts derived from recent latencies, per upstream host (one per API source,
+    one per site for scraped pages): the `percentile` of the last `window` seconds
+    times `multiplier`, clamped to [min_timeout, max_timeout]. Until a host has
+    `min_samples` requests in the window, the configured timeout applies.
+    """
+
+    percentile: float = 95.0
+    multiplier: float = 2.0
+    min_timeout: float = 1.0
+    max_timeout: float = 30.0
+    window: float = 300.0
+    min_samples: int = 20
+    max_hosts: int = 1024
+
+
 @dataclass
 class BaseConfig:
     max_results: int = 3
     timeout: float | None = None
+    adaptive_timeout: AdaptiveTimeoutConfig | None = None
+    """when set, requests without a call-time timeout use the adaptive one"""
+    max_preview_chars: int | None = 4000
+    """
+    characters kept of each result's preview by the sources that extract whole
+    pages (Wikipedia, scraped Google pages); None keeps everything
+    """
 
 
 @dataclass
@@ -16,6 +45,12 @@ class GoogleSearchConfig(BaseConfig):
     api_key: str = field(default_factory=lambda: os.environ.get("GOOGLE_API_KEY", ""))
     cse_id: str = field(default_factory=lambda: os.environ.get("CSE_ID", ""))
     app_domain: str | None = None
+    scrape_scheduler: "ScrapeScheduler | None" = None
+    """limits on concurrent page scrapes; None shares the process-wide DEFAULT_SCRAPE_SCHEDULER"""
+    negative_cache: "NegativeCache | None" = None
+    """pages that failed to scrape, skipped by later searches; None scrapes every result"""
+    lazy_previews: bool = False
+    """return results at once with the CSE snippet as preview; pages are scraped only by enrich()"""
 
 
 @dataclass
@@ -23,6 +58,48 @@ class NewsAPISearchConfig(BaseConfig):
     api_key: str = field(default_factory=lambda: os.environ.get("NEWS_API_KEY", ""))
 
 
+RankingMethod = Literal["bm25", "rrf", "hybrid"]
+
+
+@dataclass
+class RankingConfig:
+    """
+    Relevance ranking applied to merged results.
+
+    - bm25: score title and preview against the query
+    - rrf: reciprocal-rank fusion of each source's native ordering
+    - hybrid: reciprocal-rank fusion of the BM25 ordering and the native orderings
+    """
+
+    method: RankingMethod = "bm25"
+    top_k: int | None = None
+    k1: float = 1.5
+    b: float = 0.75
+    rrf_k: int = 60
+
+
+@dataclass
+class CacheConfig:
+    """
+    In-memory cache of fetched responses, keyed by query, sources, max_results and timeout.
+
+    An entry is fresh for `ttl` seconds, then served stale for up to `stale_ttl`
+    more while a background task refreshes it. With `refresh_top`, the hottest
+    queries (counted in a count-min sketch) are also refreshed up to `refresh_ahead`
+    seconds before they expire, at most `refresh_rate` queries per second, checked
+    every `refresh_interval` seconds. Responses with a failed source are not cached.
+    Cached responses are shared between callers; treat them as read-only.
+    """
+
+    ttl: float = 300.0
+    stale_ttl: float = 60.0
+    maxsize: int = 1024
+    refresh_top: int = 0
+    refresh_ahead: float = 30.0
+    refresh_rate: float = 1.0
+    refresh_interval: float = 5.0
+
+
 @dataclass
 class WebSearchConfig:
     sources: List[SearchSources] = field(default_factory=lambda: ["google"])
@@ -32,3 +109,7 @@ class WebSearchConfig:
     newsapi_config: NewsAPISearchConfig | None = None
     github_config: BaseConfig | None = None
     pubmed_config: BaseConfig | None = None
+    ranking: RankingConfig | None = None
+    cache: CacheConfig | None = None
+    provider_configs: Dict[str, BaseConfig] = field(default_factory=dict)
+    """configs of sources without a field above, such as entry-point providers, by source name"""
@@ -1,25 +1,38 @@
-from typing import Dict, List
+import time
+from typing import Dict, List, Sequence
 
 import httpx
 
 from .base import BaseSearch, SearchResult
 from .config import BaseConfig
+from .hooks import SearchHooks
 
 
 class GitHubSearch(BaseSearch):
+    source = "github"
     github_config: BaseConfig
 
-    def __init__(self, github_config: BaseConfig | None = None):
+    def __init__(
+        self,
+        github_config: BaseConfig | None = None,
+        client: httpx.AsyncClient | None = None,
+        hooks: Sequence[SearchHooks] = (),
+    ):
         self.github_config = github_config if github_config else BaseConfig()
+        super().__init__(self.github_config, client, hooks)
 
-    async def _handle(self, query: str) -> List[SearchResult]:
-        return await self._search(query)
+    async def _handle(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
+        return await self._search(query, max_results, timeout)
 
-    async def _compile(self, query: str) -> str:
-        results = await self._search(query)
+    async def _compile(self, query: str, max_results: int | None = None, timeout: float | None = None) -> str:
+        results = await self._search(query, max_results, timeout)
         return "\n\n".join(str(r) for r in results)
 
-    async def _search(self, query: str) -> List[SearchResult]:
+    async def _search(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
         """
         Search GitHub repositories
         """
@@ -29,16 +42,16 @@ class GitHubSearch(BaseSearch):
         GITHUB_URL = "https://api.github.com/search/repositories"
         params = {
             "q": query,
-            "per_page": self.github_config.max_results,
+            "per_page": self._max_results(max_results),
             "sort": "stars",
             "order": "desc",
         }
 
-        async with httpx.AsyncClient(timeout=self.github_config.timeout) as client:
-            response = await client.get(GITHUB_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+        response = await self._get(GITHUB_URL, timeout, params=params)
+        response.raise_for_status()
 
+        start = time.perf_counter()
+        data = response.json()
         items = data.get("items", [])
         sources: List[SearchResult] = []
         for item in items:
@@ -46,6 +59,7 @@ class GitHubSearch(BaseSearch):
             if source:
                 sources.append(source)
 
+        self._parsed(start, len(sources))
         return sources
 
     def _extract_search_result(self, item: Dict):
@@ -60,6 +74,6 @@ class GitHubSearch(BaseSearch):
                     preview=preview,
                     source="github",
                 )
-        except Exception:
-            pass
+        except Exception as e:
+            self._suppress(e)
         return None
@@ -1,30 +1,49 @@
 import asyncio
-from typing import Any, Coroutine, Dict, List
-from urllib.parse import unquote
+import dataclasses
+import time
+from typing import Any, Coroutine, Dict, List, Sequence
+from urllib.parse import unquote, urlsplit
 
 import httpx
 from bs4 import BeautifulSoup
 
 from .base import BaseSearch, SearchResult
 from .config import GoogleSearchConfig
+from .hooks import SearchHooks
+from .scheduler import DEFAULT_SCRAPE_SCHEDULER, ScrapeScheduler
+from .text import extract_passages
 
 GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
 
 
 class GoogleSearch(BaseSearch):
+    source = "google"
     google_config: GoogleSearchConfig
 
-    def __init__(self, google_config: GoogleSearchConfig | None = None):
+    def __init__(
+        self,
+        google_config: GoogleSearchConfig | None = None,
+        client: httpx.AsyncClient | None = None,
+        hooks: Sequence[SearchHooks] = (),
+    ):
         self.google_config = google_config if google_config else GoogleSearchConfig()
+        super().__init__(self.google_config, client, hooks)
 
-    async def _handle(self, query: str) -> List[SearchResult]:
-        return await self._search(query)
+    @property
+    def scheduler(self) -> ScrapeScheduler:
+        """limits on concurrent page scrapes, shared across searches"""
+        return self.google_config.scrape_scheduler or DEFAULT_SCRAPE_SCHEDULER
 
-    async def _compile(self, query: str):
-        results = await self._search(query)
+    async def _handle(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
+        return await self._search(query, max_results, timeout)
+
+    async def _compile(self, query: str, max_results: int | None = None, timeout: float | None = None):
+        results = await self._search(query, max_results, timeout)
         return "\n\n".join(str(r) for r in results if r.preview)
 
-    async def _search(self, query: str, **kwargs):
+    async def _search(self, query: str, max_results: int | None = None, timeout: float | None = None, **kwargs):
         """
         Google search using the Custom Search Engine API
         """
@@ -40,15 +59,16 @@ class GoogleSearch(BaseSearch):
         params.update(kwargs)
         headers = {"Referer": self.google_config.app_domain or ""}
 
-        async with httpx.AsyncClient(timeout=self.google_config.timeout) as client:
-            response = await client.get(GOOGLE_SEARCH_URL, params=params, headers=headers)
-            response.raise_for_status()
-            json_data = response.json()
+        response = await self._get(GOOGLE_SEARCH_URL, timeout, params=params, headers=headers)
+        response.raise_for_status()
+        json_data = response.json()
 
-        items = json_data.get("items", [])[: self.google_config.max_results]
-        return await self._extract_relevant_items(items)
+        items = json_data.get("items", [])[: self._max_results(max_results)]
+        return await self._extract_relevant_items(items, query, timeout)
 
-    async def _extract_relevant_items(self, search_results: List[Dict[str, Any]]) -> List[SearchResult]:
+    async def _extract_relevant_items(
+        self, search_results: List[Dict[str, Any]], query: str = "", timeout: float | None = None
+    ) -> List[SearchResult]:
         """
         Extract relevant items from the search results
         """
@@ -56,8 +76,11 @@ class GoogleSearch(BaseSearch):
 
         for item in search_results:
             url = item.get("link")
-            if url and self._is_valid_url(url):
-                tasks.append(self._process_search_item(url, item))
+            if not (url and self._is_valid_url(url)):
+                continue
+            # lazy previews keep known-bad links: their snippet is still good
+            if self.google_config.lazy_previews or not self._is_known_bad(url):
+                tasks.append(self._process_search_item(url, item, query, timeout))
 
         if not len(tasks):
             return []
@@ -65,6 +88,29 @@ class GoogleSearch(BaseSearch):
         results = await asyncio.gather(*tasks, return_exceptions=True)
         return [item for item in results if isinstance(item, SearchResult)]
 
+    async def enrich(
+        self, results: Sequence[SearchResult], query: str = "", timeout: float | None = None
+    ) -> List[SearchResult]:
+        """
+        Scrape the pages of the given Google results, e.g. the lazy_previews results kept
+        after ranking, and return them with the page passages as preview. A result whose
+        page yields nothing, or is known to fail, keeps its snippet; results of other
+        sources pass through.
+        """
+
+        async def scrape(result: SearchResult) -> SearchResult:
+            if result.source != self.source or self._is_known_bad(result.url):
+                return result
+            content = await self._scrape_page_content(result.url, query, timeout)
+            return dataclasses.replace(result, preview=content) if content else result
+
+        return list(await asyncio.gather(*(scrape(result) for result in results)))
+
+    def _is_known_bad(self, url: str) -> bool:
+        """whether a recent scrape of the url or its host failed, per the configured negative cache"""
+        negative_cache = self.google_config.negative_cache
+        return negative_cache is not None and negative_cache.is_known_bad(url)
+
     def _is_valid_url(self, url: str) -> bool:
         invalid_extensions = (
             ".pdf",
@@ -80,11 +126,17 @@ class GoogleSearch(BaseSearch):
         invalid_domains = ("youtube.com", "vimeo.com", "facebook.com", "twitter.com")
         return not (url.endswith(invalid_extensions) or any(domain in url for domain in invalid_domains))
 
-    async def _process_search_item(self, url: str, item: Dict[str, Any]):
+    async def _process_search_item(
+        self, url: str, item: Dict[str, Any], query: str = "", timeout: float | None = None
+    ) -> SearchResult:
         """
-        Process a search url - includes scraping the webpage and cleaning the data
+        Process a search url - includes scraping the webpage and extracting the passages relevant to the query,
+        unless lazy_previews is set
         """
-        content = await self._scrape_page_content(url)
+        if self.google_config.lazy_previews:
+            content = self._snippet(item)
+        else:
+            content = await self._scrape_page_content(url, query, timeout)
         return SearchResult(
             url=url,
             title=item.get("title", ""),
@@ -92,44 +144,79 @@ class GoogleSearch(BaseSearch):
             source="google",
         )
 
-    async def _scrape_page_content(self, url: str) -> str:
+    def _snippet(self, item: Dict[str, Any]) -> str:
+        """the CSE snippet of a result, or the page's meta description when that says more"""
+        snippet = " ".join(item.get("snippet", "").split())
+        for metatags in item.get("pagemap", {}).get("metatags", [])[:1]:
+            description = metatags.get("og:description") or metatags.get("description") or ""
+            description = " ".join(description.split())
+            if len(description) > len(snippet):
+                snippet = description
+        return snippet
+
+    async def _scrape_page_content(self, url: str, query: str = "", timeout: float | None = None) -> str:
         """
         Fetch and extract content from a webpage
         """
+        host = urlsplit(url).hostname or ""
+        # one deadline covers both waiting for a scrape slot and the fetch itself
+        timeout = self._timeout(timeout, host)
+        deadline = None if timeout is None else time.monotonic() + timeout
         try:
-            async with httpx.AsyncClient(timeout=self.google_config.timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, "lxml")
-            # Remove unwanted elements
-            for element in soup.find_all(["script", "style", "nav", "header", "footer", "ads"]):
-                element.decompose()
-
-            content_elements = soup.find_all(
-                ["article", "main", "div"],
-                class_=["content", "article", "post", "entry", "main-content"],
-            )
-
-            if not content_elements:
-                # Fallback to paragraph extraction if no main content container found
-                content_elements = soup.find_all("p")
-
-            # Extract text from found elements
-            content = "\n".join(
-                element.get_text(strip=True) for element in content_elements if element.get_text(strip=True)
-            )
-
-            # If still no content, try getting all text
-            if not content:
-                content = soup.get_text(strip=True)
-
-            return self._clean_content(content)
-        except Exception:
+            async with self.scheduler.slot(host, timeout):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise asyncio.TimeoutError()
+                response = await self._get(url, remaining)
+            response.raise_for_status()
+
+            start = time.perf_counter()
+            content = self._extract_passages(self._extract_page_content(response.text), query)
+            self._parsed(start, 1 if content else 0)
+        except Exception as e:
+            self._suppress(e)
+            # waiting too long for a scrape slot is no fault of the page
+            if self.google_config.negative_cache is not None and not isinstance(e, asyncio.TimeoutError):
+                self.google_config.negative_cache.record_failure(url)
             return ""
+        if self.google_config.negative_cache is not None:
+            self.google_config.negative_cache.record_success(url)
+        return content
+
+    def _extract_page_content(self, html: str) -> str:
+        """
+        Extract the main text content of an HTML page
+        """
+        soup = BeautifulSoup(html, "lxml")
+        # Remove unwanted elements
+        for element in soup.find_all(["script", "style", "nav", "header", "footer", "ads"]):
+            element.decompose()
+
+        content_elements = soup.find_all(
+            ["article", "main", "div"],
+            class_=["content", "article", "post", "entry", "main-content"],
+        )
+
+        if not content_elements:
+            # Fallback to paragraph extraction if no main content container found
+            content_elements = soup.find_all("p")
+
+        # Extract text from found elements, keeping a space between adjacent tags so sentences stay apart
+        texts = (element.get_text(" ", strip=True) for element in content_elements)
+        content = "\n".join(text for text in texts if text)
+
+        # If still no content, try getting all text
+        if not content:
+            content = soup.get_text(" ", strip=True)
+
+        return self._clean_content(content)
 
     def _clean_content(self, content: str) -> str:
-        """Remove very short lines (likely navigation/menu items)"""
-        content = " ".join(content.split())
-        lines = [line for line in content.split("\n") if len(line) > 30]
-        return "\n".join(lines)
+        """Collapse whitespace within lines and remove very short lines (likely navigation/menu items)"""
+        lines = (" ".join(line.split()) for line in content.splitlines())
+        return "\n".join(line for line in lines if len(line) > 30)
+
+    def _extract_passages(self, content: str, query: str) -> str:
+        """the passages of the page that best match the query, within the configured max_preview_chars"""
+        limit = self.google_config.max_preview_chars
+        return content if limit is None else extract_passages(content, query, limit)
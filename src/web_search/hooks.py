@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List
+
+if TYPE_CHECKING:
+    import httpx
+
+    from .response import SourceStatus
+
+
+class SearchHooks:
+    """
+    Instrumentation callbacks; subclass and override the ones you need.
+
+    Hooks are called on the event loop, so they must be quick and must not block.
+    """
+
+    def on_source_start(self, source: str, query: str):
+        """a source started searching (WebSearch only)"""
+
+    def on_source_end(self, source: str, status: SourceStatus):
+        """a source finished, successfully or not (WebSearch only)"""
+
+    def on_http_request(self, source: str, url: str):
+        """an upstream request is about to be sent"""
+
+    def http_trace(self, source: str, url: str) -> TraceCallback | None:
+        """an httpcore `trace` extension callback for the request, or None to not trace it"""
+        return None
+
+    def on_http_response(
+        self, source: str, url: str, response: httpx.Response | None, elapsed: float, error: Exception | None
+    ):
+        """an upstream request completed; `response` is None when it raised `error`"""
+
+    def on_parse(self, source: str, elapsed: float, count: int):
+        """an upstream payload was parsed into `count` results"""
+
+
+TraceCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class ChainedTrace:
+    """httpcore `trace` extension calling several trace callbacks in turn, e.g. one per tracing hook"""
+
+    __slots__ = ("traces",)
+
+    def __init__(self, traces: List[TraceCallback]):
+        self.traces = traces
+
+    async def __call__(self, event: str, info: Dict[str, Any]):
+        """Pass the event to every callback"""
+        for trace in self.traces:
+            await trace(event, info)
+
+
+def trace_callbacks(extension: Any) -> List[TraceCallback]:
+    """the callbacks behind a request's `trace` extension"""
+    if extension is None:
+        return []
+    return list(extension.traces) if isinstance(extension, ChainedTrace) else [extension]
+
+
+# the status of the source being searched in the current task, set by WebSearch
+current_status: ContextVar[SourceStatus | None] = ContextVar("current_status", default=None)
@@ -0,0 +1,119 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List
+from urllib.parse import urlsplit
+
+
+class RotatingBloomFilter:
+    """
+    Set membership in fixed memory, with false positives at about `error_rate` and
+    no false negatives. Two generations of `capacity` keys each are kept and rotated
+    every `ttl` seconds, so a key is remembered for one to two `ttl`.
+    """
+
+    def __init__(self, capacity: int = 10_000, error_rate: float = 0.01, ttl: float = 600.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.ttl = ttl
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._current = bytearray((self.size + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._count = 0
+        self._rotated_at = time.monotonic()
+
+    def _indexes(self, key: Hashable) -> List[int]:
+        # double hashing: `hashes` indexes from one hash
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def _rotate(self):
+        now = time.monotonic()
+        # a full generation rotates early, before its error rate climbs past the target
+        if now - self._rotated_at < self.ttl and self._count < self.capacity:
+            return
+        if now - self._rotated_at < 2 * self.ttl:
+            self._previous = self._current
+        else:
+            self._previous = bytearray(len(self._current))
+        self._current = bytearray(len(self._current))
+        self._count = 0
+        self._rotated_at = now
+
+    def add(self, key: Hashable):
+        """Remember `key`"""
+        self._rotate()
+        for index in self._indexes(key):
+            self._current[index >> 3] |= 1 << (index & 7)
+        self._count += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._rotate()
+        indexes = self._indexes(key)
+        return any(all(bits[i >> 3] & (1 << (i & 7)) for i in indexes) for bits in (self._current, self._previous))
+
+    @property
+    def fill(self) -> float:
+        """share of the current generation's bits that are set"""
+        return sum(bin(byte).count("1") for byte in self._current) / self.size
+
+
+class NegativeCache:
+    """
+    Remembers pages that could not be scraped, so later searches skip them instead
+    of paying for the same failure again. A failed URL is skipped for one to two
+    `ttl`; a host is skipped as a whole once `host_failures` scrapes of it failed
+    in a row. Pass one instance to every GoogleSearchConfig that should share it.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        capacity: int = 10_000,
+        error_rate: float = 0.01,
+        host_failures: int = 3,
+        max_hosts: int = 1024,
+    ):
+        self.host_failures = host_failures
+        self.max_hosts = max_hosts
+        self.urls = RotatingBloomFilter(capacity, error_rate, ttl)
+        self.hosts = RotatingBloomFilter(max(1, capacity // 10), error_rate, ttl)
+        self._streaks: "OrderedDict[str, int]" = OrderedDict()
+        self.skipped = 0
+        self.failures = 0
+
+    def is_known_bad(self, url: str) -> bool:
+        """Whether `url`, or its host, failed recently; counted as a skip when it did"""
+        bad = url in self.urls or (urlsplit(url).hostname or "") in self.hosts
+        if bad:
+            self.skipped += 1
+        return bad
+
+    def record_failure(self, url: str):
+        """Remember a scrape of `url` that failed"""
+        self.failures += 1
+        self.urls.add(url)
+        host = urlsplit(url).hostname or ""
+        streak = self._streaks.pop(host, 0) + 1
+        if streak >= self.host_failures:
+            self.hosts.add(host)
+        else:
+            self._streaks[host] = streak
+            while len(self._streaks) > self.max_hosts:
+                self._streaks.popitem(last=False)
+
+    def record_success(self, url: str):
+        """A scrape of `url` succeeded, which ends its host's run of failures"""
+        self._streaks.pop(urlsplit(url).hostname or "", None)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Counters and filter fill ratios, for logs and metrics"""
+        return {
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "url_fill": self.urls.fill,
+            "host_fill": self.hosts.fill,
+            "failing_hosts": len(self._streaks),
+        }
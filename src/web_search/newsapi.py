@@ -1,25 +1,38 @@
-from typing import Dict, List
+import time
+from typing import Dict, List, Sequence
 
 import httpx
 
 from .base import BaseSearch, SearchResult
 from .config import NewsAPISearchConfig
+from .hooks import SearchHooks
 
 
 class NewsAPISearch(BaseSearch):
+    source = "newsapi"
     newsapi_config: NewsAPISearchConfig
 
-    def __init__(self, newsapi_config: NewsAPISearchConfig | None = None):
+    def __init__(
+        self,
+        newsapi_config: NewsAPISearchConfig | None = None,
+        client: httpx.AsyncClient | None = None,
+        hooks: Sequence[SearchHooks] = (),
+    ):
         self.newsapi_config = newsapi_config if newsapi_config else NewsAPISearchConfig()
+        super().__init__(self.newsapi_config, client, hooks)
 
-    async def _handle(self, query: str) -> List[SearchResult]:
-        return await self._search(query)
+    async def _handle(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
+        return await self._search(query, max_results, timeout)
 
-    async def _compile(self, query: str) -> str:
-        results = await self._search(query)
+    async def _compile(self, query: str, max_results: int | None = None, timeout: float | None = None) -> str:
+        results = await self._search(query, max_results, timeout)
         return "\n\n".join(str(r) for r in results)
 
-    async def _search(self, query: str) -> List[SearchResult]:
+    async def _search(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
         """
         Search news articles using NewsAPI
         """
@@ -30,15 +43,15 @@ class NewsAPISearch(BaseSearch):
         params = {
             "q": query,
             "apiKey": self.newsapi_config.api_key,
-            "pageSize": self.newsapi_config.max_results,
+            "pageSize": self._max_results(max_results),
             "sortBy": "relevancy",
         }
 
-        async with httpx.AsyncClient(timeout=self.newsapi_config.timeout) as client:
-            response = await client.get(NEWSAPI_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+        response = await self._get(NEWSAPI_URL, timeout, params=params)
+        response.raise_for_status()
 
+        start = time.perf_counter()
+        data = response.json()
         articles = data.get("articles", [])
         sources: List[SearchResult] = []
         for article in articles:
@@ -46,6 +59,7 @@ class NewsAPISearch(BaseSearch):
             if source:
                 sources.append(source)
 
+        self._parsed(start, len(sources))
         return sources
 
     def _extract_search_result(self, article: Dict):
@@ -55,6 +69,6 @@ class NewsAPISearch(BaseSearch):
             preview = article.get("description", "") or ""
             if preview:
                 return SearchResult(url=url, title=title, preview=preview, source="newsapi")
-        except Exception:
-            pass
+        except Exception as e:
+            self._suppress(e)
         return None
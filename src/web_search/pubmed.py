@@ -1,27 +1,42 @@
 import asyncio
+import time
 import xml.etree.ElementTree as ET
-from typing import Dict, List
+from typing import Dict, List, Sequence
 
 import httpx
 
 from .base import BaseSearch, SearchResult
 from .config import BaseConfig
+from .hooks import SearchHooks
+
+HEADERS = {"User-Agent": "async-web-search/1.0"}
 
 
 class PubMedSearch(BaseSearch):
+    source = "pubmed"
     pubmed_config: BaseConfig
 
-    def __init__(self, pubmed_config: BaseConfig | None = None):
+    def __init__(
+        self,
+        pubmed_config: BaseConfig | None = None,
+        client: httpx.AsyncClient | None = None,
+        hooks: Sequence[SearchHooks] = (),
+    ):
         self.pubmed_config = pubmed_config if pubmed_config else BaseConfig()
+        super().__init__(self.pubmed_config, client, hooks)
 
-    async def _handle(self, query: str) -> List[SearchResult]:
-        return await self._search(query)
+    async def _handle(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
+        return await self._search(query, max_results, timeout)
 
-    async def _compile(self, query: str) -> str:
-        results = await self._search(query)
+    async def _compile(self, query: str, max_results: int | None = None, timeout: float | None = None) -> str:
+        results = await self._search(query, max_results, timeout)
         return "\n\n".join(str(r) for r in results)
 
-    async def _search(self, query: str) -> List[SearchResult]:
+    async def _search(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
         """
         Search PubMed articles
         """
@@ -33,23 +48,23 @@ class PubMedSearch(BaseSearch):
         search_params = {
             "db": "pubmed",
             "term": query,
-            "retmax": self.pubmed_config.max_results,
+            "retmax": self._max_results(max_results),
             "retmode": "json",
         }
 
-        async with httpx.AsyncClient(
-            timeout=self.pubmed_config.timeout, headers={"User-Agent": "async-web-search/1.0"}
-        ) as client:
-            search_response = await client.get(ESEARCH_URL, params=search_params)
-            search_response.raise_for_status()
-            search_data = search_response.json()
+        search_response = await self._get(ESEARCH_URL, timeout, params=search_params, headers=HEADERS)
+        search_response.raise_for_status()
+        search_data = search_response.json()
 
         idlist = search_data.get("esearchresult", {}).get("idlist", [])
         if not idlist:
             return []
 
-        abstracts, summary_data = await asyncio.gather(self._fetch_abstracts(idlist), self._fetch_summaries(idlist))
+        abstracts, summary_data = await asyncio.gather(
+            self._fetch_abstracts(idlist, timeout), self._fetch_summaries(idlist, timeout)
+        )
 
+        start = time.perf_counter()
         result = summary_data.get("result", {})
         sources: List[SearchResult] = []
         for uid in idlist:
@@ -60,39 +75,39 @@ class PubMedSearch(BaseSearch):
                 if source:
                     sources.append(source)
 
+        self._parsed(start, len(sources))
         return sources
 
-    async def _fetch_abstracts(self, idlist: List[str]) -> Dict[str, str]:
+    async def _fetch_abstracts(self, idlist: List[str], timeout: float | None = None) -> Dict[str, str]:
         """Fetch abstracts for given PubMed IDs"""
         EFETCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
         fetch_params = {"db": "pubmed", "id": ",".join(idlist), "retmode": "xml", "rettype": "abstract"}
 
         try:
-            async with httpx.AsyncClient(
-                timeout=self.pubmed_config.timeout, headers={"User-Agent": "async-web-search/1.0"}
-            ) as client:
-                fetch_response = await client.get(EFETCH_URL, params=fetch_params)
-                fetch_response.raise_for_status()
-                xml_data = fetch_response.text
-
-            # Parse XML to extract abstracts
-            root = ET.fromstring(xml_data)
-            abstracts = {}
-
-            for article in root.findall(".//PubmedArticle"):
-                pmid_elem = article.find(".//PMID")
-                abstract_elem = article.find(".//AbstractText")
-
-                if pmid_elem is not None and abstract_elem is not None:
-                    pmid = pmid_elem.text
-                    abstract_text = "".join(abstract_elem.itertext())
-                    abstracts[pmid] = abstract_text
-
-            return abstracts
-        except Exception:
+            fetch_response = await self._get(EFETCH_URL, timeout, params=fetch_params, headers=HEADERS)
+            fetch_response.raise_for_status()
+            return self._parse_abstracts(fetch_response.text)
+        except Exception as e:
+            self._suppress(e)
             return {}
 
-    async def _fetch_summaries(self, idlist: List[str]) -> Dict:
+    def _parse_abstracts(self, xml_data: str) -> Dict[str, str]:
+        """Parse efetch XML into abstracts by PubMed ID"""
+        root = ET.fromstring(xml_data)
+        abstracts = {}
+
+        for article in root.findall(".//PubmedArticle"):
+            pmid_elem = article.find(".//PMID")
+            abstract_elem = article.find(".//AbstractText")
+
+            if pmid_elem is not None and abstract_elem is not None:
+                pmid = pmid_elem.text
+                abstract_text = "".join(abstract_elem.itertext())
+                abstracts[pmid] = abstract_text
+
+        return abstracts
+
+    async def _fetch_summaries(self, idlist: List[str], timeout: float | None = None) -> Dict:
         """Fetch summaries for given PubMed IDs"""
         ESUMMARY_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
         summary_params = {
@@ -101,12 +116,9 @@ class PubMedSearch(BaseSearch):
             "retmode": "json",
         }
 
-        async with httpx.AsyncClient(
-            timeout=self.pubmed_config.timeout, headers={"User-Agent": "async-web-search/1.0"}
-        ) as client:
-            summary_response = await client.get(ESUMMARY_URL, params=summary_params)
-            summary_response.raise_for_status()
-            return summary_response.json()
+        summary_response = await self._get(ESUMMARY_URL, timeout, params=summary_params, headers=HEADERS)
+        summary_response.raise_for_status()
+        return summary_response.json()
 
     def _build_preview(self, article: Dict) -> str:
         """
@@ -141,6 +153,6 @@ class PubMedSearch(BaseSearch):
                 preview=preview,
                 source="pubmed",
             )
-        except Exception:
-            pass
+        except Exception as e:
+            self._suppress(e)
         return None
@@ -0,0 +1,81 @@
+import math
+from collections import Counter
+from typing import Dict, List, Sequence
+
+from .base import SearchResult
+from .config import RankingConfig
+from .text import tokenize
+
+
+def bm25_scores(query: str, results: Sequence[SearchResult], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """
+    Score each result's title and preview against the query with Okapi BM25.
+
+    Documents are tokenized once into a term matrix restricted to the query
+    vocabulary, so scoring stays linear in the total text length.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not results:
+        return [0.0] * len(results)
+
+    column = {term: i for i, term in enumerate(terms)}
+    matrix: List[List[int]] = []
+    lengths: List[int] = []
+    for result in results:
+        tokens = tokenize(f"{result.title} {result.preview}")
+        row = [0] * len(terms)
+        for token, count in Counter(tokens).items():
+            i = column.get(token)
+            if i is not None:
+                row[i] = count
+        matrix.append(row)
+        lengths.append(len(tokens))
+
+    n_docs = len(results)
+    avgdl = (sum(lengths) / n_docs) or 1.0
+    doc_freq = [sum(1 for row in matrix if row[i]) for i in range(len(terms))]
+    idf = [math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) for df in doc_freq]
+
+    scores: List[float] = []
+    for row, length in zip(matrix, lengths):
+        norm = k1 * (1 - b + b * length / avgdl)
+        scores.append(sum(w * tf * (k1 + 1) / (tf + norm) for w, tf in zip(idf, row) if tf))
+    return scores
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[SearchResult]], k: int = 60) -> List[SearchResult]:
+    """
+    Fuse several orderings into one; results sharing a URL are merged
+    """
+    scores: Dict[object, float] = {}
+    first_seen: Dict[object, SearchResult] = {}
+    for ranking in rankings:
+        for rank, result in enumerate(ranking, start=1):
+            key = result.url or id(result)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            first_seen.setdefault(key, result)
+
+    ordered = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [first_seen[key] for key in ordered]
+
+
+def rank_results(
+    query: str, results_by_source: Sequence[List[SearchResult]], config: RankingConfig
+) -> List[SearchResult]:
+    """
+    Rank merged results from several sources and truncate to the configured top-k
+    """
+    merged = [result for results in results_by_source for result in results]
+
+    if config.method == "rrf":
+        ranked = reciprocal_rank_fusion(results_by_source, k=config.rrf_k)
+    else:
+        scores = bm25_scores(query, merged, k1=config.k1, b=config.b)
+        order = sorted(range(len(merged)), key=lambda i: scores[i], reverse=True)
+        ranked = [merged[i] for i in order]
+        if config.method == "hybrid":
+            ranked = reciprocal_rank_fusion([ranked, *results_by_source], k=config.rrf_k)
+
+    if config.top_k is not None:
+        ranked = ranked[: config.top_k]
+    return ranked
@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from importlib import import_module, metadata
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+if TYPE_CHECKING:
+    from .base import BaseSearch
+
+ENTRY_POINT_GROUP = "web_search.providers"
+"""entry-point group third-party providers register under, as `name = "package.module:ProviderClass"`"""
+
+
+@dataclass
+class ProviderSpec:
+    """
+    Where a source's provider lives. `target` is "module:Class", imported on first
+    use; a module starting with "." is relative to this package, wherever it was
+    imported from. `config` names the WebSearchConfig field holding its config, if any.
+    """
+
+    source: str
+    target: str
+    config: str | None = None
+
+    def load(self) -> Callable[..., "BaseSearch"]:
+        """import the provider class"""
+        module, _, name = self.target.partition(":")
+        return getattr(import_module(module, __package__), name)
+
+
+# in the order results are merged when ranking is off
+_registry: Dict[str, ProviderSpec] = {
+    spec.source: spec
+    for spec in (
+        ProviderSpec("google", ".google:GoogleSearch", "google_config"),
+        ProviderSpec("wikipedia", ".wikipedia_:WikipediaSearch", "wiki_config"),
+        ProviderSpec("arxiv", ".arxiv:ArxivSearch", "arxiv_config"),
+        ProviderSpec("newsapi", ".newsapi:NewsAPISearch", "newsapi_config"),
+        ProviderSpec("github", ".github:GitHubSearch", "github_config"),
+        ProviderSpec("pubmed", ".pubmed:PubMedSearch", "pubmed_config"),
+    )
+}
+_entry_points_loaded = False
+
+
+def register(source: str, target: str, config: str | None = None):
+    """
+    Register (or replace) the provider of a source. The provider is called as
+    `provider(config, client=client, hooks=hooks)`.
+    """
+    _registry[source] = ProviderSpec(source, target, config)
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+        # built-in sources are not overridden by installed packages
+        _registry.setdefault(entry_point.name, ProviderSpec(entry_point.name, entry_point.value))
+
+
+def get(source: str) -> ProviderSpec:
+    """The provider spec of a source; raises ValueError for unknown sources"""
+    if source not in _registry:
+        _load_entry_points()
+    try:
+        return _registry[source]
+    except KeyError:
+        raise ValueError(f"Unknown search source: {source!r}") from None
+
+
+def sources() -> List[str]:
+    """Every registered source, built-in ones first"""
+    _load_entry_points()
+    return list(_registry)
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from .base import SearchResult
+from .budget import BudgetUnit, GroupCompiler, budget_chars
+
+
+@dataclass
+class SourceStatus:
+    """
+    Diagnostics of one source in one search: elapsed seconds, result count, the
+    error that failed it, upstream HTTP calls and bytes, and errors it recovered
+    from (e.g. a page that could not be scraped)
+    """
+
+    source: str
+    elapsed: float = 0.0
+    count: int = 0
+    error: Exception | None = None
+    http_calls: int = 0
+    bytes_received: int = 0
+    suppressed: List[Exception] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether the source completed without an error"""
+        return self.error is None
+
+
+@dataclass
+class SearchResponse:
+    """
+    Results of a single fetch across sources, with JSON and compiled text views
+    computed from the same results
+    """
+
+    query: str
+    results: List[SearchResult]
+    statuses: Dict[str, SourceStatus] = field(default_factory=dict)
+    ranked: bool = False
+
+    _compiled: Dict[Tuple[int | None, BudgetUnit], str] = field(default_factory=dict, init=False, repr=False)
+
+    def to_dicts(self) -> List[Dict[str, str]]:
+        """
+        JSON-serializable results, as a new list of new dicts on every call, so
+        callers of a shared (e.g. cached) response cannot change each other's results
+        """
+        return [result.to_dict() for result in self.results]
+
+    def compile(self, budget: int | None = None, unit: BudgetUnit = "chars") -> str:
+        """
+        Compile the results into a string, optionally within a character or token budget
+        """
+        key = (budget, unit)
+        if key not in self._compiled:
+            self._compiled[key] = "".join(self._compile_chunks(budget, unit))
+        return self._compiled[key]
+
+    def _compile_chunks(self, budget: int | None, unit: BudgetUnit):
+        if self.ranked:
+            groups = [self.results]
+        else:
+            by_source: Dict[str, List[SearchResult]] = {}
+            for result in self.results:
+                by_source.setdefault(result.source, []).append(result)
+            groups = list(by_source.values())
+
+        compiler = GroupCompiler(len(groups), budget_chars(budget, unit) if budget is not None else None)
+        for results in groups:
+            yield from compiler.feed(results)
@@ -0,0 +1,119 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Tuple
+from weakref import WeakKeyDictionary
+
+
+class _LoopState:
+    def __init__(self):
+        self.active = 0
+        self.per_host: Dict[str, int] = {}
+        self.waiters: Deque[Tuple[str, asyncio.Future]] = deque()
+
+
+class ScrapeScheduler:
+    """
+    Admission control for page scrapes shared by every search: at most
+    `max_concurrency` scrapes in flight and at most `per_host` against one host.
+
+    Waiting scrapes are started in arrival order, skipping only those whose host
+    is at its limit, so one query's pages cannot starve another's. A scrape that
+    is cancelled or times out while waiting gives up its place at once. Limits
+    apply per event loop.
+    """
+
+    def __init__(self, max_concurrency: int = 32, per_host: int = 4):
+        if max_concurrency < 1 or per_host < 1:
+            raise ValueError("max_concurrency and per_host must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self._states: "WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = WeakKeyDictionary()
+
+    @property
+    def active(self) -> int:
+        """scrapes in flight on the running loop"""
+        return self._state().active
+
+    @property
+    def waiting(self) -> int:
+        """scrapes waiting for a slot on the running loop"""
+        return len(self._state().waiters)
+
+    @asynccontextmanager
+    async def slot(self, host: str, timeout: float | None = None) -> AsyncIterator[None]:
+        """
+        Hold a scrape slot for `host`; raises asyncio.TimeoutError when none frees up within `timeout` seconds
+        """
+        state = self._state()
+        if not state.waiters and self._has_room(state, host):
+            self._acquire(state, host)
+        else:
+            await self._wait(state, host, timeout)
+        try:
+            yield
+        finally:
+            self._release(state, host)
+
+    async def _wait(self, state: _LoopState, host: str, timeout: float | None):
+        future = asyncio.get_running_loop().create_future()
+        waiter = (host, future)
+        state.waiters.append(waiter)
+        self._wake(state)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # granted just as the caller gave up: pass the slot on
+                self._release(state, host)
+            else:
+                future.cancel()
+                try:
+                    state.waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState()
+        return state
+
+    def _has_room(self, state: _LoopState, host: str) -> bool:
+        return state.active < self.max_concurrency and state.per_host.get(host, 0) < self.per_host
+
+    def _acquire(self, state: _LoopState, host: str):
+        state.active += 1
+        state.per_host[host] = state.per_host.get(host, 0) + 1
+
+    def _release(self, state: _LoopState, host: str):
+        state.active -= 1
+        remaining = state.per_host[host] - 1
+        if remaining:
+            state.per_host[host] = remaining
+        else:
+            del state.per_host[host]
+        self._wake(state)
+
+    def _wake(self, state: _LoopState):
+        """grant slots to waiters in arrival order, skipping those whose host is full"""
+        if state.active >= self.max_concurrency:
+            return
+        blocked: Deque[Tuple[str, asyncio.Future]] = deque()
+        while state.waiters and state.active < self.max_concurrency:
+            host, future = state.waiters.popleft()
+            if future.done():
+                continue
+            if self._has_room(state, host):
+                self._acquire(state, host)
+                future.set_result(None)
+            else:
+                blocked.append((host, future))
+        blocked.extend(state.waiters)
+        state.waiters = blocked
+
+
+DEFAULT_SCRAPE_SCHEDULER = ScrapeScheduler()
+"""the scheduler of every GoogleSearch whose config does not set its own"""
@@ -1,69 +1,326 @@
+from __future__ import annotations
+
 import asyncio
-from typing import Any, Coroutine, Dict, List
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+from . import registry
+from .base import BaseSearch, SearchResult
+from .cache import ResultCache
+from .budget import BudgetUnit, GroupCompiler, budget_chars
+from .config import SearchSources, WebSearchConfig
+from .hooks import SearchHooks, current_status
+from .ranking import rank_results
+from .response import SearchResponse, SourceStatus
+
+if TYPE_CHECKING:
+    import httpx
 
-from .arxiv import ArxivSearch
-from .base import SearchResult
-from .config import WebSearchConfig
-from .github import GitHubSearch
-from .google import GoogleSearch
-from .newsapi import NewsAPISearch
-from .pubmed import PubMedSearch
-from .wikipedia_ import WikipediaSearch
+
+_OWN_ATTRIBUTES = frozenset({"config", "client", "hooks", "cache"})
 
 
 class WebSearch:
     config: WebSearchConfig
+    client: httpx.AsyncClient | None = None
+    hooks: Sequence[SearchHooks] = ()
+    cache: ResultCache | None = None
+
+    def __init__(
+        self,
+        config: WebSearchConfig | None = None,
+        client: httpx.AsyncClient | None = None,
+        hooks: Sequence[SearchHooks] = (),
+    ):
+        """
+        `client` is an optional httpx.AsyncClient shared by all providers, so that
+        connections are reused across searches; its lifecycle is owned by the caller.
 
-    def __init__(self, config: WebSearchConfig | None = None):
+        `hooks` are SearchHooks notified of source, HTTP and parse events.
+
+        Providers are imported and built on first use, so a search over GitHub
+        alone never loads the HTML parsers or the wikipedia library.
+        """
+        self._providers_by_source: Dict[str, BaseSearch] = {}
         self.config = config if config else WebSearchConfig()
+        self.client = client
+        self.hooks = hooks
+        self.cache = ResultCache(self.config.cache) if self.config.cache else None
+
+    def __getattr__(self, name: str) -> BaseSearch:
+        # only called for missing attributes: the provider of a registered source, e.g. `search.github`
+        if name == "_providers_by_source":
+            # set up here as well, for instances whose __init__ was bypassed (e.g. patched in tests)
+            providers: Dict[str, BaseSearch] = {}
+            object.__setattr__(self, name, providers)
+            return providers  # type: ignore[return-value]
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self.provider(name)
+        except ValueError:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}") from None
 
-        self.google = GoogleSearch(google_config=self.config.google_config)
-        self.arxiv = ArxivSearch(arxiv_config=self.config.arxiv_config)
-        self.wikipedia = WikipediaSearch(wiki_config=self.config.wiki_config)
-        self.newsapi = NewsAPISearch(newsapi_config=self.config.newsapi_config)
-        self.github = GitHubSearch(github_config=self.config.github_config)
-        self.pubmed = PubMedSearch(pubmed_config=self.config.pubmed_config)
+    def __setattr__(self, name: str, value: Any):
+        # `search.github = provider` replaces a source's provider; WebSearch's own
+        # attributes win over sources of the same name
+        if name.startswith("_") or name in _OWN_ATTRIBUTES:
+            object.__setattr__(self, name, value)
+            return
+        try:
+            registry.get(name)
+        except ValueError:
+            object.__setattr__(self, name, value)
+            return
+        self._providers_by_source[name] = value
 
-    async def search(self, query: str) -> List[Dict[str, str]]:
+    def provider(self, source: str) -> BaseSearch:
         """
-        Search the web for relevant content and return structured results
+        The provider of a source, built on first use; raises ValueError for unknown sources
         """
-        tasks: List[Coroutine[Any, Any, List[SearchResult]]] = []
+        cached = self._providers_by_source.get(source)
+        if cached is not None:
+            return cached
 
-        if "google" in self.config.sources:
-            tasks.append(self.google._handle(query))
-        if "wikipedia" in self.config.sources:
-            tasks.append(self.wikipedia._handle(query))
-        if "arxiv" in self.config.sources:
-            tasks.append(self.arxiv._handle(query))
-        if "newsapi" in self.config.sources:
-            tasks.append(self.newsapi._handle(query))
-        if "github" in self.config.sources:
-            tasks.append(self.github._handle(query))
-        if "pubmed" in self.config.sources:
-            tasks.append(self.pubmed._handle(query))
+        spec = registry.get(source)
+        if spec.config is not None:
+            config = getattr(self.config, spec.config, None)
+        else:
+            config = self.config.provider_configs.get(source)
+        provider = spec.load()(config, client=self.client, hooks=self.hooks)
+        self._providers_by_source[source] = provider
+        return provider
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        return [item.to_dict() for r in results if not isinstance(r, BaseException) for item in r]
+    async def search(
+        self,
+        query: str,
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+        diagnostics: Dict[str, SourceStatus] | None = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Search the web for relevant content and return structured results.
+
+        `sources`, `max_results` and `timeout` override the configured values for this call only.
+        Pass a dict as `diagnostics` to receive each source's SourceStatus.
+        """
+        response = await self.fetch(query, sources, max_results, timeout)
+        if diagnostics is not None:
+            diagnostics.update(response.statuses)
+        return response.to_dicts()
+
+    async def search_results(
+        self,
+        query: str,
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+        diagnostics: Dict[str, SourceStatus] | None = None,
+    ) -> List[SearchResult]:
+        """
+        Search the web for relevant content and return the SearchResult objects,
+        skipping the per-result dict conversion. The list is the caller's own, but
+        with a cache the SearchResult objects are shared; replace them, don't modify them.
+        """
+        response = await self.fetch(query, sources, max_results, timeout)
+        if diagnostics is not None:
+            diagnostics.update(response.statuses)
+        return list(response.results)
+
+    async def fetch(
+        self,
+        query: str,
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+    ) -> SearchResponse:
+        """
+        Search every configured source once and return a SearchResponse, from which
+        both the JSON results and the compiled text can be taken. With a configured
+        cache, a cached response may be returned instead.
+        """
+        if self.cache is None:
+            return await self._fetch(query, sources, max_results, timeout)
+        requested = sources if sources is not None else self.config.sources
+        key = (query, tuple(sorted(set(requested))), max_results, timeout)
+        return await self.cache.get(key, lambda: self._fetch(query, sources, max_results, timeout))
+
+    async def enrich(
+        self, results: Sequence[SearchResult], query: str = "", timeout: float | None = None
+    ) -> List[SearchResult]:
+        """
+        Materialise the full previews of results returned with a summary only (Google
+        with lazy_previews), in the same order. Pass the query the results came from
+        to pick the passages relevant to it. The given results are left unchanged.
+        """
+        by_source: Dict[str, List[int]] = {}
+        for i, result in enumerate(results):
+            by_source.setdefault(result.source, []).append(i)
+        enrichers: Dict[str, BaseSearch] = {}
+        for source in by_source:
+            enricher = self._enricher(source)
+            if enricher is not None:
+                enrichers[source] = enricher
+
+        enriched = list(results)
+        batches = await asyncio.gather(
+            *(
+                provider.enrich([results[i] for i in by_source[source]], query, timeout)
+                for source, provider in enrichers.items()
+            )
+        )
+        for source, batch in zip(enrichers, batches):
+            for i, result in zip(by_source[source], batch):
+                enriched[i] = result
+        return enriched
 
-    async def compile_search(self, query: str):
+    def _enricher(self, source: str) -> BaseSearch | None:
         """
-        Search the web for relevant content
+        The provider of a source if it overrides BaseSearch.enrich; other sources
+        (including unknown ones) have nothing to enrich, so they are not built
         """
-        tasks: List[Coroutine[Any, Any, str]] = []
+        provider = self._providers_by_source.get(source)
+        if provider is None:
+            try:
+                provider_class = registry.get(source).load()
+            except ValueError:
+                return None
+        else:
+            provider_class = type(provider)
+        if getattr(provider_class, "enrich", BaseSearch.enrich) is BaseSearch.enrich:
+            return None
+        return provider if provider is not None else self.provider(source)
 
-        if "google" in self.config.sources:
-            tasks.append(self.google._compile(query))
-        if "wikipedia" in self.config.sources:
-            tasks.append(self.wikipedia._compile(query))
-        if "arxiv" in self.config.sources:
-            tasks.append(self.arxiv._compile(query))
-        if "newsapi" in self.config.sources:
-            tasks.append(self.newsapi._compile(query))
-        if "github" in self.config.sources:
-            tasks.append(self.github._compile(query))
-        if "pubmed" in self.config.sources:
-            tasks.append(self.pubmed._compile(query))
+    async def _fetch(
+        self,
+        query: str,
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+    ) -> SearchResponse:
+        options = self._options(max_results, timeout)
+        outcomes = await asyncio.gather(
+            *(self._fetch_source(query, source, provider, options) for source, provider in self._providers(sources))
+        )
+        results_by_source = [results for _, results in outcomes]
+
+        if self.config.ranking:
+            results = rank_results(query, results_by_source, self.config.ranking)
+        else:
+            results = [item for r in results_by_source for item in r]
+
+        return SearchResponse(
+            query=query,
+            results=results,
+            statuses={status.source: status for status, _ in outcomes},
+            ranked=self.config.ranking is not None,
+        )
+
+    async def _fetch_source(
+        self, query: str, source: SearchSources, provider: BaseSearch, options: Dict[str, Any]
+    ) -> Tuple[SourceStatus, List[SearchResult]]:
+        # runs in its own task, so the status is seen only by this source's HTTP calls
+        status = SourceStatus(source=source)
+        current_status.set(status)
+        for hook in self.hooks:
+            hook.on_source_start(source, query)
+
+        start = time.perf_counter()
+        results: List[SearchResult] = []
+        try:
+            results = await provider._handle(query, **options)
+            status.count = len(results)
+        except Exception as e:
+            status.error = e
+        status.elapsed = time.perf_counter() - start
+
+        for hook in self.hooks:
+            hook.on_source_end(source, status)
+        return status, results
+
+    def _options(self, max_results: int | None, timeout: float | None) -> Dict[str, Any]:
+        """
+        Call-time overrides forwarded to the providers; unset ones fall back to each provider's config
+        """
+        options: Dict[str, Any] = {}
+        if max_results is not None:
+            options["max_results"] = max_results
+        if timeout is not None:
+            options["timeout"] = timeout
+        return options
+
+    def _providers(self, sources: List[SearchSources] | None = None) -> List[Tuple[SearchSources, BaseSearch]]:
+        """
+        Providers for the requested (or configured) sources, in a stable order
+        """
+        requested = sources if sources is not None else self.config.sources
+        for source in requested:
+            registry.get(source)  # unknown sources fail before any request is sent
+        ordered = [source for source in registry.sources() if source in requested]
+        return [(source, self.provider(source)) for source in ordered]  # type: ignore[misc]
+
+    async def compile_search(
+        self,
+        query: str,
+        budget: int | None = None,
+        unit: BudgetUnit = "chars",
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+    ):
+        """
+        Search the web for relevant content.
+
+        With a `budget` (characters, or approximate tokens with unit="tokens") the
+        output is shared fairly across sources and results, and previews are
+        truncated at sentence boundaries.
+        """
+        if budget is not None or self.config.ranking:
+            response = await self.fetch(query, sources, max_results, timeout)
+            return response.compile(budget, unit)
+
+        options = self._options(max_results, timeout)
+        tasks = [provider._compile(query, **options) for _, provider in self._providers(sources)]
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
         return "\n\n".join(r for r in results if isinstance(r, str))
+
+    async def compile_stream(
+        self,
+        query: str,
+        budget: int | None = None,
+        unit: BudgetUnit = "chars",
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Search the web and yield the compiled output in chunks, source by source.
+
+        All sources are queried concurrently; budget a source leaves unused is passed
+        on to the sources after it.
+        """
+        if self.config.ranking:
+            tasks = [asyncio.ensure_future(self.search_results(query, sources, max_results, timeout))]
+        else:
+            options = self._options(max_results, timeout)
+            tasks = [
+                asyncio.ensure_future(provider._handle(query, **options)) for _, provider in self._providers(sources)
+            ]
+
+        compiler = GroupCompiler(len(tasks), budget_chars(budget, unit) if budget is not None else None)
+
+        try:
+            for task in tasks:
+                try:
+                    results = await task
+                except Exception:
+                    compiler.skip()
+                    continue
+
+                for chunk in compiler.feed(results):
+                    yield chunk
+        finally:
+            for task in tasks:
+                task.cancel()
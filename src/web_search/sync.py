@@ -0,0 +1,186 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, Dict, Iterator, List, Sequence, TypeVar
+
+import httpx
+
+from .base import SearchResult
+from .budget import BudgetUnit
+from .config import SearchSources, WebSearchConfig
+from .hooks import SearchHooks
+from .response import SearchResponse, SourceStatus
+from .search import WebSearch
+
+T = TypeVar("T")
+
+
+class SyncWebSearch:
+    """
+    Blocking WebSearch for synchronous code (Django views, Celery tasks, scripts).
+
+    One event loop runs in a background thread for the lifetime of the object, so
+    the pooled HTTP client and everything WebSearch keeps between calls stay warm.
+    Any number of threads may call it concurrently. Call `close()` (or use it as a
+    context manager) to cancel pending searches and release the connections.
+    """
+
+    def __init__(
+        self,
+        config: WebSearchConfig | None = None,
+        hooks: Sequence[SearchHooks] = (),
+        deadline: float | None = None,
+        **client_options: Any,
+    ):
+        """
+        `deadline` is the default number of seconds a call waits for its result
+        before the search is cancelled and TimeoutError is raised; None waits for
+        the source timeouts. `client_options` are passed to the httpx.AsyncClient,
+        e.g. `limits` or `transport`.
+        """
+        self.deadline = deadline
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="web-search-loop", daemon=True)
+        self._thread.start()
+
+        self._client: httpx.AsyncClient = self._run(self._open_client(client_options), None)
+        self.web_search = WebSearch(config, client=self._client, hooks=hooks)
+
+    async def _open_client(self, options: Dict[str, Any]) -> httpx.AsyncClient:
+        # created on the loop thread, which owns it from now on
+        return httpx.AsyncClient(**options)
+
+    def search(
+        self,
+        query: str,
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+        diagnostics: Dict[str, SourceStatus] | None = None,
+        deadline: float | None = None,
+    ) -> List[Dict[str, str]]:
+        """Blocking WebSearch.search; `deadline` overrides the default one for this call"""
+        return self._run(self.web_search.search(query, sources, max_results, timeout, diagnostics), deadline)
+
+    def search_results(
+        self,
+        query: str,
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+        diagnostics: Dict[str, SourceStatus] | None = None,
+        deadline: float | None = None,
+    ) -> List[SearchResult]:
+        """Blocking WebSearch.search_results"""
+        return self._run(self.web_search.search_results(query, sources, max_results, timeout, diagnostics), deadline)
+
+    def fetch(
+        self,
+        query: str,
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+        deadline: float | None = None,
+    ) -> SearchResponse:
+        """Blocking WebSearch.fetch"""
+        return self._run(self.web_search.fetch(query, sources, max_results, timeout), deadline)
+
+    def enrich(
+        self,
+        results: Sequence[SearchResult],
+        query: str = "",
+        timeout: float | None = None,
+        deadline: float | None = None,
+    ) -> List[SearchResult]:
+        """Blocking WebSearch.enrich"""
+        return self._run(self.web_search.enrich(results, query, timeout), deadline)
+
+    def compile_search(
+        self,
+        query: str,
+        budget: int | None = None,
+        unit: BudgetUnit = "chars",
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+        deadline: float | None = None,
+    ) -> str:
+        """Blocking WebSearch.compile_search"""
+        return self._run(self.web_search.compile_search(query, budget, unit, sources, max_results, timeout), deadline)
+
+    def compile_stream(
+        self,
+        query: str,
+        budget: int | None = None,
+        unit: BudgetUnit = "chars",
+        sources: List[SearchSources] | None = None,
+        max_results: int | None = None,
+        timeout: float | None = None,
+        deadline: float | None = None,
+    ) -> Iterator[str]:
+        """
+        Blocking WebSearch.compile_stream, yielding chunks as sources complete;
+        `deadline` applies to each chunk
+        """
+        stream = self.web_search.compile_stream(query, budget, unit, sources, max_results, timeout)
+        try:
+            while True:
+                try:
+                    yield self._run(stream.__anext__(), deadline)
+                except StopAsyncIteration:
+                    return
+        finally:
+            if not self._closed:
+                self._run(stream.aclose(), None)
+
+    def close(self, timeout: float | None = 10.0):
+        """Cancel pending searches, close the HTTP client and stop the loop; safe to call twice"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._loop.close()
+
+    async def _shutdown(self):
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await self._client.aclose()
+
+    def _run(self, coro: Coroutine[Any, Any, T], deadline: float | None) -> T:
+        """run a coroutine on the loop thread and wait for it, cancelling it on timeout or interrupt"""
+        if self._closed:
+            coro.close()
+            raise RuntimeError("SyncWebSearch is closed")
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("SyncWebSearch cannot be called from its own event loop; await WebSearch instead")
+
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        wait = self.deadline if deadline is None else deadline
+        try:
+            return future.result(wait)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"search did not finish within {wait}s") from None
+        except BaseException:
+            # e.g. KeyboardInterrupt in the calling thread
+            future.cancel()
+            raise
+
+    def __enter__(self) -> "SyncWebSearch":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
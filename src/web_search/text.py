@@ -0,0 +1,101 @@
+import math
+import re
+from collections import Counter
+from typing import Iterable, List, Set
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# too common to tell passages apart
+STOPWORDS = frozenset(
+    (
+        "a an and are as at be by for from how in is it of on or "
+        "that the this to was what when where which who why with"
+    ).split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def query_terms(query: str) -> Set[str]:
+    """The distinct query tokens worth matching, without stopwords"""
+    return {token for token in tokenize(query) if token not in STOPWORDS}
+
+
+def term_score(tokens: Iterable[str], terms: Set[str]) -> float:
+    """
+    Relevance of a passage to the query terms: log-scaled frequency of each term
+    that occurs, so a passage mentioning several terms beats one repeating a single term
+    """
+    counts = Counter(token for token in tokens if token in terms)
+    return sum(1 + math.log(count) for count in counts.values())
+
+
+def truncate_at_sentence(text: str, limit: int) -> str:
+    """
+    Truncate text to at most `limit` characters, preferring a sentence boundary
+    and falling back to a word boundary
+    """
+    if len(text) <= limit:
+        return text
+    if limit <= 0:
+        return ""
+
+    window = text[: limit + 1]
+    end = max(window.rfind(mark) for mark in (". ", "! ", "? ", "\n"))
+    if end > 0:
+        return window[: end + 1].rstrip()
+
+    space = window.rfind(" ")
+    return window[:space].rstrip() if space > 0 else ""
+
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_passages(text: str, size: int = 400) -> List[str]:
+    """
+    Split text into passages of whole sentences, about `size` characters each;
+    passages do not cross line breaks
+    """
+    passages: List[str] = []
+    for line in text.splitlines():
+        current = ""
+        for sentence in _SENTENCE_END_RE.split(line.strip()):
+            if current and len(current) + 1 + len(sentence) > size:
+                passages.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            passages.append(current)
+    return passages
+
+
+def extract_passages(text: str, query: str, limit: int, size: int = 400) -> str:
+    """
+    The passages of `text` that best match the query, in document order and within
+    `limit` characters; the leading passages when nothing matches
+    """
+    passages = split_passages(text, size)
+    terms = query_terms(query)
+    scores = [term_score(tokenize(p), terms) for p in passages] if terms else [0.0] * len(passages)
+    order = sorted(range(len(passages)), key=lambda i: (-scores[i], i))
+    if scores and scores[order[0]] > 0:
+        order = [i for i in order if scores[i] > 0]
+
+    chosen: List[int] = []
+    remaining = limit
+    for i in order:
+        room = remaining - 1 if chosen else remaining  # newline separator
+        if room <= 0:
+            break
+        if len(passages[i]) <= room:
+            chosen.append(i)
+            remaining = room - len(passages[i])
+        elif not chosen:
+            return truncate_at_sentence(passages[i], limit)
+
+    return "\n".join(passages[i] for i in sorted(chosen))
@@ -0,0 +1,96 @@
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List
+
+from .config import AdaptiveTimeoutConfig
+
+# log-spaced bucket upper bounds from 10ms to about 4 minutes
+BUCKETS = tuple(0.01 * 1.25**i for i in range(46))
+
+
+class LatencyHistogram:
+    """
+    Rolling latency histogram over BUCKETS. Two half-window generations are kept,
+    so samples older than one to one and a half windows no longer count.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._current: List[int] = [0] * (len(BUCKETS) + 1)
+        self._previous: List[int] = [0] * (len(BUCKETS) + 1)
+        self._rotated_at = time.monotonic()
+
+    def _rotate(self):
+        now = time.monotonic()
+        half = self.window / 2
+        if now - self._rotated_at < half:
+            return
+        if now - self._rotated_at < self.window:
+            self._previous = self._current
+        else:
+            self._previous = [0] * len(self._current)
+        self._current = [0] * len(self._current)
+        self._rotated_at = now
+
+    def record(self, seconds: float):
+        """Add one latency sample"""
+        self._rotate()
+        self._current[bisect_left(BUCKETS, seconds)] += 1
+
+    @property
+    def count(self) -> int:
+        """samples in the window"""
+        self._rotate()
+        return sum(self._current) + sum(self._previous)
+
+    def percentile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th percentile; None without samples"""
+        self._rotate()
+        counts = [a + b for a, b in zip(self._current, self._previous)]
+        total = sum(counts)
+        if not total:
+            return None
+        rank = max(1, -(-int(q * total) // 100))
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+        return BUCKETS[-1]
+
+
+class AdaptiveTimeouts:
+    """
+    Per-host latency histograms and the timeouts derived from them; see
+    AdaptiveTimeoutConfig. The least recently used hosts are dropped past max_hosts.
+    """
+
+    def __init__(self, config: AdaptiveTimeoutConfig):
+        self.config = config
+        self._hosts: "OrderedDict[str, LatencyHistogram]" = OrderedDict()
+
+    def record(self, host: str, seconds: float):
+        """Record how long a request to `host` took, or how long it ran before timing out"""
+        histogram = self._hosts.get(host)
+        if histogram is None:
+            histogram = self._hosts[host] = LatencyHistogram(self.config.window)
+            while len(self._hosts) > self.config.max_hosts:
+                self._hosts.popitem(last=False)
+        else:
+            self._hosts.move_to_end(host)
+        histogram.record(seconds)
+
+    def timeout(self, host: str) -> float | None:
+        """The adaptive timeout for `host`, or None until it has enough samples"""
+        histogram = self._hosts.get(host)
+        if histogram is None or histogram.count < self.config.min_samples:
+            return None
+        latency = histogram.percentile(self.config.percentile)
+        if latency is None:
+            return None
+        return min(self.config.max_timeout, max(self.config.min_timeout, latency * self.config.multiplier))
+
+    def snapshot(self) -> Dict[str, float | None]:
+        """The current timeout of every tracked host"""
+        return {host: self.timeout(host) for host in self._hosts}
@@ -0,0 +1,191 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Literal, Sequence, TextIO
+from urllib.parse import urlsplit
+
+import httpx
+
+from .hooks import SearchHooks, trace_callbacks
+
+# httpcore trace scopes and the phase they are timed into; DNS resolution is part
+# of connect, since httpcore resolves inside the TCP connect
+_PHASES = {
+    "connect_tcp": "connect",
+    "start_tls": "tls",
+    "send_request_headers": "send",
+    "send_request_body": "send",
+    "receive_response_headers": "wait",
+    "receive_response_body": "download",
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass(slots=True)
+class PhaseTrace:
+    """
+    Phase timings in seconds of one upstream request, or of parsing a source's payload.
+
+    Phases: queue (waiting for a pooled connection), connect (DNS and TCP), tls,
+    send, wait (time to first byte), download, and parse.
+    """
+
+    source: str
+    host: str
+    timestamp: float
+    phases: Dict[str, float] = field(default_factory=dict)
+    status_code: int | None = None
+    error: str | None = None
+
+
+class TraceSink(ABC):
+    @abstractmethod
+    def write(self, trace: PhaseTrace):
+        """Export a finished trace"""
+
+
+class RingBufferSink(TraceSink):
+    """Keeps the last `capacity` traces in memory"""
+
+    def __init__(self, capacity: int = 1024):
+        self.traces: Deque[PhaseTrace] = deque(maxlen=capacity)
+
+    def write(self, trace: PhaseTrace):
+        """Keep the trace, evicting the oldest one when full"""
+        self.traces.append(trace)
+
+    def summary(self, by: Literal["source", "host"] = "source") -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Percentiles of the buffered traces, see `summarize`"""
+        return summarize(self.traces, by)
+
+
+class JSONLinesSink(TraceSink):
+    """
+    Writes one JSON object per trace to a text file. Writes happen on the event
+    loop, so use a local file, not a pipe that may block.
+    """
+
+    def __init__(self, file: TextIO):
+        self.file = file
+
+    def write(self, trace: PhaseTrace):
+        """Append the trace as a JSON line"""
+        self.file.write(json.dumps(asdict(trace)) + "\n")
+
+
+class _PhaseRecorder:
+    """httpcore `trace` extension callback timing the phases of one request"""
+
+    __slots__ = ("trace", "tracer", "_start", "_started", "_first_event")
+
+    def __init__(self, trace: PhaseTrace, tracer: "HTTPTracer"):
+        self.trace = trace
+        self.tracer = tracer
+        self._start = time.perf_counter()
+        self._started: Dict[str, float] = {}
+        self._first_event: float | None = None
+
+    async def __call__(self, event: str, info: Dict[str, Any]):
+        now = time.perf_counter()
+        if self._first_event is None:
+            self._first_event = now
+            self.trace.phases["queue"] = now - self._start
+
+        scope, _, stage = event.rpartition(".")
+        phase = _PHASES.get(scope.rpartition(".")[2])
+        if phase is None:
+            return
+        if stage == "started":
+            self._started[phase] = now
+        elif phase in self._started:
+            self.trace.phases[phase] = self.trace.phases.get(phase, 0.0) + now - self._started.pop(phase)
+
+
+class HTTPTracer(SearchHooks):
+    """
+    Hooks recording the phase timings of every upstream request, and the parse
+    time of every payload, to the sinks (by default one RingBufferSink)
+    """
+
+    def __init__(self, sinks: Sequence[TraceSink] | None = None):
+        self.sinks = list(sinks) if sinks is not None else [RingBufferSink()]
+
+    def http_trace(self, source: str, url: str) -> _PhaseRecorder:
+        """A recorder for the request, passed to httpcore as the `trace` extension"""
+        trace = PhaseTrace(source=source, host=urlsplit(url).hostname or "", timestamp=time.time())
+        return _PhaseRecorder(trace, self)
+
+    def on_http_response(
+        self, source: str, url: str, response: httpx.Response | None, elapsed: float, error: Exception | None
+    ):
+        """Finish the request's trace and export it"""
+        request = response.request if response is not None else _request_of(error)
+        extension = request.extensions.get("trace") if request is not None else None
+        # with several tracers on one request, each finishes the recorder it created
+        recorder = next(
+            (r for r in trace_callbacks(extension) if isinstance(r, _PhaseRecorder) and r.tracer is self), None
+        )
+        if recorder is None:
+            return
+
+        trace = recorder.trace
+        if response is not None:
+            trace.status_code = response.status_code
+        if error is not None:
+            trace.error = type(error).__name__
+        self._write(trace)
+
+    def on_parse(self, source: str, elapsed: float, count: int):
+        """Export the parse time as a trace of its own"""
+        self._write(PhaseTrace(source=source, host="", timestamp=time.time(), phases={"parse": elapsed}))
+
+    def _write(self, trace: PhaseTrace):
+        for sink in self.sinks:
+            sink.write(trace)
+
+
+def _request_of(error: Exception | None) -> httpx.Request | None:
+    """the request a failed call was sending, when httpx attached it to the error"""
+    if not isinstance(error, httpx.RequestError):
+        return None
+    try:
+        return error.request
+    except RuntimeError:
+        return None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values; 0.0 when there are none"""
+    if not values:
+        return 0.0
+    index = max(0, -(-int(q * len(values)) // 100) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(
+    traces: Iterable[PhaseTrace], by: Literal["source", "host"] = "source"
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Count and p50/p95/p99 of each phase, grouped by source or by host:
+    {group: {phase: {"count": n, "p50": s, "p95": s, "p99": s}}}
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for trace in traces:
+        group = trace.source if by == "source" or not trace.host else trace.host
+        phases = samples.setdefault(group, {})
+        for phase, value in trace.phases.items():
+            phases.setdefault(phase, []).append(value)
+
+    summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for group, phases in samples.items():
+        summary[group] = {}
+        for phase, values in phases.items():
+            values.sort()
+            stats: Dict[str, float] = {"count": len(values)}
+            for q in PERCENTILES:
+                stats[f"p{q}"] = percentile(values, q)
+            summary[group][phase] = stats
+    return summary
@@ -1,25 +1,73 @@
-from typing import List
+import re
+from dataclasses import dataclass
+from typing import List, Sequence
 
+import httpx
 import wikipedia as wiki
 
 from .base import BaseSearch, SearchResult
 from .config import BaseConfig
+from .hooks import SearchHooks
+from .text import query_terms, term_score, tokenize, truncate_at_sentence
+
+_HEADING_RE = re.compile(r"^(={2,6})\s*(.+?)\s*\1\s*$", re.MULTILINE)
+
+# sections with no prose worth previewing; their subsections are dropped too
+SKIPPED_SECTIONS = frozenset(
+    [
+        "references",
+        "external links",
+        "see also",
+        "notes",
+        "further reading",
+        "bibliography",
+        "sources",
+        "citations",
+        "footnotes",
+        "notes and references",
+    ]
+)
+
+
+@dataclass
+class _Section:
+    text: str
+    """the heading line and the body"""
+    position: int
+    score: float = 0.0
 
 
 class WikipediaSearch(BaseSearch):
+    """
+    Wikipedia search through the blocking `wikipedia` library. It makes its own
+    requests, so a shared `client` and the `timeout` (configured or per call) are
+    accepted for interface compatibility but not used.
+    """
+
+    source = "wikipedia"
     wiki_config: BaseConfig
 
-    def __init__(self, wiki_config: BaseConfig | None = None):
+    def __init__(
+        self,
+        wiki_config: BaseConfig | None = None,
+        client: httpx.AsyncClient | None = None,
+        hooks: Sequence[SearchHooks] = (),
+    ):
         self.wiki_config = wiki_config if wiki_config else BaseConfig()
+        super().__init__(self.wiki_config, client, hooks)
 
-    async def _handle(self, query: str) -> List[SearchResult]:
-        return await self._search(query)
+    async def _handle(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
+        return await self._search(query, max_results, timeout)
 
-    async def _compile(self, query: str) -> str:
-        results = await self._search(query)
+    async def _compile(self, query: str, max_results: int | None = None, timeout: float | None = None) -> str:
+        results = await self._search(query, max_results, timeout)
         return "\n\n".join(str(r) for r in results)
 
-    async def _search(self, query: str) -> List[SearchResult]:
+    async def _search(
+        self, query: str, max_results: int | None = None, timeout: float | None = None
+    ) -> List[SearchResult]:
         """
         search Wikipedia for relevant articles
         """
@@ -27,7 +75,7 @@ class WikipediaSearch(BaseSearch):
             raise ValueError("Search query cannot be empty")
 
         sources: List[SearchResult] = []
-        search_results = wiki.search(query, results=self.wiki_config.max_results)
+        search_results = wiki.search(query, results=self._max_results(max_results))
 
         for title in search_results:
             try:
@@ -35,7 +83,7 @@ class WikipediaSearch(BaseSearch):
                 if not page.content:
                     continue
 
-                preview = self._extract_relevant_wiki_sections(page.content)
+                preview = self._extract_relevant_wiki_sections(page.content, query)
                 if not preview:
                     continue
 
@@ -47,29 +95,76 @@ class WikipediaSearch(BaseSearch):
                         source="wikipedia",
                     )
                 )
-            except (wiki.exceptions.DisambiguationError, wiki.exceptions.PageError):
+            except (wiki.exceptions.DisambiguationError, wiki.exceptions.PageError) as e:
+                self._suppress(e)
                 continue
 
         return sources
 
-    def _extract_relevant_wiki_sections(self, content: str) -> str:
+    def _extract_relevant_wiki_sections(self, content: str, query: str = "") -> str:
         """
-        Extract the most relevant sections from Wikipedia content
+        The lead section, then the sections that best match the query, in article
+        order and within the configured max_preview_chars
         """
-        paragraphs = content.split("\n\n")
-        # Remove references and other metadata
-        cleaned_paragraphs = [
-            p
-            for p in paragraphs
-            if not any(
-                marker in p.lower()
-                for marker in [
-                    "references",
-                    "external links",
-                    "see also",
-                    "== notes ==",
-                ]
-            )
-        ]
-
-        return "\n\n".join(p for p in cleaned_paragraphs).strip()
+        lead, sections = _split_sections(content)
+        limit = self.wiki_config.max_preview_chars
+        if limit is None:
+            return "\n\n".join(p for p in [lead, *(s.text for s in sections)] if p).strip()
+
+        preview = truncate_at_sentence(lead, limit)
+        remaining = limit - len(preview)
+
+        terms = query_terms(query)
+        if terms:
+            for section in sections:
+                section.score = term_score(tokenize(section.text), terms)
+            candidates = sorted((s for s in sections if s.score > 0), key=lambda s: (-s.score, s.position))
+        else:
+            candidates = sections
+
+        chosen: List[_Section] = []
+        for section in candidates:
+            # separator before the section
+            room = remaining - 2 if preview or chosen else remaining
+            if room <= 0:
+                break
+            if len(section.text) <= room:
+                chosen.append(section)
+                remaining = room - len(section.text)
+                continue
+            # the best remaining section does not fit: keep what fits of it and stop
+            text = truncate_at_sentence(section.text, room)
+            if "\n" in text:  # more than the heading line
+                chosen.append(_Section(text, section.position))
+            break
+
+        chosen.sort(key=lambda s: s.position)
+        return "\n\n".join(p for p in [preview, *(s.text for s in chosen)] if p).strip()
+
+
+def _split_sections(content: str) -> tuple[str, List[_Section]]:
+    """
+    Split an article into its lead and its `== Heading ==` sections in one pass,
+    dropping reference-like sections and their subsections
+    """
+    sections: List[_Section] = []
+    headings = list(_HEADING_RE.finditer(content))
+    lead = content[: headings[0].start()].strip() if headings else content.strip()
+
+    skip_below: int | None = None
+    for i, match in enumerate(headings):
+        level = len(match.group(1))
+        if skip_below is not None and level > skip_below:
+            continue
+        skip_below = None
+
+        if match.group(2).lower() in SKIPPED_SECTIONS:
+            skip_below = level
+            continue
+
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(content)
+        body = content[match.end() : end].strip()
+        if body:
+            sections.append(_Section(f"{match.group(0).strip()}\n{body}", len(sections)))
+
+    return lead, sections
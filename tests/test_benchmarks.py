@@ -0,0 +1,58 @@
+import pytest
+
+from benchmarks.run import LevelResult, build_search, compare
+from benchmarks.server_load import StepResult, check, parse_args
+from benchmarks.upstream import DEFAULT_PROFILES, FakeUpstream, UpstreamProfile
+
+ALL_SOURCES = ["google", "wikipedia", "arxiv", "newsapi", "github", "pubmed"]
+
+
+@pytest.mark.asyncio
+async def test_fake_upstream_serves_every_source():
+    """Test every provider parses the stand-in's payloads into results"""
+    profiles = {name: UpstreamProfile(latency=0, distribution="fixed", words=200) for name in DEFAULT_PROFILES}
+
+    with FakeUpstream(profiles) as upstream:
+        async with upstream.client() as client:
+            search = build_search(client, ALL_SOURCES, max_results=2, hooks=[])
+            response = await search.fetch("fake upstream smoke test")
+
+    assert {source: status.error for source, status in response.statuses.items()} == dict.fromkeys(ALL_SOURCES)
+    assert {source: status.count for source, status in response.statuses.items()} == dict.fromkeys(ALL_SOURCES, 2)
+    assert upstream.stats.requests["scrape"] == 2
+
+
+@pytest.mark.asyncio
+async def test_fake_upstream_errors_and_rate_limits():
+    """Test configured error rates and rate limits surface as failed sources"""
+    profiles = {
+        "arxiv": UpstreamProfile(latency=0, error_rate=1.0),
+        "github": UpstreamProfile(latency=0, rate_limit=1),
+    }
+
+    with FakeUpstream(profiles) as upstream:
+        async with upstream.client() as client:
+            search = build_search(client, ["arxiv", "github"], max_results=2, hooks=[])
+            await search.fetch("first")
+            response = await search.fetch("second")
+
+    assert response.statuses["arxiv"].error is not None
+    assert response.statuses["github"].error is not None
+    assert upstream.stats.throttled["github"] == 1
+
+
+def test_compare_flags_regressions():
+    """Test throughput drops and p95 growth beyond the tolerance are reported"""
+    baseline = {"search/8": {"throughput": 10.0, "p95": 1.0}}
+    result = LevelResult("search", 8, 64, 8.0, 0.5, 1.2, 1.5, 1.0, 1.0, 2.0, 0)
+
+    assert len(compare([result], baseline, tolerance=0.1)) == 2
+    assert compare([result], baseline, tolerance=0.25) == []
+
+
+def test_server_load_thresholds():
+    """Test load-test steps fail on p99, throughput and baseline regressions"""
+    step = StepResult(10, 200, 8.0, 0.5, 1.5, 3.0, 0.0, 0.0, 80.0, 40)
+
+    assert check([step], parse_args([])) == []
+    assert len(check([step], parse_args(["--max-p99", "2", "--min-throughput", "0.9"]))) == 2
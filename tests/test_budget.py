@@ -0,0 +1,94 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.web_search.base import SearchResult
+from src.web_search.budget import budget_chars, compile_results, fair_shares
+from src.web_search.config import WebSearchConfig
+from src.web_search.search import WebSearch
+from src.web_search.text import truncate_at_sentence
+
+LONG_PREVIEW = " ".join(f"Sentence number {i} is here." for i in range(200))
+
+
+def _result(source="google", preview=LONG_PREVIEW) -> SearchResult:
+    return SearchResult(url=f"https://{source}.com", title=f"{source} title", preview=preview, source=source)
+
+
+def test_truncate_at_sentence():
+    text = "First sentence. Second sentence. Third one"
+    assert truncate_at_sentence(text, 100) == text
+    assert truncate_at_sentence(text, 20) == "First sentence."
+    assert truncate_at_sentence(text, 32) == "First sentence. Second sentence."
+    assert truncate_at_sentence("no boundary here at all", 12) == "no boundary"
+    assert truncate_at_sentence(text, 0) == ""
+
+
+def test_fair_shares():
+    assert fair_shares(100, [10, 200, 300]) == [10, 45, 45]
+    assert fair_shares(100, [10, 20]) == [10, 20]
+    assert fair_shares(0, [10, 20]) == [0, 0]
+
+
+def test_budget_chars():
+    assert budget_chars(100) == 100
+    assert budget_chars(100, "tokens") == 400
+
+
+def test_compile_results_respects_budget():
+    results = [_result("google"), _result("arxiv", "Short abstract.")]
+    chunks = list(compile_results(results, 600))
+
+    assert len(chunks) == 2
+    assert len("".join(chunks)) <= 600
+    assert chunks[1].startswith("\n\n")
+    assert chunks[1].endswith("Short abstract.")
+    assert chunks[0].endswith(".")
+
+
+def test_compile_results_without_budget():
+    results = [_result("google"), _result("arxiv", "")]
+    assert list(compile_results(results)) == [str(results[0])]
+
+
+@pytest.fixture
+def search():
+    config = WebSearchConfig(sources=["google", "wikipedia", "arxiv"])
+
+    with patch.object(WebSearch, "__init__", lambda self, config: None):
+        search = WebSearch(config)
+        search.config = config
+        search.google = AsyncMock()
+        search.google._handle = AsyncMock(return_value=[_result("google"), _result("google")])
+        search.wikipedia = AsyncMock()
+        search.wikipedia._handle = AsyncMock(side_effect=Exception("API Error"))
+        search.arxiv = AsyncMock()
+        search.arxiv._handle = AsyncMock(return_value=[_result("arxiv", "Short abstract.")])
+        yield search
+
+
+@pytest.mark.asyncio
+async def test_compile_search_with_budget(search):
+    result = await search.compile_search("test query", budget=1000)
+
+    assert len(result) <= 1000
+    assert "Source: google" in result
+    assert result.endswith("Short abstract.")
+
+
+@pytest.mark.asyncio
+async def test_compile_search_with_token_budget(search):
+    result = await search.compile_search("test query", budget=100, unit="tokens")
+
+    assert len(result) <= 400
+    assert "Source: arxiv" in result
+
+
+@pytest.mark.asyncio
+async def test_compile_stream_yields_chunks(search):
+    chunks = [chunk async for chunk in search.compile_stream("test query")]
+
+    assert len(chunks) == 3
+    assert "".join(chunks) == "\n\n".join(
+        str(r) for r in [_result("google"), _result("google"), _result("arxiv", "Short abstract.")]
+    )
@@ -0,0 +1,153 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.web_search import (
+    CacheConfig,
+    CountMinSketch,
+    ResultCache,
+    SearchResponse,
+    SourceStatus,
+    WebSearch,
+    WebSearchConfig,
+)
+from src.web_search import cache as cache_module
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # a stand-in for the cache's time module only, so the event loop keeps the real clock
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def _loader(calls: list, ok: bool = True):
+    async def load() -> SearchResponse:
+        calls.append(1)
+        status = SourceStatus(source="github", error=None if ok else RuntimeError("down"))
+        return SearchResponse(query=f"v{len(calls)}", results=[], statuses={"github": status})
+
+    return load
+
+
+def test_count_min_sketch_never_undercounts_and_decays():
+    sketch = CountMinSketch(width=64, depth=4)
+    for i in range(200):
+        sketch.add(f"q{i % 20}")
+    assert all(sketch.estimate(f"q{i}") >= 10 for i in range(20))
+
+    hot = [sketch.add("hot") for _ in range(100)][-1]
+    assert hot >= 100 and sketch.estimate("hot") >= 100
+    for i in range(64 * 8):
+        sketch.add(f"cold{i}")
+    assert sketch.estimate("hot") < 100
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_served_while_refreshing(clock):
+    cache = ResultCache(CacheConfig(ttl=10, stale_ttl=5))
+    calls: list = []
+    load = _loader(calls)
+
+    assert (await cache.get("k", load)).query == "v1"
+    clock.now += 9
+    assert (await cache.get("k", load)).query == "v1"
+    assert len(calls) == 1
+
+    # expired but within the grace window: the stale response comes back at once
+    clock.now += 3
+    assert (await cache.get("k", load)).query == "v1"
+    assert (await cache.get("k", load)).query == "v1"
+    await asyncio.sleep(0)
+    assert len(calls) == 2
+    assert (await cache.get("k", load)).query == "v2"
+
+    # past the grace window the caller waits for a fresh load
+    clock.now += 20
+    assert (await cache.get("k", load)).query == "v3"
+
+
+@pytest.mark.asyncio
+async def test_failed_sources_are_not_cached(clock):
+    cache = ResultCache(CacheConfig())
+    calls: list = []
+    await cache.get("k", _loader(calls, ok=False))
+    await cache.get("k", _loader(calls, ok=False))
+    assert len(calls) == 2 and len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_hottest_entries_are_refreshed_within_budget(clock):
+    cache = ResultCache(CacheConfig(ttl=60, refresh_top=2, refresh_ahead=10, refresh_rate=1, refresh_interval=1))
+    calls = {key: [] for key in ("hot", "warm", "cold")}
+    for key, hits in (("hot", 5), ("warm", 3), ("cold", 1)):
+        for _ in range(hits):
+            await cache.get(key, _loader(calls[key]))
+
+    clock.now += 30
+    assert cache.refresh_hot() == 0  # nothing expires within refresh_ahead yet
+
+    clock.now += 25
+    assert cache.refresh_hot() == 1  # one refresh per second of budget
+    clock.now += 1
+    assert cache.refresh_hot() == 1
+    clock.now += 1
+    assert cache.refresh_hot() == 0  # "cold" is not among the top 2
+    await asyncio.sleep(0)
+
+    assert [len(calls[key]) for key in ("hot", "warm", "cold")] == [2, 2, 1]
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_websearch_serves_repeated_queries_from_cache():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"items": [{"html_url": "https://github.com/a/b", "name": "b"}]})
+
+    config = WebSearchConfig(sources=["github"], cache=CacheConfig())
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        search = WebSearch(config, client=client)
+        first = await search.search("repositories")
+        second = await search.search("repositories", sources=["github"])
+        await search.search("repositories", max_results=1)
+
+    assert first == second
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_results_are_not_shared_between_callers():
+    """Test changing the results of one search leaves later cached searches intact"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, json={"items": [{"html_url": "https://github.com/a/b", "name": "b", "description": "A repository"}]}
+        )
+
+    config = WebSearchConfig(sources=["github"], cache=CacheConfig())
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        search = WebSearch(config, client=client)
+        first = await search.search("repositories")
+        first[0]["title"] = "Changed"
+        first.append({})
+        objects = await search.search_results("repositories")
+        objects.clear()
+
+        assert await search.search("repositories") == [
+            {"url": "https://github.com/a/b", "title": "b", "preview": "A repository", "source": "github"}
+        ]
+        assert len(await search.search_results("repositories")) == 1
@@ -0,0 +1,85 @@
+import asyncio
+import io
+import json
+
+import httpx
+import pytest
+
+from src.web_search import WebSearch, WebSearchConfig
+from src.web_search.cli import _key, _main, completed_queries, parse_args, read_queries, run
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    query = request.url.params["q"]
+    if query == "broken":
+        return httpx.Response(500)
+    return httpx.Response(
+        200, json={"items": [{"html_url": f"https://github.com/{query}", "name": query, "description": "A repo"}]}
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_streams_one_line_per_query():
+    """Test every query yields one JSON line, with bounded concurrency and failures counted"""
+    in_flight = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _handler(request)
+
+    queries = [f"repo{i}" for i in range(20)] + ["broken"]
+    out = io.StringIO()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        search = WebSearch(WebSearchConfig(sources=["github"]), client=client)
+        summary = await run(search, read_queries(iter(queries + ["", "  "])), out, concurrency=4)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(r["query"] for r in records) == sorted(queries)
+    assert peak <= 4
+    broken = next(r for r in records if r["query"] == "broken")
+    assert broken["results"] == [] and broken["errors"]["github"].startswith("HTTPStatusError")
+    assert (summary.queries, summary.failed, summary.results) == (21, 1, 20)
+    assert summary.source_errors == {"github": 1}
+    assert "21 queries" in summary.report()
+
+
+def test_resume_skips_completed_queries(tmp_path):
+    """Test --resume appends only the queries missing from the output, ignoring a cut-off last line"""
+    queries = tmp_path / "queries.txt"
+    queries.write_text("alpha\nbeta\ngamma\nalpha\n")
+    output = tmp_path / "results.jsonl"
+    output.write_text(json.dumps({"query": "alpha", "results": []}) + '\n{"query": "gam')
+
+    args = parse_args([str(queries), "-o", str(output), "--resume", "--sources", "github"])
+    assert completed_queries(str(output)) and completed_queries(str(tmp_path / "missing.jsonl")) == set()
+    summary = asyncio.run(_main(args, transport=httpx.MockTransport(_handler)))
+
+    lines = output.read_text().splitlines()
+    assert sorted(json.loads(line)["query"] for line in lines[1:]) == ["beta", "gamma"]
+    assert (summary.queries, summary.skipped) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_resume_keys_do_not_grow_with_the_input():
+    """Test only queries loaded from the output are skipped, and no keys are added while running"""
+    skip = {_key("done")}
+    out = io.StringIO()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+        search = WebSearch(WebSearchConfig(sources=["github"]), client=client)
+        summary = await run(search, iter(["done", "new", "new", "other"]), out, concurrency=2, skip=skip)
+
+    assert skip == {_key("done")}
+    assert (summary.queries, summary.skipped) == (3, 1)
+
+
+def test_parse_args_errors():
+    with pytest.raises(SystemExit):
+        parse_args(["-", "--resume"])
+    with pytest.raises(SystemExit):
+        parse_args(["-", "--sources", "nope"])
+    with pytest.raises(SystemExit):
+        parse_args(["-", "--concurrency", "0"])
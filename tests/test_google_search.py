@@ -2,9 +2,13 @@
 
 from unittest.mock import patch
 
+import httpx
 import pytest
 
+from src.web_search.base import SearchResult
+from src.web_search.config import GoogleSearchConfig, WebSearchConfig
 from src.web_search.google import GoogleSearch
+from src.web_search.search import WebSearch
 
 from .base_utils import BaseSearchTests
 
@@ -29,3 +33,67 @@ def search_instance(mock_search_handler, sample_results):
 
 class TestGoogleSearch(BaseSearchTests):
     search_class = GoogleSearch
+
+    def test_clean_content_keeps_lines(self):
+        content = "Home\n  A   first paragraph that is long enough to keep.\nMenu\nA second paragraph, also long enough to keep."
+
+        assert GoogleSearch()._clean_content(content) == (
+            "A first paragraph that is long enough to keep.\nA second paragraph, also long enough to keep."
+        )
+
+    def test_extract_passages_prefers_query_matches(self):
+        filler = " ".join(f"Sentence {i} is about cooking pasta at home." for i in range(40))
+        content = f"{filler}\nQuantum computers use qubits. They promise faster algorithms.\n{filler}"
+        search = GoogleSearch(GoogleSearchConfig(max_preview_chars=300))
+
+        preview = search._extract_passages(content, "quantum computers")
+        assert preview.startswith("Quantum computers use qubits.")
+        assert len(preview) <= 300
+
+        fallback = search._extract_passages(content, "astronomy")
+        assert fallback.startswith("Sentence 0 is about cooking pasta") and len(fallback) <= 300
+
+    @pytest.mark.asyncio
+    async def test_lazy_previews_scrape_only_enriched_results(self):
+        """Test lazy_previews returns CSE snippets without scraping, and enrich() scrapes only what it is given"""
+        scraped = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "www.googleapis.com":
+                items = [
+                    {"link": f"https://site{i}.com/page", "title": f"Page {i}", "snippet": f"Snippet\n {i} ..."}
+                    for i in range(4)
+                ]
+                items[1]["pagemap"] = {"metatags": [{"og:description": "A longer description of the second page."}]}
+                return httpx.Response(200, json={"items": items})
+            scraped.append(request.url.host)
+            if request.url.host == "site3.com":
+                return httpx.Response(403)
+            return httpx.Response(200, text=f"<p>The full article text of {request.url.host}, about qubits.</p>")
+
+        config = WebSearchConfig(
+            sources=["google"], google_config=GoogleSearchConfig(max_results=4, lazy_previews=True)
+        )
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            search = WebSearch(config, client=client)
+            results = await search.search_results("qubits")
+            assert scraped == []
+            assert [r.preview for r in results] == [
+                "Snippet 0 ...",
+                "A longer description of the second page.",
+                "Snippet 2 ...",
+                "Snippet 3 ...",
+            ]
+
+            other = SearchResult(url="https://github.com/x", title="x", preview="A repo", source="github")
+            unknown = SearchResult(url="https://example.com", title="y", preview="Kept", source="custom")  # type: ignore[arg-type]
+            enriched = await search.enrich([results[2], other, results[3], unknown], "qubits")
+            # sources without an enrich() of their own pass through without building their provider
+            assert "github" not in search._providers_by_source
+
+        assert sorted(scraped) == ["site2.com", "site3.com"]
+        assert enriched[0].preview == "The full article text of site2.com, about qubits."
+        assert enriched[1] is other
+        assert enriched[2].preview == "Snippet 3 ..."  # the page could not be scraped
+        assert enriched[3] is unknown
+        assert results[2].preview == "Snippet 2 ..."
@@ -0,0 +1,87 @@
+from typing import List, Tuple
+
+import httpx
+import pytest
+
+from src.web_search import SearchHooks, SourceStatus, WebSearch, WebSearchConfig
+
+GITHUB_PAYLOAD = {
+    "items": [
+        {"html_url": "https://github.com/a/b", "name": "b", "description": "A repository"},
+        {"html_url": "https://github.com/c/d", "name": "d", "description": "Another repository"},
+    ]
+}
+
+
+class RecordingHooks(SearchHooks):
+    def __init__(self):
+        self.events: List[Tuple] = []
+
+    def on_source_start(self, source, query):
+        self.events.append(("start", source))
+
+    def on_source_end(self, source, status):
+        self.events.append(("end", source, status.count))
+
+    def on_http_request(self, source, url):
+        self.events.append(("request", source))
+
+    def on_http_response(self, source, url, response, elapsed, error):
+        self.events.append(("response", source, response.status_code if response else type(error).__name__))
+
+    def on_parse(self, source, elapsed, count):
+        self.events.append(("parse", source, count))
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.host == "api.github.com":
+        return httpx.Response(200, json=GITHUB_PAYLOAD)
+    raise httpx.ConnectError("unreachable", request=request)
+
+
+@pytest.mark.asyncio
+async def test_hooks_and_diagnostics():
+    """Test hooks see source, HTTP and parse events and diagnostics carry per-source details"""
+    hooks = RecordingHooks()
+    diagnostics: dict = {}
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+        search = WebSearch(WebSearchConfig(sources=["github", "arxiv"]), client=client, hooks=[hooks])
+        results = await search.search("repositories", diagnostics=diagnostics)
+
+    assert len(results) == 2
+    assert ("start", "github") in hooks.events
+    assert ("parse", "github", 2) in hooks.events
+    assert ("end", "github", 2) in hooks.events
+    assert ("response", "github", 200) in hooks.events
+    assert ("response", "arxiv", "ConnectError") in hooks.events
+
+    github: SourceStatus = diagnostics["github"]
+    assert github.ok and github.count == 2
+    assert github.http_calls == 1
+    assert github.bytes_received > 0
+
+    arxiv: SourceStatus = diagnostics["arxiv"]
+    assert isinstance(arxiv.error, httpx.ConnectError)
+    assert arxiv.http_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_record_suppressed_scrape_errors():
+    """Test a Google page that fails to scrape is reported instead of vanishing"""
+    cse = {"items": [{"link": "https://example.com/page", "title": "Page"}]}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "www.googleapis.com":
+            return httpx.Response(200, json=cse)
+        return httpx.Response(503)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        search = WebSearch(WebSearchConfig(sources=["google"]), client=client)
+        response = await search.fetch("query")
+
+    status = response.statuses["google"]
+    assert status.ok
+    assert status.http_calls == 2
+    assert len(status.suppressed) == 1
+    assert isinstance(status.suppressed[0], httpx.HTTPStatusError)
@@ -0,0 +1,81 @@
+import httpx
+import pytest
+
+import src.web_search.negative_cache as negative_cache_module
+from src.web_search import GoogleSearchConfig, NegativeCache, RotatingBloomFilter, WebSearch, WebSearchConfig
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def test_bloom_filter_membership_and_expiry(monkeypatch):
+    """Test keys are found with no false negatives, few false positives, and expire after two ttl"""
+    clock = _Clock()
+    monkeypatch.setattr(negative_cache_module, "time", clock)
+    bloom = RotatingBloomFilter(capacity=1000, error_rate=0.01, ttl=60)
+
+    for i in range(500):
+        bloom.add(f"https://bad.com/{i}")
+    assert all(f"https://bad.com/{i}" in bloom for i in range(500))
+    assert sum(f"https://good.com/{i}" in bloom for i in range(2000)) < 60
+    assert 0 < bloom.fill < 1
+
+    clock.now += 61  # rotated into the previous generation, still remembered
+    assert "https://bad.com/1" in bloom
+    clock.now += 61
+    assert "https://bad.com/1" not in bloom
+
+
+def test_bloom_filter_rotates_when_full():
+    bloom = RotatingBloomFilter(capacity=10, ttl=3600)
+    for i in range(25):
+        bloom.add(i)
+    assert 24 in bloom and 15 in bloom
+    assert sum(i in bloom for i in range(5)) < 5  # the oldest generation was dropped
+
+
+def test_host_blocked_after_consecutive_failures():
+    cache = NegativeCache(host_failures=2)
+    cache.record_failure("https://flaky.com/a")
+    cache.record_success("https://flaky.com/b")
+    cache.record_failure("https://flaky.com/c")
+    assert not cache.is_known_bad("https://flaky.com/d")
+
+    cache.record_failure("https://flaky.com/e")
+    assert cache.is_known_bad("https://flaky.com/d")
+    assert cache.is_known_bad("https://flaky.com/a")
+    assert cache.snapshot()["failures"] == 3 and cache.snapshot()["skipped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_google_skips_known_bad_links():
+    """Test a URL whose scrape failed is skipped by the next search before any request goes out"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "www.googleapis.com":
+            items = [{"link": "https://blocked.com/paywall", "title": "Paywalled"}]
+            items.append({"link": "https://open.com/article", "title": "Open"})
+            return httpx.Response(200, json={"items": items})
+        requests.append(str(request.url))
+        if request.url.host == "blocked.com":
+            return httpx.Response(403)
+        return httpx.Response(200, text="<p>An open article that anyone can read in full.</p>")
+
+    cache = NegativeCache()
+    config = WebSearchConfig(sources=["google"], google_config=GoogleSearchConfig(negative_cache=cache))
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        search = WebSearch(config, client=client)
+        first = await search.search_results("articles")
+        second = await search.search_results("articles")
+
+    assert [r.url for r in first] == ["https://blocked.com/paywall", "https://open.com/article"]
+    assert [r.url for r in second] == ["https://open.com/article"]
+    assert requests.count("https://blocked.com/paywall") == 1
+    assert requests.count("https://open.com/article") == 2
+    assert cache.snapshot()["skipped"] == 1
@@ -0,0 +1,11 @@
+from benchmarks.parsers import CASES, check_equivalence
+
+
+def test_parsers_match_recorded_outputs():
+    """Test every parser still produces the recorded output for the corpus"""
+    assert check_equivalence() == []
+
+
+def test_corpus_covers_each_parser():
+    """Test the corpus has a case for every CPU-heavy parser"""
+    assert {case.name.split(".")[0] for case in CASES} == {"google", "wikipedia", "arxiv", "pubmed"}
@@ -0,0 +1,92 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.web_search.base import SearchResult
+from src.web_search.config import RankingConfig, WebSearchConfig
+from src.web_search.ranking import bm25_scores, rank_results, reciprocal_rank_fusion
+from src.web_search.search import WebSearch
+
+
+def _result(url: str, title: str, preview: str, source="google") -> SearchResult:
+    return SearchResult(url=url, title=title, preview=preview, source=source)
+
+
+@pytest.fixture
+def results_by_source():
+    return [
+        [
+            _result("https://g.com/1", "Cooking pasta", "How to boil water and cook pasta"),
+            _result("https://g.com/2", "Quantum computing basics", "Qubits, superposition and quantum gates"),
+        ],
+        [
+            _result("https://arxiv.org/1", "Quantum error correction", "Quantum codes protect qubits", "arxiv"),
+            _result("https://arxiv.org/2", "Graph neural networks", "Message passing on graphs", "arxiv"),
+        ],
+    ]
+
+
+def test_bm25_scores_prefer_matching_documents(results_by_source):
+    merged = [r for results in results_by_source for r in results]
+    scores = bm25_scores("quantum qubits", merged)
+
+    assert len(scores) == len(merged)
+    assert scores[0] == 0.0
+    assert scores[3] == 0.0
+    assert scores[1] > 0 and scores[2] > 0
+
+
+def test_bm25_scores_empty_query(results_by_source):
+    assert bm25_scores("", results_by_source[0]) == [0.0, 0.0]
+
+
+def test_reciprocal_rank_fusion_interleaves_and_merges_urls():
+    a = _result("https://a.com", "A", "a")
+    b = _result("https://b.com", "B", "b")
+    c = _result("https://c.com", "C", "c")
+    duplicate = _result("https://a.com", "A again", "a", "wikipedia")
+
+    fused = reciprocal_rank_fusion([[a, b], [c, duplicate]])
+
+    assert fused == [a, c, b]
+
+
+def test_rank_results_bm25_top_k(results_by_source):
+    ranked = rank_results("quantum error correction", results_by_source, RankingConfig(top_k=2))
+
+    assert [r.url for r in ranked] == ["https://arxiv.org/1", "https://g.com/2"]
+
+
+def test_rank_results_rrf_keeps_native_order(results_by_source):
+    ranked = rank_results("anything", results_by_source, RankingConfig(method="rrf"))
+
+    assert [r.url for r in ranked] == [
+        "https://g.com/1",
+        "https://arxiv.org/1",
+        "https://g.com/2",
+        "https://arxiv.org/2",
+    ]
+
+
+def test_rank_results_hybrid(results_by_source):
+    ranked = rank_results("quantum qubits", results_by_source, RankingConfig(method="hybrid", top_k=1))
+
+    assert ranked[0].url == "https://arxiv.org/1"
+
+
+@pytest.mark.asyncio
+async def test_websearch_search_applies_ranking(results_by_source):
+    config = WebSearchConfig(sources=["google", "arxiv"], ranking=RankingConfig(top_k=1))
+
+    with patch.object(WebSearch, "__init__", lambda self, config: None):
+        search = WebSearch(config)
+        search.config = config
+        search.google = AsyncMock()
+        search.google._handle = AsyncMock(return_value=results_by_source[0])
+        search.arxiv = AsyncMock()
+        search.arxiv._handle = AsyncMock(return_value=results_by_source[1])
+
+        result = await search.search("quantum error correction")
+
+        assert len(result) == 1
+        assert result[0]["url"] == "https://arxiv.org/1"
@@ -0,0 +1,92 @@
+import subprocess
+import sys
+from importlib import metadata
+from typing import List
+
+import pytest
+
+from src.web_search import BaseConfig, BaseSearch, SearchResult, WebSearch, WebSearchConfig, register, registry
+
+
+class EchoSearch(BaseSearch):
+    source = "echo"
+
+    def __init__(self, config=None, client=None, hooks=()):
+        super().__init__(config if config else BaseConfig(), client, hooks)
+
+    async def _handle(self, query: str, max_results=None, timeout=None) -> List[SearchResult]:
+        return [SearchResult(url="https://echo.test", title=query, preview="echo", source="echo")]  # type: ignore[arg-type]
+
+
+@pytest.fixture
+def clean_registry(monkeypatch):
+    monkeypatch.setattr(registry, "_registry", dict(registry._registry))
+    monkeypatch.setattr(registry, "_entry_points_loaded", False)
+
+
+def test_import_does_not_load_providers():
+    code = (
+        "import sys, src.web_search; "
+        "print(','.join(m for m in ('httpx', 'bs4', 'lxml', 'wikipedia', 'requests') if m in sys.modules))"
+    )
+    loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+    assert loaded == ""
+
+
+def test_providers_are_built_on_first_use():
+    search = WebSearch(WebSearchConfig(sources=["github"], github_config=BaseConfig(max_results=7)))
+    assert "github" not in search._providers_by_source
+
+    provider = search.github
+    assert provider is search.provider("github")
+    assert provider.config.max_results == 7
+    assert "arxiv" not in search._providers_by_source
+    assert [source for source, _ in search._providers(["pubmed", "github"])] == ["github", "pubmed"]
+
+
+def test_unknown_source_is_rejected(clean_registry, monkeypatch):
+    monkeypatch.setattr(registry.metadata, "entry_points", lambda group: [])
+    search = WebSearch()
+    with pytest.raises(ValueError, match="Unknown search source"):
+        search._providers(["nope"])  # type: ignore[list-item]
+    with pytest.raises(AttributeError):
+        search.nope
+
+
+@pytest.mark.asyncio
+async def test_registered_provider(clean_registry):
+    register("echo", f"{__name__}:EchoSearch")
+    config = WebSearchConfig(sources=["echo"], provider_configs={"echo": BaseConfig(max_results=1)})  # type: ignore[list-item]
+
+    results = await WebSearch(config).search("hello")
+    assert results == [{"url": "https://echo.test", "title": "hello", "preview": "echo", "source": "echo"}]
+
+
+@pytest.mark.asyncio
+async def test_entry_point_provider(clean_registry, monkeypatch):
+    entry_point = metadata.EntryPoint(name="echo", value=f"{__name__}:EchoSearch", group=registry.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(registry.metadata, "entry_points", lambda group: [entry_point])
+
+    assert "echo" in registry.sources()
+    search = WebSearch(WebSearchConfig(sources=["google", "echo"]))  # type: ignore[list-item]
+    assert [source for source, _ in search._providers()] == ["google", "echo"]
+    assert isinstance(search.echo, EchoSearch)
+
+
+def test_builtin_providers_load_from_the_importing_package():
+    """Test built-in providers come from the same module tree as the WebSearch that builds them"""
+    from src.web_search import google
+
+    assert isinstance(WebSearch().provider("google"), google.GoogleSearch)
+    assert type(WebSearch().provider("google")).__module__ == "src.web_search.google"
+
+
+def test_sources_named_like_websearch_attributes(clean_registry):
+    """Test a source named after a WebSearch attribute gets a provider without shadowing the attribute"""
+    register("config", f"{__name__}:EchoSearch")
+    config = WebSearchConfig(sources=["config"])  # type: ignore[list-item]
+    search = WebSearch(config)
+
+    assert isinstance(search.provider("config"), EchoSearch)
+    assert search.config is config
+    assert [provider for _, provider in search._providers()] == [search.provider("config")]
@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.web_search.base import SearchResult
+from src.web_search.config import RankingConfig, WebSearchConfig
+from src.web_search.response import SearchResponse
+from src.web_search.search import WebSearch
+
+
+@pytest.fixture
+def search():
+    config = WebSearchConfig(sources=["google", "arxiv"])
+
+    with patch.object(WebSearch, "__init__", lambda self, config: None):
+        search = WebSearch(config)
+        search.config = config
+        search.google = AsyncMock()
+        search.google._handle = AsyncMock(
+            return_value=[
+                SearchResult(url="https://google.com/1", title="Google Result", preview="Preview 1", source="google")
+            ]
+        )
+        search.arxiv = AsyncMock()
+        search.arxiv._handle = AsyncMock(side_effect=Exception("API Error"))
+        yield search
+
+
+@pytest.mark.asyncio
+async def test_fetch_returns_response_with_statuses(search):
+    response = await search.fetch("test query")
+
+    assert isinstance(response, SearchResponse)
+    assert response.query == "test query"
+    assert len(response.results) == 1
+
+    assert response.statuses["google"].ok
+    assert response.statuses["google"].count == 1
+    assert response.statuses["google"].elapsed >= 0
+    assert not response.statuses["arxiv"].ok
+    assert str(response.statuses["arxiv"].error) == "API Error"
+
+
+@pytest.mark.asyncio
+async def test_views_share_a_single_fetch(search):
+    response = await search.fetch("test query")
+
+    assert response.to_dicts() == [
+        {"url": "https://google.com/1", "title": "Google Result", "preview": "Preview 1", "source": "google"}
+    ]
+    dicts = response.to_dicts()
+    dicts[0]["title"] = "Changed"
+    dicts.append({})
+    assert response.to_dicts()[0]["title"] == "Google Result" and len(response.to_dicts()) == 1
+    assert response.compile() == "Source: google\nTitle: Google Result\nPreview: Preview 1"
+    assert len(response.compile(budget=30)) <= 30
+
+    search.google._handle.assert_called_once_with("test query")
+    search.arxiv._handle.assert_called_once_with("test query")
+
+
+@pytest.mark.asyncio
+async def test_fetch_applies_ranking(search):
+    search.config.ranking = RankingConfig(top_k=1)
+    response = await search.fetch("test query")
+
+    assert response.ranked
+    assert [r.url for r in response.results] == ["https://google.com/1"]
+
+
+@pytest.mark.asyncio
+async def test_search_results_returns_objects(search):
+    results = await search.search_results("test query")
+
+    assert len(results) == 1
+    assert isinstance(results[0], SearchResult)
+    assert not hasattr(results[0], "__dict__")
@@ -0,0 +1,123 @@
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+
+from src.web_search import AdaptiveTimeoutConfig, GoogleSearchConfig, ScrapeScheduler, WebSearch, WebSearchConfig
+from src.web_search.google import GoogleSearch
+
+
+async def _hold(scheduler: ScrapeScheduler, host: str, order: List[str], name: str, release: asyncio.Event):
+    async with scheduler.slot(host):
+        order.append(name)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_limits_and_fifo_order():
+    """Test the global and per-host caps, and that waiters start in arrival order past a full host"""
+    scheduler = ScrapeScheduler(max_concurrency=3, per_host=2)
+    order: List[str] = []
+    release = asyncio.Event()
+
+    names = [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"), ("c", "c1"), ("b", "b2")]
+    tasks = [asyncio.create_task(_hold(scheduler, host, order, name, release)) for host, name in names]
+    await asyncio.sleep(0)
+
+    # a3 waits on host a; b1 takes the last global slot ahead of the later arrivals
+    assert order == ["a1", "a2", "b1"]
+    assert scheduler.active == 3 and scheduler.waiting == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["a1", "a2", "b1", "a3", "c1", "b2"]
+    assert scheduler.active == 0 and scheduler.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_cancelled_and_timed_out_waiters_leave_the_queue():
+    scheduler = ScrapeScheduler(max_concurrency=1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(scheduler, "a", [], "holder", release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        async with scheduler.slot("b", timeout=0.01):
+            pass
+
+    waiter = asyncio.create_task(_hold(scheduler, "b", [], "waiter", release))
+    await asyncio.sleep(0)
+    assert scheduler.waiting == 1
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert scheduler.waiting == 0
+
+    release.set()
+    await holder
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_google_scrapes_respect_per_host_limit():
+    """Test concurrent searches never scrape one host more than per_host at a time"""
+    in_flight = {"now": 0, "max": 0}
+    cse = {"items": [{"link": f"https://popular.example/{i}", "title": f"Page {i}"} for i in range(5)]}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "www.googleapis.com":
+            return httpx.Response(200, json=cse)
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return httpx.Response(200, html="<p>Quantum computing is a long enough paragraph to keep.</p>")
+
+    config = WebSearchConfig(
+        sources=["google"],
+        google_config=GoogleSearchConfig(
+            api_key="key", cse_id="cse", max_results=5, scrape_scheduler=ScrapeScheduler(per_host=2)
+        ),
+    )
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        search = WebSearch(config, client=client)
+        results = await asyncio.gather(*(search.search(f"quantum {i}") for i in range(4)))
+
+    assert all(len(r) == 5 for r in results)
+    assert in_flight["max"] == 2
+
+
+@pytest.mark.asyncio
+async def test_scrape_wait_and_fetch_share_one_timeout():
+    """Test time spent waiting for a slot is taken off the fetch's timeout, which is the host's adaptive one"""
+    scheduler = ScrapeScheduler(per_host=1)
+    adaptive = AdaptiveTimeoutConfig(min_samples=1, multiplier=1.0, min_timeout=0.01)
+    google = GoogleSearch(GoogleSearchConfig(scrape_scheduler=scheduler, timeout=30, adaptive_timeout=adaptive))
+    google.timeouts.record("busy.com", 0.3)
+    fetch_timeouts: List[float | None] = []
+
+    async def get(url, timeout=None, **kwargs):
+        fetch_timeouts.append(timeout)
+        return httpx.Response(
+            200, text="<p>A page that is long enough to keep as content.</p>", request=httpx.Request("GET", url)
+        )
+
+    google._get = get  # type: ignore[method-assign]
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(scheduler, "busy.com", [], "holder", release))
+    await asyncio.sleep(0)
+    asyncio.get_running_loop().call_later(0.1, release.set)
+
+    assert await google._scrape_page_content("https://busy.com/page")
+    await holder
+    # the adaptive timeout (about 0.3s) less the 0.1s spent waiting
+    assert fetch_timeouts[0] is not None and 0.05 < fetch_timeouts[0] < 0.3
+
+    # a wait that uses up the whole timeout gives up without fetching
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(scheduler, "busy.com", [], "holder", release))
+    await asyncio.sleep(0)
+    assert await google._scrape_page_content("https://busy.com/page", timeout=0.05) == ""
+    release.set()
+    await holder
+    assert len(fetch_timeouts) == 1
@@ -1,5 +1,6 @@
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 
 from src.web_search.base import SearchResult
@@ -197,3 +198,39 @@ async def test_websearch_search_handles_exceptions():
         assert isinstance(result, list)
         assert len(result) == 1
         assert result[0]["title"] == "Google Result"
+
+
+@pytest.mark.asyncio
+async def test_websearch_call_time_options():
+    """
+    Test that per-call sources, max_results and timeout override the config
+    """
+    config = WebSearchConfig(sources=["google"])
+
+    with patch.object(WebSearch, "__init__", lambda self, config: None):
+        search = WebSearch(config)
+        search.config = config
+        search.google = AsyncMock()
+        search.google._handle = AsyncMock(return_value=[])
+        search.arxiv = AsyncMock()
+        search.arxiv._handle = AsyncMock(return_value=[])
+
+        await search.search("test query", sources=["arxiv"], max_results=5, timeout=2.0)
+
+        search.google._handle.assert_not_called()
+        search.arxiv._handle.assert_called_once_with("test query", max_results=5, timeout=2.0)
+
+
+@pytest.mark.asyncio
+async def test_websearch_shares_http_client():
+    """
+    Test that a client passed to WebSearch is shared by the providers and not closed by them
+    """
+    async with httpx.AsyncClient() as client:
+        search = WebSearch(WebSearchConfig(), client=client)
+
+        assert search.google.client is client
+        assert search.pubmed.client is client
+        async with search.github._http_client() as http_client:
+            assert http_client is client
+        assert not client.is_closed
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from src.web_search import SyncWebSearch, WebSearchConfig
+
+
+def _github(query: str):
+    return {"items": [{"html_url": f"https://github.com/{query}", "name": query, "description": "A repository"}]}
+
+
+async def _handler(request: httpx.Request) -> httpx.Response:
+    query = request.url.params["q"]
+    if query == "slow":
+        await asyncio.sleep(5)
+    return httpx.Response(200, json=_github(query))
+
+
+def test_sync_search_from_many_threads():
+    """Test one SyncWebSearch serves concurrent threads on a single loop and client"""
+    with SyncWebSearch(WebSearchConfig(sources=["github"]), transport=httpx.MockTransport(_handler)) as search:
+        client = search.web_search.github.client
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(search.search, [f"repo{i}" for i in range(16)]))
+
+        assert [r[0]["title"] for r in results] == [f"repo{i}" for i in range(16)]
+        assert search.web_search.github.client is client
+        assert search.compile_search("repo") == "Source: github\nTitle: repo\nPreview: A repository"
+        assert "".join(search.compile_stream("repo", budget=100)).startswith("Source: github")
+
+
+def test_sync_search_deadline_and_close():
+    """Test a search past its deadline is cancelled and close() stops the loop"""
+    search = SyncWebSearch(WebSearchConfig(sources=["github"]), transport=httpx.MockTransport(_handler))
+
+    with pytest.raises(TimeoutError):
+        search.search("slow", deadline=0.1)
+    assert search.search("fast", deadline=5)[0]["title"] == "fast"
+
+    search.close()
+    search.close()
+    assert not any(t.name == "web-search-loop" and t.is_alive() for t in threading.enumerate())
+    with pytest.raises(RuntimeError, match="closed"):
+        search.search("fast")
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.web_search import AdaptiveTimeoutConfig, BaseConfig
+from src.web_search import timeouts as timeouts_module
+from src.web_search.github import GitHubSearch
+from src.web_search.timeouts import AdaptiveTimeouts, LatencyHistogram
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(timeouts_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_histogram_percentiles_roll_over(clock):
+    histogram = LatencyHistogram(window=60)
+    for _ in range(90):
+        histogram.record(0.1)
+    for _ in range(10):
+        histogram.record(2.0)
+
+    assert 0.1 <= histogram.percentile(50) < 0.125
+    assert 2.0 <= histogram.percentile(95) < 2.5
+
+    clock.now += 31  # the samples move to the previous generation
+    histogram.record(0.5)
+    assert histogram.count == 101
+    clock.now += 31  # and then fall out of the window
+    assert histogram.count == 1
+
+
+def test_adaptive_timeouts_need_samples_and_are_clamped(clock):
+    timeouts = AdaptiveTimeouts(AdaptiveTimeoutConfig(min_samples=5, multiplier=2, min_timeout=0.5, max_timeout=10))
+    for _ in range(4):
+        timeouts.record("fast.example", 0.05)
+        timeouts.record("slow.example", 8.0)
+    assert timeouts.timeout("fast.example") is None
+
+    timeouts.record("fast.example", 0.05)
+    timeouts.record("slow.example", 8.0)
+    assert timeouts.timeout("fast.example") == 0.5
+    assert timeouts.timeout("slow.example") == 10
+    assert set(timeouts.snapshot()) == {"fast.example", "slow.example"}
+
+
+@pytest.mark.asyncio
+async def test_provider_uses_adaptive_timeout():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={"items": []})
+
+    config = BaseConfig(timeout=20, adaptive_timeout=AdaptiveTimeoutConfig(min_samples=2, min_timeout=3))
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        github = GitHubSearch(config, client=client)
+        for _ in range(3):
+            await github._search("repositories")
+        await github._search("repositories", timeout=7)
+
+    # the configured timeout until two samples are in, then the (clamped) adaptive one;
+    # a call-time timeout always wins
+    assert seen == [20, 20, 3, 7]
+
+
+@pytest.mark.asyncio
+async def test_timed_out_requests_raise_the_timeout():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("slow", request=request)
+
+    config = BaseConfig(adaptive_timeout=AdaptiveTimeoutConfig(min_samples=1, min_timeout=0))
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        github = GitHubSearch(config, client=client)
+        with pytest.raises(httpx.ReadTimeout):
+            await github._search("repositories")
+
+    assert github.timeouts is not None
+    assert github.timeouts.timeout("api.github.com") is not None
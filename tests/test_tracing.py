@@ -0,0 +1,107 @@
+import asyncio
+import io
+import json
+
+import httpx
+import pytest
+
+from src.web_search import (
+    HTTPTracer,
+    JSONLinesSink,
+    PhaseTrace,
+    RingBufferSink,
+    TraceSink,
+    WebSearch,
+    WebSearchConfig,
+    summarize,
+)
+
+GITHUB_BODY = json.dumps({"items": [{"html_url": "https://github.com/a/b", "name": "b", "description": "Repo"}]})
+
+
+class LocalTransport(httpx.AsyncBaseTransport):
+    """Sends every request to a local server, keeping the original Host header"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.transport = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(scheme="http", host="127.0.0.1", port=self.port)
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+async def _serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    await reader.readuntil(b"\r\n\r\n")
+    body = GITHUB_BODY.encode()
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+    await writer.drain()
+    writer.close()
+
+
+def test_summarize_percentiles():
+    """Test phases are summarized with nearest-rank percentiles per group"""
+    traces = [
+        PhaseTrace(source="arxiv", host="export.arxiv.org", timestamp=0, phases={"wait": i / 100})
+        for i in range(1, 101)
+    ]
+
+    summary = summarize(traces)
+
+    assert summary["arxiv"]["wait"] == {"count": 100, "p50": 0.5, "p95": 0.95, "p99": 0.99}
+    assert list(summarize(traces, by="host")) == ["export.arxiv.org"]
+
+
+@pytest.mark.asyncio
+async def test_tracer_records_http_phases():
+    """Test a traced request records connect, send, wait and download phases tagged with source and host"""
+    server = await asyncio.start_server(_serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    ring = RingBufferSink()
+    lines = io.StringIO()
+    tracer = HTTPTracer([ring, JSONLinesSink(lines)])
+
+    async with server, httpx.AsyncClient(transport=LocalTransport(port)) as client:
+        search = WebSearch(WebSearchConfig(sources=["github"]), client=client, hooks=[tracer])
+        results = await search.search("repo")
+
+    assert len(results) == 1
+    http_trace, parse_trace = ring.traces
+    assert http_trace.source == "github"
+    assert http_trace.host == "api.github.com"
+    assert http_trace.status_code == 200
+    assert {"queue", "connect", "send", "wait", "download"} <= set(http_trace.phases)
+    assert list(parse_trace.phases) == ["parse"]
+    assert json.loads(lines.getvalue().splitlines()[0])["host"] == "api.github.com"
+    assert ring.summary()["github"]["wait"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_several_tracers_and_a_caller_trace_see_one_request():
+    """Test every tracing hook, and a trace extension passed by the caller, receive the request's events"""
+    server = await asyncio.start_server(_serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    first, second = RingBufferSink(), RingBufferSink()
+    events = []
+
+    async def caller_trace(event, info):
+        events.append(event)
+
+    async with server, httpx.AsyncClient(transport=LocalTransport(port)) as client:
+        hooks = [HTTPTracer([first]), HTTPTracer([second])]
+        search = WebSearch(WebSearchConfig(sources=["github"]), client=client, hooks=hooks)
+        response = await search.github._get("https://api.github.com/search", extensions={"trace": caller_trace})
+
+    assert response.status_code == 200
+    assert len(first.traces) == len(second.traces) == 1
+    assert first.traces[0] is not second.traces[0]
+    assert {"connect", "wait"} <= set(first.traces[0].phases) and {"connect", "wait"} <= set(second.traces[0].phases)
+    assert any(event.endswith("receive_response_headers.complete") for event in events)
+
+
+def test_trace_sink_is_abstract():
+    with pytest.raises(TypeError):
+        TraceSink()
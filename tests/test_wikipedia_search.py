@@ -4,6 +4,7 @@ from unittest.mock import patch
 
 import pytest
 
+from src.web_search.config import BaseConfig
 from src.web_search.wikipedia_ import WikipediaSearch
 
 from .base_utils import BaseSearchTests
@@ -29,3 +30,28 @@ def search_instance(mock_search_handler, sample_results):
 
 class TestWikipediaSearch(BaseSearchTests):
     search_class = WikipediaSearch
+
+    ARTICLE = (
+        "Quantum computing uses quantum mechanics.\n\n\n"
+        "== History ==\nEarly ideas date to the 1980s.\n\n"
+        "=== Pioneers ===\nFeynman proposed quantum simulation.\n\n"
+        "== Algorithms ==\nShor's algorithm factors integers. Grover's algorithm searches.\n\n"
+        "== See also ==\nQuantum algorithm\n\n"
+        "== References ==\nSmith 2001\n\n"
+        "=== Notes on algorithms ===\nalgorithms algorithms"
+    )
+
+    def test_extract_sections_skips_references(self):
+        preview = WikipediaSearch(BaseConfig(max_preview_chars=None))._extract_relevant_wiki_sections(self.ARTICLE)
+
+        assert preview.startswith("Quantum computing uses quantum mechanics.")
+        assert "=== Pioneers ===" in preview
+        assert "See also" not in preview and "Smith" not in preview and "Notes on algorithms" not in preview
+
+    def test_extract_sections_prefers_query_matches_within_budget(self):
+        search = WikipediaSearch(BaseConfig(max_preview_chars=130))
+        preview = search._extract_relevant_wiki_sections(self.ARTICLE, "shor algorithm")
+
+        assert len(preview) <= 130
+        assert preview.startswith("Quantum computing uses quantum mechanics.\n\n== Algorithms ==")
+        assert "History" not in preview